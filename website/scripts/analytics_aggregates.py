@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Precomputed aggregates for the analytics dashboard
+Computes every distribution analyticsHelpers.ts offers - with the same
+ordering, tie-breaking and top-N cuts - plus cross-tabulations of the
+region facets that would be too slow to build on every dashboard mount.
+data_catalogue.py writes the result as public/data/analytics.<hash>.json
+and rebuilds it only when the data version changes
+
+Usage:
+  python3 analytics_aggregates.py
+"""
+
+import json
+import sys
+from itertools import combinations
+
+INSTRUMENT_GROUPS = ('melodic', 'rhythmic', 'unique')
+# Keyword groups of getSocialContextStats, in the order they are counted
+PATRONAGE_TYPES = (
+    ('Royal/Court', ('royal', 'court')),
+    ('Temple/Religious', ('temple', 'religious')),
+    ('Tourism/Commercial', ('tourism', 'commercial')),
+    ('Government/Academy', ('government', 'academy')),
+)
+TOP_GENRES = 15
+TOP_INSTRUMENTS = 20
+TOP_CASTES = 10
+TOP_VOCAL_STYLES = 12
+TOP_PAIRS = 25
+# Bump when build_analytics output changes for the same data, so
+# data_catalogue.py rebuilds the aggregates instead of reusing the last ones
+FORMAT_VERSION = 1
+
+
+def _ranked(counts, limit=None):
+    """Items of an insertion-ordered dict by count, ties kept in first-seen order (like Array.sort)"""
+    ranked = sorted(counts.items(), key=lambda item: -item[1])
+    return ranked[:limit] if limit else ranked
+
+
+def _members(regions, values):
+    """{value: [region names]} in first-seen order, each region once per value"""
+    members = {}
+    for region in regions:
+        for value in values(region):
+            names = members.setdefault(value, [])
+            if region['name'] not in names:
+                names.append(region['name'])
+    return members
+
+
+def _by_members(members, key, limit=None):
+    counts = {value: len(names) for value, names in members.items()}
+    return [{key: value, 'count': count, 'regions': members[value]} for value, count in _ranked(counts, limit)]
+
+
+def _tally(values):
+    counts = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return counts
+
+
+def _instruments(region):
+    return [i for group in INSTRUMENT_GROUPS for i in region['instruments'][group]]
+
+
+def instrument_distribution(regions):
+    members = _members(regions, _instruments)
+    category = {}
+    for region in regions:
+        for group in INSTRUMENT_GROUPS:
+            for instrument in region['instruments'][group]:
+                category.setdefault(instrument, group)
+    return [dict(row, category=category[row['instrument']])
+            for row in _by_members(members, 'instrument', TOP_INSTRUMENTS)]
+
+
+def social_context_stats(regions):
+    patronage = {}
+    for region in regions:
+        for patron in region['socialContext']['patronage']:
+            lower = patron.lower()
+            for name, words in PATRONAGE_TYPES:
+                if any(word in lower for word in words):
+                    patronage[name] = patronage.get(name, 0) + 1
+    castes = _tally(c for r in regions for c in r['socialContext'].get('musicianCaste', []))
+    hereditary = sum(1 for r in regions if r['socialContext']['hereditaryTradition'])
+    return {
+        'hereditaryCount': hereditary,
+        'nonHereditaryCount': len(regions) - hereditary,
+        'castes': [{'name': name, 'count': count} for name, count in _ranked(castes, TOP_CASTES)],
+        'patronageTypes': [{'type': name, 'count': count} for name, count in _ranked(patronage)],
+    }
+
+
+def statistics_summary(regions):
+    return {
+        'totalRegions': len(regions),
+        'totalInstruments': len({i for r in regions for i in _instruments(r)}),
+        'totalLanguages': len({lang for r in regions for lang in r['language']['primary']}),
+        'totalCommunities': len({c for r in regions for c in r['socialContext'].get('musicianCaste', [])}),
+        'hereditaryTraditions': sum(1 for r in regions if r['socialContext']['hereditaryTradition']),
+    }
+
+
+def cross_tab(regions, rows, columns):
+    """{rows, columns, counts[row][column]} of regions by two single-valued facets"""
+    row_values = sorted({rows(r) for r in regions})
+    column_values = sorted({columns(r) for r in regions})
+    counts = [[0] * len(column_values) for _ in row_values]
+    for region in regions:
+        counts[row_values.index(rows(region))][column_values.index(columns(region))] += 1
+    return {'rows': row_values, 'columns': column_values, 'counts': counts}
+
+
+def instrument_pairs(regions):
+    """Instruments most often found in the same regions, with those regions"""
+    members = {}
+    for region in regions:
+        for pair in combinations(sorted(set(_instruments(region))), 2):
+            members.setdefault(pair, []).append(region['name'])
+    ranked = sorted(members.items(), key=lambda item: (-len(item[1]), item[0]))[:TOP_PAIRS]
+    return [{'instruments': list(pair), 'count': len(names), 'regions': names} for pair, names in ranked]
+
+
+def build_analytics(catalogue):
+    """Every dashboard aggregate of a normalized catalogue (see data_catalogue.normalize)"""
+    regions = catalogue['tables']['regions']
+
+    def family(region):
+        return region['language']['linguisticFamily']
+
+    def tempo(region):
+        return region['musicalStructure']['tempo']
+
+    def scale(region):
+        return region['musicalStructure']['scaleType']
+
+    return {
+        'regional': [{'name': r['name'], 'value': 1, 'color': r['color']} for r in regions],
+        'genres': _by_members(_members(regions, lambda r: r['performance']['performanceContext']
+                                       + r['language']['poeticTraditions']), 'genre', TOP_GENRES),
+        'instruments': instrument_distribution(regions),
+        'tempos': _by_members(_members(regions, lambda r: [tempo(r)]), 'tempoRange'),
+        'socialContext': social_context_stats(regions),
+        'vocalStyles': [{'style': style, 'count': count} for style, count in
+                        _ranked(_tally(s for r in regions for s in r['performance']['vocalStyle']),
+                                TOP_VOCAL_STYLES)],
+        'linguistics': _by_members(_members(regions, lambda r: [family(r)]), 'family'),
+        'scales': [{'scale': name, 'count': count} for name, count in _ranked(_tally(map(scale, regions)))],
+        'summary': statistics_summary(regions),
+        'crossTabs': {
+            'familyByTempo': cross_tab(regions, family, tempo),
+            'scaleByFamily': cross_tab(regions, scale, family),
+            'familyByHereditary': cross_tab(regions, family,
+                                            lambda r: r['socialContext']['hereditaryTradition']),
+        },
+        'instrumentPairs': instrument_pairs(regions),
+    }
+
+
+def main():
+    from data_catalogue import normalize, read_sources
+
+    analytics = build_analytics(normalize(read_sources(check=False)))
+    print(json.dumps(analytics['summary'], indent=2))
+    for row in analytics['instrumentPairs'][:5]:
+        print(f"  {row['count']}  {' + '.join(row['instruments'])}")
+    size = len(json.dumps(analytics, separators=(',', ':')))
+    print(f"📊 {len(analytics)} aggregates, {size / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP helpers for the asset download scripts
+Keeps one pooled requests.Session so keep-alive connections are reused per host,
+paces requests through the per-host rate limiter, and runs download jobs on a
+bounded thread pool
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import LIMITER, RETRY_STATUSES, backoff_delay, parse_retry_after
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+DEFAULT_WORKERS = 8
+# Bytes per read/write when streaming a download to disk
+CHUNK_SIZE = 1024 * 1024
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session(pool_size=DEFAULT_WORKERS):
+    """Return the shared Session, creating it on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # One pool per host, sized so every worker can hold a live connection
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max(pool_size, 1))
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = USER_AGENT
+            _session = session
+        return _session
+
+
+def _wait_to_retry(url, attempt, response=None):
+    """Sleep before another attempt at url, honoring the response's Retry-After"""
+    retry_after = None if response is None else parse_retry_after(response.headers.get('Retry-After'))
+    if retry_after is not None:
+        # Everyone talking to this host waits, not just this worker
+        LIMITER.pause(url, retry_after)
+    else:
+        time.sleep(backoff_delay(attempt))
+
+
+def fetch(url, max_retries=3, session=None, **kwargs):
+    """
+    GET url through the per-host rate limiter
+    Retries 429/5xx responses and connection errors with jittered backoff,
+    honoring Retry-After. max_retries counts every attempt, so 1 means a
+    single request. Returns the last Response; raises the last error if no
+    response was ever received
+    """
+    session = session or get_session()
+    kwargs.setdefault('timeout', 30)
+    
+    for attempt in range(max_retries):
+        LIMITER.acquire(url)
+        try:
+            response = session.get(url, **kwargs)
+        except requests.exceptions.RequestException:
+            if attempt == max_retries - 1:
+                raise
+            _wait_to_retry(url, attempt)
+            continue
+        
+        if response.status_code not in RETRY_STATUSES or attempt == max_retries - 1:
+            return response
+        
+        response.close()
+        _wait_to_retry(url, attempt, response)
+
+
+def _write_part_meta(meta_path, response):
+    """Remember the validators of a partial download so a resume can send If-Range"""
+    meta = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+
+def _read_part_meta(meta_path):
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _hash_prefix(part_path):
+    """SHA-256 state over the bytes already on disk, so a resume can keep hashing"""
+    digest = hashlib.sha256()
+    with open(part_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest
+
+
+def _content_range_start(response):
+    """First byte offset of a 206 response's Content-Range, or None when it has none"""
+    value = response.headers.get('Content-Range', '')
+    unit, _, spec = value.partition(' ')
+    start = spec.partition('-')[0]
+    return int(start) if unit.strip().lower() == 'bytes' and start.isdigit() else None
+
+
+def commit_part(part_path, filepath):
+    """fsync a finished .part file and atomically rename it over filepath"""
+    with open(part_path, 'rb+') as f:
+        os.fsync(f.fileno())
+    os.replace(part_path, filepath)
+
+
+def download_to(url, filepath, cache=None, max_retries=3, chunk_size=CHUNK_SIZE, **kwargs):
+    """
+    Stream url into filepath, revalidating against `cache` (an HttpCache) when given
+    
+    Bytes go to `<name>.part` first and the finished file is fsynced and renamed
+    into place, so an interrupted run never leaves a truncated asset behind. A
+    leftover .part is resumed with a Range request guarded by If-Range - one
+    without recorded validators is discarded instead - and a dropped connection
+    mid-body resumes from the last byte written. max_retries bounds the
+    requests made in total, retries of 429/5xx responses included.
+    
+    Returns the HTTP status: 200 means the file was written, 304 means the local
+    copy is still current, anything else means nothing was written
+    """
+    filepath = Path(filepath)
+    part_path = filepath.with_name(filepath.name + '.part')
+    meta_path = filepath.with_name(filepath.name + '.part.json')
+    base_headers = dict(kwargs.pop('headers', {}))
+    
+    def restart():
+        part_path.unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+    
+    for attempt in range(max_retries):
+        headers = dict(base_headers)
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        validator = _read_part_meta(meta_path) if offset else {}
+        if offset and not (validator.get('etag') or validator.get('last_modified')):
+            # Nothing to prove the server still has the same file: start over
+            restart()
+            offset = 0
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = validator.get('etag') or validator['last_modified']
+        elif cache is not None:
+            headers.update(cache.conditional_headers(url, filepath))
+        
+        try:
+            response = fetch(url, max_retries=1, headers=headers, stream=True, **kwargs)
+        except requests.exceptions.RequestException:
+            if attempt == max_retries - 1:
+                raise
+            _wait_to_retry(url, attempt)
+            continue
+        
+        with response:
+            status = response.status_code
+            if status == 304 and not offset:
+                if cache is not None:
+                    cache.touch(url)
+                return 304
+            if status == 416 and offset:
+                # Our .part is stale or already complete - start over cleanly
+                restart()
+                continue
+            if status == 206 and _content_range_start(response) != offset:
+                # Not the bytes we asked for - start over cleanly
+                restart()
+                continue
+            if status in RETRY_STATUSES and attempt < max_retries - 1:
+                _wait_to_retry(url, attempt, response)
+                continue
+            if status not in (200, 206):
+                return status
+            
+            if status == 206 and offset:
+                digest = _hash_prefix(part_path)
+                mode = 'ab'
+            else:
+                # Full body: either a fresh download or the server ignored Range
+                digest = hashlib.sha256()
+                mode = 'wb'
+                _write_part_meta(meta_path, response)
+            
+            try:
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                        digest.update(chunk)
+            except requests.exceptions.RequestException:
+                # Keep the .part - the next attempt asks only for the missing bytes
+                if attempt == max_retries - 1:
+                    raise
+                _wait_to_retry(url, attempt)
+                continue
+        
+        commit_part(part_path, filepath)
+        meta_path.unlink(missing_ok=True)
+        if cache is not None:
+            cache.record(url, response, filepath, digest.hexdigest())
+        return 200
+    
+    return 416
+
+
+def run_jobs(jobs, worker, max_workers=DEFAULT_WORKERS):
+    """
+    Run worker(*job) for every job on a bounded thread pool
+    Yields (job, result) pairs as they complete; exceptions are returned as results
+    """
+    get_session(max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(worker, *job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = e
+            yield futures[future], result
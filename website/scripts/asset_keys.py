@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+How manifest entries are keyed and typed
+Shared by the manifest engine, the shards and the stages that annotate
+manifest entries, so every one of them finds an asset under the same key
+"""
+
+from pathlib import Path
+
+# Files in public/audio itself are the regional song samples
+AUDIO_ROOT_CATEGORY = 'samples'
+
+# Regional images sit in public/images itself; their type comes from the name
+INSTRUMENT_WORDS = ["instrument", "kamaycha", "sarangi", "dhol", "veena", "mridangam", "ektara",
+                    "santoor", "chenda", "dappu", "tumbi", "dholki"]
+PERFORMANCE_WORDS = ["performance", "baul", "bhangra", "lavani", "concert", "temple", "perini"]
+CATEGORY_TYPES = {'artists': 'artist', 'instruments': 'instrument', 'performance': 'performance',
+                  'events': 'event'}
+
+
+def image_key(rel):
+    """
+    Manifest key of an image relative to public/images: the bare filename for
+    regional images in the root, the relative path for everything in a subdirectory
+    """
+    rel = Path(rel)
+    return rel.name if len(rel.parts) == 1 else rel.as_posix()
+
+
+def audio_key(category, name):
+    """Shard key of an audio file: its path relative to public/audio, bare for the root samples"""
+    return name if category == AUDIO_ROOT_CATEGORY else f"{category}/{name}"
+
+
+def image_type(rel):
+    """Manifest type of an image from its directory, or its name for regional images"""
+    rel = Path(rel)
+    if len(rel.parts) > 1:
+        return CATEGORY_TYPES.get(rel.parts[0], 'other')
+    name = rel.name
+    if any(word in name for word in INSTRUMENT_WORDS):
+        return "instrument"
+    if any(word in name for word in PERFORMANCE_WORDS):
+        return "performance"
+    return "other"
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Content-addressed blob store for everything under public/
+Each distinct file is stored once under .asset-store/blobs, keyed by SHA-256,
+and the named paths in public/ are hardlinks (or reflinks) to those blobs.
+Anything that rewrites a path in public/ must write a new file and os.replace
+it over the old name - editing in place would change the shared blob. A GC
+pass removes blobs that no path or pin references any more
+
+Usage:
+  python3 asset_store.py ingest public/images public/audio
+  python3 asset_store.py ingest --backups public/audio
+  python3 asset_store.py gc
+  python3 asset_store.py stats
+"""
+
+import argparse
+import errno
+import json
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+from http_cache import file_sha256
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+STORE_DIR = PROJECT_ROOT / '.asset-store'
+
+# Only media is deduplicated - manifests and notes are rewritten in place
+MEDIA_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp', '.avif', '.gif', '.svg',
+                  '.mp3', '.wav', '.ogg', '.opus', '.m4a', '.backup'}
+
+# Linux ioctl for a copy-on-write clone (btrfs, xfs); unused elsewhere
+FICLONE = 0x40049409
+
+
+def _reflink(src, dst):
+    """Copy-on-write clone of src to dst; raises OSError when unsupported"""
+    import fcntl
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+
+def _remove(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def link_or_copy(src, dst):
+    """
+    Hardlink src to dst, falling back to a reflink and finally a plain copy
+    dst is unlinked before every attempt: writing through an existing name
+    would change the blob (and every other path) it is linked to
+    """
+    _remove(dst)
+    try:
+        os.link(src, dst)
+        return 'hardlink'
+    except OSError:
+        pass
+    _remove(dst)
+    try:
+        _reflink(src, dst)
+        return 'reflink'
+    except (OSError, ImportError):
+        pass
+    _remove(dst)
+    shutil.copy2(src, dst)
+    return 'copy'
+
+
+class AssetStore:
+    """SHA-256 keyed blobs plus an index of which public paths point at them"""
+
+    def __init__(self, root=STORE_DIR, project_root=PROJECT_ROOT):
+        self.root = Path(root)
+        self.project_root = Path(project_root)
+        self.blobs_dir = self.root / 'blobs'
+        self.index_path = self.root / 'refs.json'
+        self.lock = threading.Lock()
+        self.paths = {}
+        self.pins = {}
+        if self.index_path.exists():
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self.paths = index.get('paths', {})
+            self.pins = index.get('pins', {})
+
+    def blob_path(self, digest):
+        return self.blobs_dir / digest[:2] / digest
+
+    def has(self, digest):
+        return bool(digest) and self.blob_path(digest).exists()
+
+    def key_for(self, path):
+        """Index key for path: relative to the project root when possible"""
+        path = Path(path).resolve()
+        try:
+            return str(path.relative_to(self.project_root.resolve()))
+        except ValueError:
+            return str(path)
+
+    def put_file(self, src, digest=None):
+        """Add the contents of src to the store (src is left untouched). Returns the digest"""
+        digest = digest or file_sha256(src)
+        blob = self.blob_path(digest)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(blob.name + '.tmp')
+            # A .tmp left by an interrupted run may itself be a link to a live file
+            _remove(tmp)
+            link_or_copy(src, tmp)
+            os.replace(tmp, blob)
+        return digest
+
+    def materialize(self, digest, path):
+        """Point path at the blob for digest, replacing whatever is there atomically"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.link')
+        _remove(tmp)
+        link_or_copy(self.blob_path(digest), tmp)
+        os.replace(tmp, path)
+        with self.lock:
+            self.paths[self.key_for(path)] = digest
+
+    def ingest(self, path, digest=None):
+        """Store path's contents and turn path into a link to the blob. Returns the digest"""
+        path = Path(path)
+        digest = self.put_file(path, digest)
+        blob = self.blob_path(digest)
+        if not (blob.exists() and os.path.samefile(blob, path)):
+            self.materialize(digest, path)
+        with self.lock:
+            self.paths[self.key_for(path)] = digest
+        return digest
+
+    def pin(self, name, path):
+        """Keep path's current contents alive under `name` even after path changes"""
+        digest = self.put_file(path)
+        with self.lock:
+            self.pins[name] = digest
+        return digest
+
+    def _live_digests(self):
+        """Digests still referenced by an existing path or a pin; prunes stale paths"""
+        live = set(self.pins.values())
+        for key, digest in list(self.paths.items()):
+            path = Path(key)
+            if not path.is_absolute():
+                path = self.project_root / key
+            blob = self.blob_path(digest)
+            # A path that was replaced by a new file no longer shares the blob's inode
+            if path.exists() and blob.exists() and os.path.samefile(path, blob):
+                live.add(digest)
+            elif path.exists() and blob.exists() and file_sha256(path) == digest:
+                live.add(digest)  # reflink or copy fallback
+            else:
+                del self.paths[key]
+        return live
+
+    def gc(self):
+        """Delete unreferenced blobs. Returns (blobs_removed, bytes_freed)"""
+        with self.lock:
+            live = self._live_digests()
+        removed = 0
+        freed = 0
+        if not self.blobs_dir.exists():
+            return removed, freed
+        for blob in self.blobs_dir.glob('*/*'):
+            if blob.name in live:
+                continue
+            freed += blob.stat().st_size
+            blob.unlink()
+            removed += 1
+        for shard in self.blobs_dir.iterdir():
+            try:
+                shard.rmdir()
+            except OSError as e:
+                if e.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+                    raise
+        return removed, freed
+
+    def save(self):
+        """Write the index atomically"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            index = {'version': 1, 'paths': self.paths, 'pins': self.pins}
+            tmp = self.index_path.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(index, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.index_path)
+
+
+def _iter_files(roots):
+    for root in roots:
+        root = Path(root)
+        if root.is_file():
+            yield root
+            continue
+        for path in sorted(root.rglob('*')):
+            if path.is_file() and path.suffix.lower() in MEDIA_SUFFIXES:
+                yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Content-addressed store for public/ assets')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = sub.add_parser('ingest', help='Deduplicate files into the store')
+    ingest_parser.add_argument('paths', nargs='+', help='Files or directories under public/')
+    ingest_parser.add_argument(
+        '--backups',
+        action='store_true',
+        help='Move *.backup files into pinned blobs and delete the copies from public/'
+    )
+    sub.add_parser('gc', help='Remove blobs nothing references any more')
+    sub.add_parser('stats', help='Show store size and dedup savings')
+    args = parser.parse_args()
+
+    store = AssetStore()
+
+    if args.command == 'ingest':
+        seen = 0
+        for path in _iter_files(args.paths):
+            if path.suffix == '.backup':
+                if args.backups:
+                    store.pin(store.key_for(path), path)
+                    path.unlink()
+                    print(f"📌 Pinned and removed: {path.name}")
+                continue
+            store.ingest(path)
+            seen += 1
+        store.save()
+        print(f"✅ Ingested {seen} files")
+    elif args.command == 'gc':
+        removed, freed = store.gc()
+        store.save()
+        print(f"🗑️  Removed {removed} blobs ({freed / 1024 / 1024:.1f} MB)")
+    else:
+        blobs = list(store.blobs_dir.glob('*/*')) if store.blobs_dir.exists() else []
+        stored = sum(b.stat().st_size for b in blobs)
+        logical = sum(store.blob_path(d).stat().st_size for d in store.paths.values() if store.has(d))
+        print(f"📦 Blobs: {len(blobs)} ({stored / 1024 / 1024:.1f} MB)")
+        print(f"🔗 Paths: {len(store.paths)} ({logical / 1024 / 1024:.1f} MB logical)")
+        print(f"📌 Pins: {len(store.pins)}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
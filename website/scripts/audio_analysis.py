@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Offline spectral and loudness fingerprints for the audio library
+One streaming pass over a file (see audio_decode.py) gives a mel spectrogram
+thumbnail - Hann-windowed STFT frames folded into mel bands, averaged down
+to a fixed number of columns, in dB below the loudest cell - and an RMS and
+peak envelope at a fixed rate. Both are quantized to uint8 and written as
+one gzip-compressed sidecar, so SpectrumAnalyzer and VUMeter can preview a
+track without decoding or analysing it in the browser
+
+File layout (before gzip, little-endian):
+  'AFP1', mel bands (u16), columns (u16), envelope length (u32),
+  envelope rate (f32), whole-track RMS (f32), whole-track peak (f32)
+  spectrogram  u8[columns][mel bands]   0 = DB_RANGE below the max, 255 = the max
+  rms          u8[envelope length]      linear, 255 = full scale
+  peak         u8[envelope length]
+
+Usage:
+  python3 audio_analysis.py public/audio/ambient/temple_bells.wav
+"""
+
+import gzip
+import os
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from audio_decode import PcmStream
+from audio_library import AUDIO_DIR
+
+ANALYSIS_DIR = AUDIO_DIR / 'analysis'
+ANALYSIS_SUFFIX = '.fp.gz'
+
+FFT_SIZE = 2048
+HOP_SIZE = 1024
+MEL_BANDS = 64
+MEL_FMIN = 20.0
+MEL_FMAX = 16000.0
+THUMB_COLUMNS = 128
+DB_RANGE = 80.0
+ENVELOPE_RATE = 30  # values per second
+
+_MAGIC = b'AFP1'
+_HEADER = struct.Struct('<4sHHIfff')
+
+
+def _hz_to_mel(hz):
+    return 2595.0 * np.log10(1.0 + np.asarray(hz) / 700.0)
+
+
+def _mel_to_hz(mel):
+    return 700.0 * (10 ** (np.asarray(mel) / 2595.0) - 1.0)
+
+
+def mel_filterbank(sample_rate, fft_size=FFT_SIZE, bands=MEL_BANDS, fmin=MEL_FMIN, fmax=MEL_FMAX):
+    """(bands, fft_size // 2 + 1) triangular filters, each normalized to unit area"""
+    fmax = min(fmax, sample_rate / 2)
+    edges = _mel_to_hz(np.linspace(_hz_to_mel(fmin), _hz_to_mel(fmax), bands + 2))
+    bins = np.fft.rfftfreq(fft_size, 1.0 / sample_rate)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    filters = np.maximum(0.0, np.minimum(rising, falling))
+    return (filters / np.maximum(filters.sum(axis=1, keepdims=True), 1e-12)).astype(np.float32)
+
+
+class _Stft:
+    """Mel power of Hann-windowed frames, fed arbitrary-length mono blocks"""
+
+    def __init__(self, sample_rate):
+        self.window = np.hanning(FFT_SIZE).astype(np.float32)
+        self.filters = mel_filterbank(sample_rate)
+        self.carry = np.empty(0, dtype=np.float32)
+        self.frames = []
+        self.seen = False
+
+    def feed(self, mono):
+        buf = np.concatenate((self.carry, mono))
+        if len(buf) >= FFT_SIZE:
+            count = (len(buf) - FFT_SIZE) // HOP_SIZE + 1
+            frames = np.lib.stride_tricks.sliding_window_view(buf, FFT_SIZE)[::HOP_SIZE][:count]
+            spectrum = np.fft.rfft(frames * self.window, axis=1)
+            power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)
+            self.frames.append(power @ self.filters.T)
+            self.seen = True
+            buf = buf[count * HOP_SIZE:]
+        self.carry = buf
+
+    def finish(self):
+        """(frames, MEL_BANDS) mel power; a file shorter than one frame is zero-padded into one"""
+        if not self.seen and len(self.carry):
+            self.feed(np.pad(self.carry, (0, FFT_SIZE - len(self.carry))))
+        if not self.frames:
+            return np.zeros((0, MEL_BANDS), dtype=np.float32)
+        return np.concatenate(self.frames)
+
+
+class _Envelope:
+    """RMS and peak per fixed window of (frames, channels) blocks"""
+
+    def __init__(self, window, channels):
+        self.window = window
+        self.carry = np.empty((0, channels), dtype=np.float32)
+        self.rms = []
+        self.peak = []
+
+    def _reduce(self, chunk, count):
+        shaped = chunk.reshape(count, -1)
+        self.rms.append(np.sqrt((shaped ** 2).mean(axis=1)))
+        self.peak.append(np.abs(shaped).max(axis=1))
+
+    def feed(self, block):
+        buf = np.concatenate((self.carry, block))
+        whole = len(buf) - len(buf) % self.window
+        if whole:
+            self._reduce(buf[:whole], whole // self.window)
+        self.carry = buf[whole:]
+
+    def finish(self):
+        if len(self.carry):
+            self._reduce(self.carry, 1)
+        if not self.rms:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+        return np.concatenate(self.rms), np.concatenate(self.peak)
+
+
+def thumbnail(mel_frames, columns=THUMB_COLUMNS):
+    """Average STFT frames down to at most `columns` and quantize to uint8 dB"""
+    if not len(mel_frames):
+        return np.zeros((0, MEL_BANDS), dtype=np.uint8)
+    count = min(columns, len(mel_frames))
+    starts = np.linspace(0, len(mel_frames), count, endpoint=False).astype(int)
+    sizes = np.diff(np.append(starts, len(mel_frames)))
+    pooled = np.add.reduceat(mel_frames, starts, axis=0) / sizes[:, None]
+    db = 10.0 * np.log10(np.maximum(pooled, 1e-12))
+    db = np.clip(db - db.max(), -DB_RANGE, 0.0)
+    return np.round((db + DB_RANGE) / DB_RANGE * 255).astype(np.uint8)
+
+
+def _linear_u8(values):
+    return np.round(np.clip(values, 0.0, 1.0) * 255).astype(np.uint8)
+
+
+def analyze(stream):
+    """
+    Fingerprint of a PcmStream:
+    {'spectrogram', 'rms', 'peak', 'envelopeRate', 'rmsLevel', 'peakLevel'}
+    """
+    window = max(1, round(stream.sample_rate / ENVELOPE_RATE))
+    stft = _Stft(stream.sample_rate)
+    envelope = _Envelope(window, stream.channels)
+    sum_squares = 0.0
+    frames = 0
+    for block in stream:
+        stft.feed(block.mean(axis=1))
+        envelope.feed(block)
+        sum_squares += float((block.astype(np.float64) ** 2).sum())
+        frames += block.size
+    rms, peak = envelope.finish()
+    return {
+        'spectrogram': thumbnail(stft.finish()),
+        'rms': rms,
+        'peak': peak,
+        'envelopeRate': stream.sample_rate / window,
+        'rmsLevel': float(np.float32((sum_squares / frames) ** 0.5 if frames else 0.0)),
+        'peakLevel': float(np.float32(peak.max(initial=0.0))),
+    }
+
+
+def write_analysis(path, result):
+    """Write the sidecar atomically; returns its size in bytes"""
+    path = Path(path)
+    spectrogram = result['spectrogram']
+    header = _HEADER.pack(_MAGIC, spectrogram.shape[1], spectrogram.shape[0], len(result['rms']),
+                          result['envelopeRate'], result['rmsLevel'], result['peakLevel'])
+    payload = header + spectrogram.tobytes() + _linear_u8(result['rms']).tobytes() + _linear_u8(result['peak']).tobytes()
+    data = gzip.compress(payload, compresslevel=9, mtime=0)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def read_analysis(path):
+    """Sidecar contents in the shape analyze() returns; raises ValueError if invalid"""
+    try:
+        payload = gzip.decompress(Path(path).read_bytes())
+    except (OSError, EOFError) as e:
+        raise ValueError(f"{path}: {e}") from e
+    if len(payload) < _HEADER.size:
+        raise ValueError(f"{path}: truncated analysis file")
+    magic, bands, columns, length, rate, rms_level, peak_level = _HEADER.unpack_from(payload)
+    if magic != _MAGIC or len(payload) != _HEADER.size + bands * columns + 2 * length:
+        raise ValueError(f"{path}: not an analysis file")
+    body = np.frombuffer(payload, dtype=np.uint8, offset=_HEADER.size)
+    return {
+        'spectrogram': body[:bands * columns].reshape(columns, bands),
+        'rms': body[bands * columns:bands * columns + length] / 255.0,
+        'peak': body[bands * columns + length:] / 255.0,
+        'envelopeRate': rate,
+        'rmsLevel': rms_level,
+        'peakLevel': peak_level,
+    }
+
+
+def analyze_file(src, out_path, force=False):
+    """
+    Analyse src into out_path unless that is already newer than src
+    Returns the manifest summary plus 'file'
+    """
+    src, out_path = Path(src), Path(out_path)
+    reuse = (not force and out_path.exists()
+             and out_path.stat().st_mtime_ns >= src.stat().st_mtime_ns)
+    if reuse:
+        try:
+            result = read_analysis(out_path)
+        except ValueError:
+            reuse = False
+    if reuse:
+        size = out_path.stat().st_size
+    else:
+        result = analyze(PcmStream(src))
+        size = write_analysis(out_path, result)
+    return {
+        'melBands': int(result['spectrogram'].shape[1]),
+        'columns': int(result['spectrogram'].shape[0]),
+        'envelopeRate': round(float(result['envelopeRate']), 3),
+        'envelopeLength': int(len(result['rms'])),
+        'rmsLevel': round(result['rmsLevel'], 4),
+        'peakLevel': round(result['peakLevel'], 4),
+        'bytes': size,
+        'file': str(out_path),
+    }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    for path in sys.argv[1:]:
+        result = analyze(PcmStream(path))
+        print(f"{path}: {result['spectrogram'].shape[0]}x{result['spectrogram'].shape[1]} mel thumbnail, "
+              f"{len(result['rms'])} envelope values at {result['envelopeRate']:.1f}/s, "
+              f"RMS {result['rmsLevel']:.3f}, peak {result['peakLevel']:.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Streaming PCM decoder for the audio build stages
+WAV files are read with the standard library; anything else (MP3, Ogg, M4A)
+is decoded by an ffmpeg subprocess piping raw float32. Either way the audio
+arrives as NumPy blocks of a fixed number of frames, so memory stays bounded
+however long the recording is
+
+Usage:
+  python3 audio_decode.py public/audio/ambient/temple_bells.wav
+"""
+
+import shutil
+import subprocess
+import sys
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from audio_probe import probe_audio
+
+# Frames per block handed to consumers (about 1.5 s at 44.1 kHz)
+BLOCK_FRAMES = 65536
+# Output format when the container does not say (non-MP3 compressed files)
+DEFAULT_SAMPLE_RATE = 44100
+DEFAULT_CHANNELS = 2
+
+FFMPEG = shutil.which('ffmpeg')
+
+
+class DecodeError(ValueError):
+    """The file could not be decoded (corrupt, unsupported, or no ffmpeg)"""
+
+
+def _wav_samples(raw, sample_width):
+    """Interleaved WAV sample bytes as float32 in [-1, 1]"""
+    if sample_width == 1:
+        return (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    if sample_width == 2:
+        return np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768
+    if sample_width == 3:
+        # Sign-extend 24-bit little-endian samples through the top of an int32
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        return ((b[:, 0] << 8 | b[:, 1] << 16 | b[:, 2] << 24) >> 8).astype(np.float32) / 8388608
+    if sample_width == 4:
+        return np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648
+    raise DecodeError(f"unsupported WAV sample width: {sample_width} bytes")
+
+
+class PcmStream:
+    """
+    Decoded audio of one file, iterated as float32 arrays of shape (frames, channels)
+    sample_rate and channels describe the blocks, not necessarily the source
+    """
+
+    def __init__(self, path, block_frames=BLOCK_FRAMES):
+        self.path = Path(path)
+        self.block_frames = block_frames
+        self.is_wav = self.path.suffix.lower() == '.wav'
+        try:
+            info = probe_audio(self.path)
+        except ValueError as e:
+            raise DecodeError(str(e)) from e
+        self.sample_rate = info.get('sampleRate') or DEFAULT_SAMPLE_RATE
+        self.channels = info.get('channels') or DEFAULT_CHANNELS
+        if not self.is_wav and FFMPEG is None:
+            raise DecodeError(f"{self.path.name}: decoding {self.path.suffix} needs ffmpeg on PATH")
+
+    def __iter__(self):
+        return self._wav_blocks() if self.is_wav else self._ffmpeg_blocks()
+
+    def _wav_blocks(self):
+        try:
+            with wave.open(str(self.path), 'rb') as w:
+                width = w.getsampwidth()
+                while True:
+                    raw = w.readframes(self.block_frames)
+                    if not raw:
+                        break
+                    yield _wav_samples(raw, width).reshape(-1, self.channels)
+        except (wave.Error, EOFError) as e:
+            raise DecodeError(f"{self.path.name}: {e}") from e
+
+    def _ffmpeg_blocks(self):
+        command = [FFMPEG, '-v', 'error', '-nostdin', '-i', str(self.path),
+                   '-f', 'f32le', '-acodec', 'pcm_f32le',
+                   '-ar', str(self.sample_rate), '-ac', str(self.channels), '-']
+        block_bytes = self.block_frames * self.channels * 4
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        finished = False
+        try:
+            while True:
+                raw = process.stdout.read(block_bytes)
+                if not raw:
+                    break
+                usable = len(raw) - len(raw) % (self.channels * 4)
+                yield np.frombuffer(raw[:usable], dtype='<f4').reshape(-1, self.channels)
+            finished = True
+        finally:
+            if not finished:
+                process.kill()  # consumer stopped early
+            process.stdout.close()
+            stderr = process.stderr.read()
+            process.stderr.close()
+            if process.wait() != 0 and finished:
+                raise DecodeError(f"{self.path.name}: ffmpeg failed: {stderr.decode(errors='replace').strip()}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    failed = 0
+    for path in sys.argv[1:]:
+        frames = 0
+        peak = 0.0
+        try:
+            stream = PcmStream(path)
+            for block in stream:
+                frames += len(block)
+                peak = max(peak, float(np.abs(block).max(initial=0)))
+        except DecodeError as e:
+            failed += 1
+            print(f"❌ {e}")
+            continue
+        print(f"{path}: {frames} frames, {stream.sample_rate} Hz, {stream.channels} ch, "
+              f"{frames / stream.sample_rate:.3f}s, peak {peak:.3f}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Shared plumbing for the audio build stages
+Every stage walks the entries of public/audio/manifest.json, works on the
+file each entry actually serves, writes its outputs under a directory of
+public/audio the manifest walk skips, and records them back in the entry
+
+Usage:
+  python3 audio_library.py
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+PUBLIC_DIR = SCRIPT_DIR.parent / 'public'
+AUDIO_DIR = PUBLIC_DIR / 'audio'
+MANIFEST_FILE = AUDIO_DIR / 'manifest.json'
+
+
+def public_url(path):
+    return '/' + Path(path).resolve().relative_to(PUBLIC_DIR.resolve()).as_posix()
+
+
+def load_manifest():
+    if MANIFEST_FILE.exists():
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"version": "1.0", "lastUpdated": None, "audio": {}}
+
+
+def save_manifest(manifest):
+    """Write the manifest atomically"""
+    manifest["lastUpdated"] = datetime.now().isoformat()
+    tmp_path = MANIFEST_FILE.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+
+def source_file(entry):
+    """The file actually served for an entry: the .wav stand-in of a missing .mp3, else path"""
+    url = entry.get("fallbackPath") or entry.get("path", "")
+    return PUBLIC_DIR / url.lstrip('/')
+
+
+def manifest_entries(manifest):
+    """(category, name, entry) for every entry of the manifest"""
+    return [(category, name, entry)
+            for category, entries in manifest.get("audio", {}).items()
+            for name, entry in entries.items()]
+
+
+def has_source(entry):
+    return bool(entry.get("exists")) and source_file(entry).is_file()
+
+
+def output_base(entry, out_dir):
+    """out_dir/<path of the source relative to public/audio, without suffix>; parents are created"""
+    rel = source_file(entry).resolve().relative_to(AUDIO_DIR.resolve())
+    base = Path(out_dir) / rel.parent / rel.stem
+    base.parent.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def prune_outputs(out_dir, keep, pattern='*'):
+    """Delete files under out_dir matching pattern that are not in keep; returns the count"""
+    removed = 0
+    for path in Path(out_dir).rglob(pattern):
+        if path.is_file() and str(path) not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def main():
+    entries = manifest_entries(load_manifest())
+    present = [entry for _, _, entry in entries if has_source(entry)]
+    print(f"🎵 {len(entries)} manifest entries, {len(present)} with a file on disk")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Gapless loop extraction for the soundscape mixer stems
+A loop is cut from the head of a stem so that its end runs straight back
+into its start. Rhythmic stems are measured for tempo (onset-envelope
+autocorrelation) and cut to a whole number of bars starting just before a
+beat; ambient textures with no clear pulse are cut to MAX_LOOP_SECONDS.
+Both ends sit on rising zero crossings, the end is slid to where the
+waveform best matches the start, and a short crossfade from the audio just
+past the end is baked into the head, so the loop repeats without a click.
+Decoding goes through audio_decode.PcmStream, whose ffmpeg path already
+drops the encoder delay and padding named in the MP3's LAME tag; leading
+silence (untagged encoder padding included) is trimmed as well. Loops are
+written as 16-bit WAV, since a lossy re-encode would add padding back
+
+Usage:
+  python3 audio_loops.py public/audio/instruments/dappu_beat.mp3
+"""
+
+import hashlib
+import json
+import os
+import sys
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from audio_decode import PcmStream
+from audio_library import AUDIO_DIR
+
+LOOPS_DIR = AUDIO_DIR / 'loops'
+
+MAX_LOOP_SECONDS = 8.0
+MIN_LOOP_SECONDS = 1.0
+ANALYSIS_SECONDS = 30.0    # decoded from the head of each stem
+SILENCE_DB = -60.0         # below this a sample counts as silence when trimming
+HOP = 512                  # onset envelope resolution in samples
+FRAME = 1024
+TEMPO_RANGE = (60, 180)    # BPM considered when looking for a pulse
+BEAT_CONFIDENCE = 0.3      # autocorrelation needed to call a stem rhythmic
+BEATS_PER_BAR = 4
+PRE_ROLL = 0.01            # seconds kept before the first beat's transient
+ZERO_CROSSING_WINDOW = 0.002
+MATCH_WINDOW = 2048        # samples compared when sliding the loop end
+BEAT_CROSSFADE = 0.005
+TEXTURE_CROSSFADE = 0.5
+
+
+class LoopError(ValueError):
+    """No usable loop could be cut from the file"""
+
+
+def read_head(path, seconds=ANALYSIS_SECONDS):
+    """(float32 samples of shape (frames, channels), sample rate) for the first `seconds` of a file"""
+    stream = PcmStream(path)
+    wanted = int(seconds * stream.sample_rate)
+    blocks = []
+    total = 0
+    for block in stream:
+        blocks.append(block)
+        total += len(block)
+        if total >= wanted:
+            break
+    if not blocks:
+        raise LoopError(f"{Path(path).name}: no audio")
+    return np.concatenate(blocks)[:wanted], stream.sample_rate
+
+
+def trim_silence(mono, threshold_db=SILENCE_DB):
+    """(first, last + 1) sample index of non-silent audio"""
+    loud = np.flatnonzero(np.abs(mono) > 10 ** (threshold_db / 20))
+    if len(loud) == 0:
+        return 0, 0
+    return int(loud[0]), int(loud[-1]) + 1
+
+
+def onset_envelope(mono):
+    """Half-wave rectified spectral flux per HOP samples, local mean removed"""
+    count = 1 + (len(mono) - FRAME) // HOP
+    if count < 2:
+        return np.zeros(max(count, 0), dtype=np.float32)
+    frames = np.lib.stride_tricks.as_strided(
+        mono, shape=(count, FRAME), strides=(mono.strides[0] * HOP, mono.strides[0]))
+    spectrum = np.log1p(100 * np.abs(np.fft.rfft(frames * np.hanning(FRAME), axis=1)))
+    flux = np.maximum(np.diff(spectrum, axis=0), 0).sum(axis=1)
+    flux = np.concatenate([[0.0], flux])
+    local = np.convolve(flux, np.ones(16) / 16, mode='same')
+    return np.maximum(flux - local, 0)
+
+
+def estimate_tempo(envelope, rate):
+    """(beat period in samples, confidence 0..1) from the envelope's autocorrelation; (None, 0) if flat"""
+    envelope = envelope - envelope.mean()
+    energy = float(np.dot(envelope, envelope))
+    if energy <= 0:
+        return None, 0.0
+    shortest = int(60 * rate / TEMPO_RANGE[1] / HOP)
+    longest = int(np.ceil(60 * rate / TEMPO_RANGE[0] / HOP))
+    if longest + 2 >= len(envelope):
+        return None, 0.0
+    spectrum = np.fft.rfft(envelope, n=2 * len(envelope))
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum))[:longest + 2] / energy
+    lag = shortest + int(np.argmax(autocorr[shortest:longest + 1]))
+    # Parabolic interpolation between envelope frames
+    a, b, c = autocorr[lag - 1], autocorr[lag], autocorr[lag + 1]
+    shift = 0.5 * (a - c) / (a - 2 * b + c) if a - 2 * b + c != 0 else 0.0
+    return (lag + shift) * HOP, float(max(b, 0.0))
+
+
+def refine_lag(envelope, lag):
+    """Envelope autocorrelation peak nearest lag (in frames), to a fraction of a frame"""
+    envelope = envelope - envelope.mean()
+    center = int(round(lag))
+    lags = np.arange(max(center - 3, 1), min(center + 4, len(envelope) - 1))
+    if len(lags) < 3:
+        return lag
+    scores = np.array([np.dot(envelope[:-k], envelope[k:]) / (len(envelope) - k) for k in lags])
+    i = int(np.clip(np.argmax(scores), 1, len(lags) - 2))
+    a, b, c = scores[i - 1], scores[i], scores[i + 1]
+    shift = 0.5 * (a - c) / (a - 2 * b + c) if a - 2 * b + c != 0 else 0.0
+    return lags[i] + shift
+
+
+def transient_at(mono, position, window):
+    """First sample near position where the level reaches half of the window's peak"""
+    low = max(position - window, 0)
+    segment = np.abs(mono[low:position + window])
+    if len(segment) == 0:
+        return position
+    return low + int(np.argmax(segment >= 0.5 * segment.max()))
+
+
+def rising_zero_crossing(mono, position, window):
+    """Nearest index to position where the signal crosses zero going up, or position if none within window"""
+    low = max(position - window, 1)
+    high = min(position + window, len(mono) - 1)
+    if high <= low:
+        return position
+    segment = mono[low - 1:high]
+    crossings = np.flatnonzero((segment[:-1] < 0) & (segment[1:] >= 0)) + low
+    if len(crossings) == 0:
+        return position
+    return int(crossings[np.argmin(np.abs(crossings - position))])
+
+
+def match_end(mono, start, end, search):
+    """The end within +-search samples of `end` where the waveform best repeats the one at start"""
+    width = min(MATCH_WINDOW, len(mono) - end - search)
+    if width <= 0 or end - search <= start:
+        return end
+    reference = mono[start:start + width]
+    region = mono[end - search:end + search + width]
+    scores = np.correlate(region, reference, mode='valid')
+    power = np.convolve(region ** 2, np.ones(width), mode='valid')
+    scores = scores / np.sqrt(np.maximum(power, 1e-12))
+    return end - search + int(np.argmax(scores))
+
+
+def find_loop(samples, rate, max_seconds=MAX_LOOP_SECONDS):
+    """
+    Loop points in a decoded head: {'startSample', 'endSample', 'mode',
+    'tempo', 'beats', 'crossfadeSamples'}; the audio from endSample to
+    endSample + crossfadeSamples is what gets blended into the head
+    """
+    mono = samples.mean(axis=1).astype(np.float32)
+    first, last = trim_silence(mono)
+    if last - first < MIN_LOOP_SECONDS * rate:
+        raise LoopError("silent or too short to loop")
+
+    envelope = onset_envelope(np.concatenate([np.zeros(FRAME, dtype=np.float32), mono[first:last]]))
+    period, confidence = estimate_tempo(envelope, rate)
+    zc_window = int(ZERO_CROSSING_WINDOW * rate)
+    available = last - first
+    beats = 0
+    if period and confidence >= BEAT_CONFIDENCE:
+        crossfade = int(BEAT_CROSSFADE * rate)
+        fit = int((min(max_seconds * rate, available - crossfade - period) // period))
+        beats = fit - fit % BEATS_PER_BAR if fit >= BEATS_PER_BAR else fit
+    if beats >= 1 and beats * period >= MIN_LOOP_SECONDS * rate:
+        mode = 'beat'
+        # Start on the strongest onset of the first bar, a little before its transient;
+        # envelope frames are offset by the FRAME of padding in front of the audio
+        bar = envelope[:int(BEATS_PER_BAR * period / HOP) + FRAME // HOP + 1]
+        onset = first + max(int(np.argmax(bar)) * HOP - FRAME // 2, 0)
+        onset = transient_at(mono, onset, FRAME)
+        start = max(first, onset - int(PRE_ROLL * rate))
+        # Measuring the whole loop's lag at once keeps tempo error from adding up beat by beat
+        length = int(round(refine_lag(envelope, beats * period / HOP) * HOP))
+        if start + length + crossfade + zc_window + MATCH_WINDOW > last:
+            start = first
+        search = max(HOP, zc_window)
+    else:
+        mode = 'texture'
+        beats = 0
+        crossfade = min(int(TEXTURE_CROSSFADE * rate), available // 4)
+        start = first
+        length = int(min(max_seconds * rate, available - crossfade - MATCH_WINDOW))
+        search = int(0.05 * rate)
+    if length < MIN_LOOP_SECONDS * rate:
+        raise LoopError("not enough audio for a loop")
+
+    start = rising_zero_crossing(mono, start, zc_window)
+    search = min(search, max(last - (start + length) - crossfade - MATCH_WINDOW, 0))
+    end = match_end(mono, start, start + length, search)
+    end = rising_zero_crossing(mono, end, zc_window)
+    crossfade = min(crossfade, len(mono) - end)
+    return {
+        'startSample': int(start),
+        'endSample': int(end),
+        'mode': mode,
+        'tempo': round(float(60 * rate / period), 2) if mode == 'beat' else None,
+        'beats': beats,
+        'crossfadeSamples': int(crossfade),
+    }
+
+
+def render_loop(samples, loop, gain_db=0.0):
+    """16-bit PCM of the loop with the tail crossfaded into the head and gain_db applied"""
+    start, end, fade = loop['startSample'], loop['endSample'], loop['crossfadeSamples']
+    body = samples[start:end].astype(np.float64)
+    if fade:
+        t = np.linspace(0, 1, fade, endpoint=False)[:, None]
+        tail = samples[end:end + fade].astype(np.float64)
+        if loop['mode'] == 'beat':
+            fade_in, fade_out = t, 1 - t
+        else:
+            # Equal power: the two ends of a texture are uncorrelated
+            fade_in, fade_out = np.sin(t * np.pi / 2), np.cos(t * np.pi / 2)
+        body[:fade] = body[:fade] * fade_in + tail * fade_out
+    body *= 10 ** (gain_db / 20)
+    return np.clip(np.round(body * 32767), -32768, 32767).astype('<i2')
+
+
+def write_wav(path, pcm, rate):
+    """Write interleaved int16 PCM atomically; returns the size in bytes"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.part')
+    with wave.open(str(tmp_path), 'wb') as w:
+        w.setnchannels(pcm.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+    os.replace(tmp_path, path)
+    return path.stat().st_size
+
+
+def loop_path(out_base, sha256, gain_db, max_seconds):
+    """<out_base>.<key>.wav, key covering the source bytes, the gain and the loop settings"""
+    key = hashlib.sha256(json.dumps([sha256, gain_db, max_seconds, BEAT_CONFIDENCE,
+                                     BEAT_CROSSFADE, TEXTURE_CROSSFADE]).encode()).hexdigest()
+    return Path(f"{out_base}.{key[:12]}.wav")
+
+
+def process_file(src, sha256, out_base, gain_db=0.0, max_seconds=MAX_LOOP_SECONDS):
+    """
+    Find the loop of src and write it next to out_base
+    Returns find_loop's fields plus 'sampleRate', 'channels', 'bytes' and 'file'
+    """
+    samples, rate = read_head(src, max(ANALYSIS_SECONDS, 2 * max_seconds))
+    loop = find_loop(samples, rate, max_seconds)
+    out_path = loop_path(out_base, sha256, gain_db, max_seconds)
+    size = write_wav(out_path, render_loop(samples, loop, gain_db), rate)
+    return {**loop, 'sampleRate': rate, 'channels': samples.shape[1], 'bytes': size, 'file': str(out_path)}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    failed = 0
+    for path in sys.argv[1:]:
+        try:
+            samples, rate = read_head(path)
+            loop = find_loop(samples, rate)
+        except ValueError as e:
+            failed += 1
+            print(f"❌ {path}: {e}")
+            continue
+        seconds = (loop['endSample'] - loop['startSample']) / rate
+        tempo = f", {loop['tempo']} BPM x {loop['beats']} beats" if loop['tempo'] else ''
+        print(f"{path}: {loop['mode']} loop {loop['startSample']}-{loop['endSample']} "
+              f"({seconds:.3f}s{tempo})")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
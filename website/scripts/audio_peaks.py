@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Multi-resolution waveform peaks for the audio library
+A file is decoded once in streaming blocks (see audio_decode.py) into min/max
+pairs at the finest level; coarser levels are reduced from those, so memory
+depends on the peak count, never on the recording length. Each level is
+written in the audiowaveform .dat v1 layout (20-byte little-endian header,
+then interleaved int8 or int16 min/max), which waveform-data.js and peaks.js
+read as-is
+
+Usage:
+  python3 audio_peaks.py public/audio/ambient/temple_bells.wav
+"""
+
+import os
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from audio_decode import PcmStream
+from audio_library import AUDIO_DIR
+
+PEAKS_DIR = AUDIO_DIR / 'peaks'
+
+# Samples per peak, finest first; every level must be a multiple of the first
+PEAK_LEVELS = (256, 1024, 4096)
+PEAK_BITS = 8
+
+DAT_VERSION = 1
+_DAT_HEADER = struct.Struct('<iIiiI')  # version, flags, sample rate, samples per peak, length
+_FLAG_8BIT = 1
+
+
+def compute_peaks(blocks, samples_per_peak):
+    """
+    (mins, maxs) float32 arrays, one pair per samples_per_peak frames of the
+    (frames, channels) blocks; channels are folded together, a short last
+    bucket gets its own pair
+    """
+    mins, maxs = [], []
+    carry_lo = carry_hi = np.empty(0, dtype=np.float32)
+    for block in blocks:
+        lo = np.concatenate((carry_lo, block.min(axis=1)))
+        hi = np.concatenate((carry_hi, block.max(axis=1)))
+        whole = len(lo) - len(lo) % samples_per_peak
+        mins.append(lo[:whole].reshape(-1, samples_per_peak).min(axis=1))
+        maxs.append(hi[:whole].reshape(-1, samples_per_peak).max(axis=1))
+        carry_lo, carry_hi = lo[whole:], hi[whole:]
+    if len(carry_lo):
+        mins.append(carry_lo.min(keepdims=True))
+        maxs.append(carry_hi.max(keepdims=True))
+    if not mins:
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+    return np.concatenate(mins), np.concatenate(maxs)
+
+
+def coarsen(mins, maxs, factor):
+    """Merge every `factor` neighbouring peaks into one"""
+    if not len(mins):
+        return mins, maxs
+    starts = np.arange(0, len(mins), factor)
+    return np.minimum.reduceat(mins, starts), np.maximum.reduceat(maxs, starts)
+
+
+def quantize(values, bits):
+    scale = 127 if bits == 8 else 32767
+    dtype = np.int8 if bits == 8 else np.int16
+    return np.clip(np.round(values * scale), -scale - 1, scale).astype(dtype)
+
+
+def write_dat(path, sample_rate, samples_per_peak, mins, maxs, bits=PEAK_BITS):
+    """Write one level atomically; returns its size in bytes"""
+    path = Path(path)
+    data = np.empty(len(mins) * 2, dtype=np.int8 if bits == 8 else '<i2')
+    data[0::2] = quantize(mins, bits)
+    data[1::2] = quantize(maxs, bits)
+    header = _DAT_HEADER.pack(DAT_VERSION, _FLAG_8BIT if bits == 8 else 0,
+                              sample_rate, samples_per_peak, len(mins))
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(data.tobytes())
+    os.replace(tmp_path, path)
+    return _DAT_HEADER.size + data.nbytes
+
+
+def read_dat_header(path):
+    """{'bits', 'sampleRate', 'samplesPerPeak', 'length'} of a .dat file, or None if unreadable"""
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read(_DAT_HEADER.size)
+    except OSError:
+        return None
+    if len(raw) < _DAT_HEADER.size:
+        return None
+    version, flags, sample_rate, samples_per_peak, length = _DAT_HEADER.unpack(raw)
+    if version != DAT_VERSION:
+        return None
+    return {'bits': 8 if flags & _FLAG_8BIT else 16, 'sampleRate': sample_rate,
+            'samplesPerPeak': samples_per_peak, 'length': length}
+
+
+def build_peaks(src, out_base, levels=PEAK_LEVELS, bits=PEAK_BITS, force=False):
+    """
+    Write <out_base>-<samples per peak>.dat for every level of src
+    Levels newer than the source at the same bit depth are reused.
+    Returns {'sampleRate', 'bits', 'levels': [{samplesPerPeak, length, bytes, file}]}
+    """
+    src = Path(src)
+    levels = sorted(levels)
+    if any(level % levels[0] for level in levels):
+        raise ValueError(f"peak levels {levels} must be multiples of {levels[0]}")
+    outputs = [Path(f"{out_base}-{level}.dat") for level in levels]
+    src_mtime = src.stat().st_mtime_ns
+
+    headers = [read_dat_header(path) for path in outputs]
+    fresh = not force and all(
+        header and header['bits'] == bits and path.stat().st_mtime_ns >= src_mtime
+        for path, header in zip(outputs, headers))
+
+    if fresh:
+        sample_rate = headers[0]['sampleRate']
+        written = [(path, header['length'], path.stat().st_size) for path, header in zip(outputs, headers)]
+    else:
+        stream = PcmStream(src)
+        sample_rate = stream.sample_rate
+        mins, maxs = compute_peaks(stream, levels[0])
+        written = []
+        previous = levels[0]
+        for level, path in zip(levels, outputs):
+            mins, maxs = coarsen(mins, maxs, level // previous)
+            previous = level
+            written.append((path, len(mins), write_dat(path, sample_rate, level, mins, maxs, bits)))
+
+    return {
+        'sampleRate': sample_rate,
+        'bits': bits,
+        'levels': [{'samplesPerPeak': level, 'length': length, 'bytes': size, 'file': str(path)}
+                   for level, (path, length, size) in zip(levels, written)],
+    }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    for path in sys.argv[1:]:
+        mins, maxs = compute_peaks(PcmStream(path), PEAK_LEVELS[0])
+        print(f"{path}: {len(mins)} peaks at {PEAK_LEVELS[0]} samples/peak, "
+              f"range {mins.min(initial=0):.3f}..{maxs.max(initial=0):.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
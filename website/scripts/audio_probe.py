@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Dependency-free audio probing for the manifest stage
+Walks MP3 frame headers (skipping ID3v2, reading the Xing/Info and LAME tags
+for frame count and encoder delay/padding) and reads WAV headers, so
+duration, sample rate and frame offsets are known without decoding
+
+Usage:
+  python3 audio_probe.py public/audio/karnataka-kriti.mp3
+"""
+
+import json
+import sys
+import wave
+from pathlib import Path
+
+# MPEG audio header tables (Layer III only - everything we serve is MP3)
+_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],   # MPEG-1
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],       # MPEG-2 / 2.5
+}
+_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+class Mp3Frame:
+    """One MPEG-1/2/2.5 Layer III frame header"""
+
+    __slots__ = ('offset', 'length', 'version', 'bitrate', 'sample_rate', 'channels', 'samples')
+
+    def __init__(self, offset, length, version, bitrate, sample_rate, channels, samples):
+        self.offset = offset
+        self.length = length
+        self.version = version
+        self.bitrate = bitrate
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.samples = samples
+
+
+def parse_frame_header(data, offset):
+    """Mp3Frame for a header at data[offset], or None if there is no valid one"""
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    version_bits = (b1 >> 3) & 3
+    layer_bits = (b1 >> 1) & 3
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 3
+    if version_bits == 1 or layer_bits != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1 = version_bits == 3
+    bitrate = _BITRATES[1 if mpeg1 else 2][bitrate_index]
+    sample_rate = _SAMPLE_RATES[version_bits][rate_index]
+    padding = (b2 >> 1) & 1
+    length = (144000 if mpeg1 else 72000) * bitrate // sample_rate + padding
+    channels = 1 if b3 >> 6 == 3 else 2
+    return Mp3Frame(offset, length, version_bits, bitrate, sample_rate, channels, 1152 if mpeg1 else 576)
+
+
+def id3v2_size(data):
+    """Bytes taken by a leading ID3v2 tag (0 if none)"""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _info_tag(data, frame):
+    """Xing/Info header of the first frame: {'frames', 'delay', 'padding'} or None"""
+    mpeg1 = frame.version == 3
+    side_info = (32 if frame.channels == 2 else 17) if mpeg1 else (17 if frame.channels == 2 else 9)
+    pos = frame.offset + 4 + side_info
+    if data[pos:pos + 4] not in (b'Xing', b'Info'):
+        return None
+    flags = int.from_bytes(data[pos + 4:pos + 8], 'big')
+    pos += 8
+    tag = {'frames': None, 'delay': 0, 'padding': 0}
+    if flags & 1:
+        tag['frames'] = int.from_bytes(data[pos:pos + 4], 'big')
+        pos += 4
+    if flags & 2:
+        pos += 4
+    if flags & 4:
+        pos += 100
+    if flags & 8:
+        pos += 4
+    # LAME extension: encoder delay and padding share 3 bytes at offset 21
+    if data[pos:pos + 4] == b'LAME' or data[pos:pos + 4] == b'Lavf' or data[pos:pos + 4] == b'Lavc':
+        raw = data[pos + 21:pos + 24]
+        if len(raw) == 3:
+            tag['delay'] = raw[0] << 4 | raw[1] >> 4
+            tag['padding'] = (raw[1] & 0x0F) << 8 | raw[2]
+    return tag
+
+
+def mp3_frames(data):
+    """
+    Audio frames of an MP3 as Mp3Frame objects plus the info tag (or None)
+    The Xing/Info frame itself carries no audio and is not yielded
+    """
+    offset = id3v2_size(data)
+    frames = []
+    info = None
+    resync_limit = offset + 64 * 1024  # garbage before the first frame
+    while offset < len(data):
+        frame = parse_frame_header(data, offset)
+        # Accept a header only when another one (or the end of file) follows it
+        if frame and (offset + frame.length >= len(data) - 128 or parse_frame_header(data, offset + frame.length)):
+            if not frames and info is None:
+                info = _info_tag(data, frame)
+                if info is not None:
+                    offset += frame.length
+                    continue
+            frames.append(frame)
+            offset += frame.length
+        elif data[offset:offset + 3] == b'TAG' and frames:
+            break  # ID3v1 trailer
+        elif not frames and offset >= resync_limit:
+            break
+        else:
+            offset = data.find(b'\xff', offset + 1)
+            if offset < 0:
+                break
+    return frames, info
+
+
+def probe_mp3(path):
+    """Duration, format and frame layout of an MP3 file"""
+    data = Path(path).read_bytes()
+    frames, info = mp3_frames(data)
+    if not frames:
+        raise ValueError(f"no MPEG audio frames in {path}")
+    first = frames[0]
+    delay = info['delay'] if info else 0
+    padding = info['padding'] if info else 0
+    samples = sum(f.samples for f in frames) - delay - padding
+    audio_bytes = sum(f.length for f in frames)
+    return {
+        'format': 'mp3',
+        'duration': round(max(samples, 0) / first.sample_rate, 3),
+        'sampleRate': first.sample_rate,
+        'channels': first.channels,
+        'bitrate': round(audio_bytes * 8 / (sum(f.samples for f in frames) / first.sample_rate) / 1000),
+        'frames': len(frames),
+        'encoderDelay': delay,
+        'encoderPadding': padding,
+    }
+
+
+def probe_wav(path):
+    with wave.open(str(path), 'rb') as w:
+        rate = w.getframerate()
+        return {
+            'format': 'wav',
+            'duration': round(w.getnframes() / rate, 3) if rate else 0,
+            'sampleRate': rate,
+            'channels': w.getnchannels(),
+        }
+
+
+def probe_audio(path):
+    """Format metadata for an audio file; raises ValueError when it cannot be parsed"""
+    suffix = Path(path).suffix.lower()
+    try:
+        if suffix == '.mp3':
+            return probe_mp3(path)
+        if suffix == '.wav':
+            return probe_wav(path)
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"{path}: {e}") from e
+    return {'format': suffix.lstrip('.')}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    for path in sys.argv[1:]:
+        print(f"{path}: {json.dumps(probe_audio(path))}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Segment index and HLS playlist for MP3 files, without re-encoding
+MP3 is a sequence of self-contained frames, so cutting at frame boundaries
+gives segments that decode on their own. Segments are byte ranges of the
+original file (found with audio_probe.mp3_frames): the index lets a player
+fetch just the ranges it needs, and the playlist exposes the same ranges as
+an HLS VOD playlist with EXT-X-BYTERANGE. Nothing is copied or re-encoded
+
+Usage:
+  python3 audio_segments.py public/audio/karnataka-kriti.mp3
+"""
+
+import math
+import os
+import sys
+from pathlib import Path
+
+from audio_library import AUDIO_DIR
+from audio_probe import mp3_frames
+
+SEGMENTS_DIR = AUDIO_DIR / 'segments'
+SEGMENT_SECONDS = 6.0
+MIME_TYPE = 'audio/mpeg'
+
+
+def segment_mp3(path, seconds=SEGMENT_SECONDS):
+    """
+    [{'offset', 'length', 'time', 'duration'}] covering every audio frame of an MP3
+    Each segment runs to the first frame boundary at or after `seconds` of audio;
+    times are in decoded samples, before encoder delay is trimmed
+    """
+    frames, _ = mp3_frames(Path(path).read_bytes())
+    if not frames:
+        raise ValueError(f"no MPEG audio frames in {path}")
+    rate = frames[0].sample_rate
+    target = seconds * rate
+    segments = []
+    start = frames[0]
+    samples = elapsed = 0
+    for frame, following in zip(frames, frames[1:] + [None]):
+        samples += frame.samples
+        contiguous = following is not None and following.offset == frame.offset + frame.length
+        if samples >= target or following is None or not contiguous:
+            segments.append({
+                'offset': start.offset,
+                'length': frame.offset + frame.length - start.offset,
+                'time': round(elapsed / rate, 6),
+                'duration': round(samples / rate, 6),
+            })
+            elapsed += samples
+            samples = 0
+            start = following
+    return segments
+
+
+def write_playlist(path, media_url, segments):
+    """Write an HLS VOD playlist of byte ranges into media_url; returns its size in bytes"""
+    path = Path(path)
+    lines = [
+        '#EXTM3U',
+        '#EXT-X-VERSION:4',
+        f"#EXT-X-TARGETDURATION:{math.ceil(max(s['duration'] for s in segments))}",
+        '#EXT-X-PLAYLIST-TYPE:VOD',
+        '#EXT-X-MEDIA-SEQUENCE:0',
+    ]
+    for segment in segments:
+        lines.append(f"#EXTINF:{segment['duration']:.6f},")
+        lines.append(f"#EXT-X-BYTERANGE:{segment['length']}@{segment['offset']}")
+        lines.append(media_url)
+    lines.append('#EXT-X-ENDLIST')
+    data = ('\n'.join(lines) + '\n').encode('utf-8')
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    for path in sys.argv[1:]:
+        segments = segment_mp3(path)
+        first = segments[0]
+        print(f"{path}: {len(segments)} segments of ~{SEGMENT_SECONDS:g}s, "
+              f"first is bytes {first['offset']}-{first['offset'] + first['length'] - 1}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Audio sprites: one file per region holding all of its mixer loops
+The loops written by build-audio-loops.py are packed end to end, with a
+short gap of silence between them so resampling in the browser never bleeds
+one stem into the next. The index gives every stem's place in the sprite in
+samples and in milliseconds (Howler's sprite format), so the mixer makes one
+request and one decode per region instead of one per stem. Sprites are
+16-bit WAV like the loops they are cut from, so offsets stay sample exact
+
+Usage:
+  python3 audio_sprites.py public/audio/loops/instruments/*.wav
+"""
+
+import hashlib
+import json
+import sys
+import wave
+from collections import Counter
+
+import numpy as np
+
+from audio_library import AUDIO_DIR
+from audio_loops import write_wav
+
+SPRITES_DIR = AUDIO_DIR / 'sprites'
+GAP_SECONDS = 0.25
+MIN_STEMS = 2  # a sprite of one stem saves nothing
+
+
+def read_wav(path):
+    """(int16 samples of shape (frames, channels), sample rate) of a 16-bit WAV"""
+    with wave.open(str(path), 'rb') as w:
+        if w.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit PCM")
+        pcm = np.frombuffer(w.readframes(w.getnframes()), dtype='<i2')
+        return pcm.reshape(-1, w.getnchannels()), w.getframerate()
+
+
+def sprite_key(loop_paths):
+    """Hash naming a sprite; loop files are content-hashed, so their paths cover their audio"""
+    return hashlib.sha256(json.dumps([sorted(loop_paths), GAP_SECONDS]).encode()).hexdigest()[:12]
+
+
+def pack(stems):
+    """
+    Concatenate [(name, pcm, rate)] into one sprite
+    Stems at a sample rate other than the most common one are left out, mono
+    stems are widened to stereo when others are stereo. Returns
+    (pcm, rate, {name: {'startSample', 'lengthSamples', 'start', 'duration'}}, skipped names)
+    """
+    rate = Counter(r for _, _, r in stems).most_common(1)[0][0]
+    channels = max(pcm.shape[1] for _, pcm, r in stems if r == rate)
+    gap = np.zeros((int(GAP_SECONDS * rate), channels), dtype='<i2')
+    parts = []
+    index = {}
+    skipped = []
+    position = 0
+    for name, pcm, stem_rate in stems:
+        if stem_rate != rate:
+            skipped.append(name)
+            continue
+        if pcm.shape[1] != channels:
+            pcm = np.repeat(pcm[:, :1], channels, axis=1)
+        index[name] = {
+            'startSample': position,
+            'lengthSamples': len(pcm),
+            'start': round(position * 1000 / rate, 3),
+            'duration': round(len(pcm) * 1000 / rate, 3),
+        }
+        parts += [pcm, gap]
+        position += len(pcm) + len(gap)
+    return np.concatenate(parts[:-1]), rate, index, skipped
+
+
+def build_sprite(out_path, stems):
+    """Pack stems into out_path; returns (bytes, rate, channels, index, skipped)"""
+    pcm, rate, index, skipped = pack(stems)
+    size = write_wav(out_path, pcm, rate)
+    return size, rate, pcm.shape[1], index, skipped
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    stems = [(path, *read_wav(path)) for path in sys.argv[1:]]
+    pcm, rate, index, skipped = pack(stems)
+    print(f"{len(index)} stems, {len(pcm) / rate:.2f}s at {rate} Hz "
+          f"({pcm.nbytes / 1024:.0f} KB of PCM)")
+    for name in skipped:
+        print(f"⚠️  {name}: sample rate differs, left out")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
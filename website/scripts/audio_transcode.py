@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+EBU R128 loudness measurement and normalized web renditions
+Integrated loudness, loudness range and true peak come from ffmpeg's
+loudnorm analysis (ITU-R BS.1770 gating). Every rendition gets one static
+gain - towards TARGET_LUFS, but never pushing the true peak above
+TRUE_PEAK_LIMIT - so dynamics are untouched and stems mixed together sit
+at consistent levels. Measurements are cached by the source's SHA-256 and
+rendition filenames embed a hash of source and settings, so unchanged
+files are never measured or encoded twice
+
+Usage:
+  python3 audio_transcode.py public/audio/karnataka-kriti.mp3
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from audio_library import AUDIO_DIR
+
+SCRIPT_DIR = Path(__file__).parent
+RENDITIONS_DIR = AUDIO_DIR / 'renditions'
+CACHE_FILE = SCRIPT_DIR / '.loudness_cache.json'
+
+TARGET_LUFS = -16.0
+TRUE_PEAK_LIMIT = -1.0  # dBTP
+LOUDNESS_RANGE = 11.0   # only used to parameterize the loudnorm analysis pass
+
+# Output formats, preferred first; browsers play the first they support
+RENDITIONS = {
+    'opus': {
+        'suffix': '.opus',
+        'muxer': 'ogg',
+        'mime': 'audio/ogg; codecs=opus',
+        'bitrate': 64,
+        'codec': ['-c:a', 'libopus', '-vbr', 'on', '-ar', '48000'],
+    },
+    'aac': {
+        'suffix': '.m4a',
+        'muxer': 'ipod',
+        'mime': 'audio/mp4; codecs="mp4a.40.2"',
+        'bitrate': 96,
+        'codec': ['-c:a', 'aac', '-movflags', '+faststart'],
+    },
+}
+
+FFMPEG = shutil.which('ffmpeg')
+_JSON_BLOCK = re.compile(r'\{[^{}]*\}\s*$')
+
+
+class TranscodeError(RuntimeError):
+    """ffmpeg is missing or failed"""
+
+
+def _ffmpeg(args):
+    if FFMPEG is None:
+        raise TranscodeError("ffmpeg is not on PATH")
+    result = subprocess.run([FFMPEG, '-hide_banner', '-nostdin', '-nostats', *args],
+                            capture_output=True, text=True, errors='replace')
+    if result.returncode != 0:
+        raise TranscodeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else
+                             f"ffmpeg exited with {result.returncode}")
+    return result.stderr
+
+
+def _number(value):
+    """loudnorm prints numbers as strings, silence as '-inf'"""
+    value = float(value)
+    return None if math.isinf(value) or math.isnan(value) else value
+
+
+def parse_loudnorm(output):
+    """{'integrated', 'truePeak', 'lra', 'threshold'} from loudnorm's JSON summary"""
+    match = _JSON_BLOCK.search(output.strip())
+    if not match:
+        raise TranscodeError("no loudnorm summary in ffmpeg output")
+    data = json.loads(match.group(0))
+    return {
+        'integrated': _number(data['input_i']),
+        'truePeak': _number(data['input_tp']),
+        'lra': _number(data['input_lra']),
+        'threshold': _number(data['input_thresh']),
+    }
+
+
+def measure_loudness(path):
+    """EBU R128 measurement of a file (LUFS, dBTP, LU)"""
+    output = _ffmpeg(['-i', str(path), '-vn',
+                      '-af', f'loudnorm=I={TARGET_LUFS}:TP={TRUE_PEAK_LIMIT}:LRA={LOUDNESS_RANGE}'
+                             ':print_format=json',
+                      '-f', 'null', '-'])
+    return parse_loudnorm(output)
+
+
+def normalization_gain(loudness, target=TARGET_LUFS, peak_limit=TRUE_PEAK_LIMIT):
+    """Static gain in dB towards target, capped by the true-peak ceiling; 0 for silence"""
+    if loudness['integrated'] is None:
+        return 0.0
+    gain = target - loudness['integrated']
+    if loudness['truePeak'] is not None:
+        gain = min(gain, peak_limit - loudness['truePeak'])
+    return round(gain, 2)
+
+
+def rendition_path(out_base, sha256, fmt, gain_db):
+    """<out_base>.<key>.<suffix>, key covering the source bytes, the gain and the encoder settings"""
+    spec = RENDITIONS[fmt]
+    key = hashlib.sha256(json.dumps([sha256, gain_db, spec['bitrate'], spec['codec']]).encode()).hexdigest()
+    return Path(f"{out_base}.{key[:12]}{spec['suffix']}")
+
+
+def encode(src, out_path, fmt, gain_db):
+    """Apply gain_db and encode src to out_path atomically; returns the size in bytes"""
+    spec = RENDITIONS[fmt]
+    out_path = Path(out_path)
+    tmp_path = out_path.with_name(out_path.name + '.part')
+    _ffmpeg(['-y', '-i', str(src), '-vn', '-map_metadata', '-1',
+             '-af', f'volume={gain_db}dB', *spec['codec'], '-b:a', f"{spec['bitrate']}k",
+             '-f', spec['muxer'], str(tmp_path)])
+    os.replace(tmp_path, out_path)
+    return out_path.stat().st_size
+
+
+class LoudnessCache:
+    """source SHA-256 -> loudness measurement, persisted as JSON next to the scripts"""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('entries', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, sha256):
+        with self.lock:
+            return self.entries.get(sha256)
+
+    def put(self, sha256, loudness):
+        with self.lock:
+            self.entries[sha256] = loudness
+
+    def save(self, keep=None):
+        """Write the cache atomically; with keep, forget hashes not in it"""
+        with self.lock:
+            entries = self.entries if keep is None else {k: v for k, v in self.entries.items() if k in keep}
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'entries': entries}, f)
+            os.replace(tmp_path, self.path)
+
+
+def process_file(src, sha256, out_base, formats, cache, target=TARGET_LUFS, peak_limit=TRUE_PEAK_LIMIT):
+    """
+    Measure (or reuse the cached measurement of) src and encode the missing renditions
+    Returns {'loudness', 'gainDb', 'renditions': [{format, mime, bitrate, bytes, file}]}
+    """
+    loudness = cache.get(sha256)
+    if loudness is None:
+        loudness = measure_loudness(src)
+        cache.put(sha256, loudness)
+    gain_db = normalization_gain(loudness, target, peak_limit)
+
+    renditions = []
+    for fmt in formats:
+        out_path = rendition_path(out_base, sha256, fmt, gain_db)
+        size = out_path.stat().st_size if out_path.exists() else encode(src, out_path, fmt, gain_db)
+        spec = RENDITIONS[fmt]
+        renditions.append({'format': fmt, 'mime': spec['mime'], 'bitrate': spec['bitrate'],
+                           'bytes': size, 'file': str(out_path)})
+    return {'loudness': loudness, 'gainDb': gain_db, 'renditions': renditions}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    failed = 0
+    for path in sys.argv[1:]:
+        try:
+            loudness = measure_loudness(path)
+        except TranscodeError as e:
+            failed += 1
+            print(f"❌ {path}: {e}")
+            continue
+        print(f"{path}: {loudness['integrated']} LUFS, {loudness['truePeak']} dBTP, "
+              f"LRA {loudness['lra']} LU -> gain {normalization_gain(loudness):+.2f} dB")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
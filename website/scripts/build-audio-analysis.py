@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Precompute spectral and loudness fingerprints for every file in the audio manifest
+Each file gets a mel spectrogram thumbnail and an RMS/peak envelope in one
+gzip-compressed sidecar in public/audio/analysis/ (see audio_analysis.py),
+and its audio/manifest.json entry records where it is and the track's
+overall RMS and peak level. Files are analysed in parallel processes; run
+after the manifest scripts - unchanged sidecars are reused
+
+Usage:
+  python3 build-audio-analysis.py
+  python3 build-audio-analysis.py --workers 4
+  python3 build-audio-analysis.py --force
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from audio_analysis import ANALYSIS_DIR, ANALYSIS_SUFFIX, analyze_file
+from audio_decode import DecodeError
+from audio_library import (MANIFEST_FILE, has_source, load_manifest, manifest_entries, output_base,
+                           prune_outputs, public_url, save_manifest, source_file)
+from manifest_shards import refresh_shards
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute spectrogram thumbnails and level envelopes')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Analysis processes (default: one per CPU core)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-analyse files even when their sidecar is newer than they are'
+    )
+    args = parser.parse_args()
+
+    manifest = load_manifest()
+    targets = manifest_entries(manifest)
+    sources = [(category, name, entry) for category, name, entry in targets if has_source(entry)]
+    print(f"📊 Analysing {len(sources)} audio files\n")
+    start_time = time.time()
+
+    written = set()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {}
+        for category, name, entry in sources:
+            out_path = f"{output_base(entry, ANALYSIS_DIR)}{ANALYSIS_SUFFIX}"
+            future = pool.submit(analyze_file, str(source_file(entry)), out_path, args.force)
+            futures[future] = (category, name, entry)
+
+        for idx, future in enumerate(as_completed(futures), 1):
+            category, name, entry = futures[future]
+            try:
+                result = future.result()
+            except (DecodeError, ValueError, OSError) as e:
+                failed += 1
+                entry.pop("analysis", None)
+                print(f"[{idx}/{len(sources)}] ❌ {category}/{name}: {e}")
+                continue
+
+            written.add(result['file'])
+            entry["analysis"] = {
+                "path": public_url(result['file']),
+                "bytes": result['bytes'],
+                "melBands": result['melBands'],
+                "columns": result['columns'],
+                "envelopeRate": result['envelopeRate'],
+                "envelopeLength": result['envelopeLength'],
+                "rmsLevel": result['rmsLevel'],
+                "peakLevel": result['peakLevel'],
+            }
+            print(f"[{idx}/{len(sources)}] ✅ {category}/{name} "
+                  f"(peak {result['peakLevel']:.2f}, {result['bytes'] / 1024:.1f} KB)")
+
+    # Entries whose audio is gone take their analysis with them
+    for _, _, entry in targets:
+        if not has_source(entry):
+            entry.pop("analysis", None)
+    removed = prune_outputs(ANALYSIS_DIR, written, f"*{ANALYSIS_SUFFIX}") if not failed else 0
+
+    save_manifest(manifest)
+    refresh_shards()
+
+    elapsed = time.time() - start_time
+    print(f"\n✅ Analysed {len(sources) - failed}/{len(sources)} files in {elapsed:.1f}s")
+    if removed:
+        print(f"🗑️  Removed {removed} stale analysis files")
+    print(f"📋 Manifest updated: {MANIFEST_FILE}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
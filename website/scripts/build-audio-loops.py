@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Cut gapless loops of the soundscape mixer stems
+Every ambient bed and instrument stem in the audio manifest gets a short
+seamless loop in public/audio/loops/ (see audio_loops.py), with its start
+and end samples, tempo and crossfade recorded on the manifest entry. The
+mixer loops these instead of whole recordings, so it holds a few seconds
+of decoded audio per stem and repeats without a click. When
+build-audio-renditions.py has measured a stem, its normalization gain is
+applied to the loop too. Loops are named by a hash of source and settings,
+so only new or changed stems are cut again
+
+Usage:
+  python3 build-audio-loops.py
+  python3 build-audio-loops.py --max-seconds 12
+"""
+
+import argparse
+import sys
+import time
+
+from audio_library import (MANIFEST_FILE, has_source, load_manifest, manifest_entries, output_base,
+                           prune_outputs, public_url, save_manifest, source_file)
+from audio_loops import LOOPS_DIR, MAX_LOOP_SECONDS, loop_path, process_file
+from http_cache import file_sha256
+from manifest_shards import refresh_shards
+
+# Manifest categories the soundscape mixer loops
+LOOP_CATEGORIES = ('ambient', 'instruments')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract seamless loops for the soundscape mixer')
+    parser.add_argument(
+        '--max-seconds',
+        type=float,
+        default=MAX_LOOP_SECONDS,
+        help=f'Longest loop to cut, in seconds (default: {MAX_LOOP_SECONDS:g})'
+    )
+    args = parser.parse_args()
+
+    manifest = load_manifest()
+    targets = [(category, name, entry) for category, name, entry in manifest_entries(manifest)
+               if category in LOOP_CATEGORIES]
+    sources = [(category, name, entry) for category, name, entry in targets
+               if has_source(entry) and not entry.get("isPlaceholder")]
+    print(f"🔁 Cutting loops of up to {args.max_seconds:g}s from {len(sources)} mixer stems\n")
+    start_time = time.time()
+
+    written = set()
+    failed = 0
+    skipped = 0
+    for idx, (category, name, entry) in enumerate(sources, 1):
+        src = source_file(entry)
+        sha256 = entry.get("sha256") or file_sha256(src)
+        gain_db = (entry.get("loudness") or {}).get("gainDb", 0.0)
+        out_base = output_base(entry, LOOPS_DIR)
+        expected = loop_path(out_base, sha256, gain_db, args.max_seconds)
+        if (entry.get("loop") or {}).get("path") == public_url(expected) and expected.is_file():
+            written.add(str(expected))
+            skipped += 1
+            continue
+
+        try:
+            result = process_file(src, sha256, out_base, gain_db, args.max_seconds)
+        except (ValueError, OSError) as e:
+            failed += 1
+            entry.pop("loop", None)
+            print(f"[{idx}/{len(sources)}] ❌ {category}/{name}: {e}")
+            continue
+
+        written.add(result['file'])
+        entry["loop"] = {
+            "path": public_url(result['file']),
+            "bytes": result['bytes'],
+            "sampleRate": result['sampleRate'],
+            "channels": result['channels'],
+            "startSample": result['startSample'],
+            "endSample": result['endSample'],
+            "mode": result['mode'],
+            "tempo": result['tempo'],
+            "beats": result['beats'],
+            "crossfadeSamples": result['crossfadeSamples'],
+            "gainDb": gain_db,
+        }
+        seconds = (result['endSample'] - result['startSample']) / result['sampleRate']
+        detail = f"{result['tempo']} BPM, {result['beats']} beats" if result['tempo'] else 'texture'
+        print(f"[{idx}/{len(sources)}] ✅ {category}/{name} ({seconds:.2f}s, {detail}, "
+              f"{result['bytes'] / 1024:.0f} KB)")
+
+    # Placeholders and removed stems lose their loops
+    for _, _, entry in targets:
+        if not has_source(entry) or entry.get("isPlaceholder"):
+            entry.pop("loop", None)
+    removed = prune_outputs(LOOPS_DIR, written) if not failed else 0
+
+    save_manifest(manifest)
+    refresh_shards()
+
+    elapsed = time.time() - start_time
+    print(f"\n✅ Loops for {len(sources) - failed}/{len(sources)} stems "
+          f"({skipped} unchanged) in {elapsed:.1f}s")
+    if removed:
+        print(f"🗑️  Removed {removed} stale loops")
+    print(f"📋 Manifest updated: {MANIFEST_FILE}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
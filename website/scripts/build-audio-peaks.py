@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Precompute waveform peaks for every file in the audio manifest
+Regional samples, instruments/, ensembles/ and ambient/ are each decoded once
+in bounded-memory blocks and get min/max peak files at several resolutions
+in public/audio/peaks/. Their audio/manifest.json entries list the levels, so
+WaveformPlayer draws the waveform from one small fetch before any audio
+bytes arrive. Run after the manifest scripts; unchanged peaks are reused
+
+Usage:
+  python3 build-audio-peaks.py
+  python3 build-audio-peaks.py --levels 256 1024 4096 --bits 16
+  python3 build-audio-peaks.py --force
+"""
+
+import argparse
+import sys
+import time
+
+from audio_decode import DecodeError
+from audio_library import (MANIFEST_FILE, has_source, load_manifest, manifest_entries, output_base,
+                           prune_outputs, public_url, save_manifest, source_file)
+from audio_peaks import PEAKS_DIR, PEAK_LEVELS, PEAK_BITS, build_peaks
+from manifest_shards import refresh_shards
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute waveform peaks and record them in the audio manifest')
+    parser.add_argument(
+        '--levels',
+        type=int,
+        nargs='+',
+        default=list(PEAK_LEVELS),
+        help=f'Samples per peak for each level (default: {" ".join(map(str, PEAK_LEVELS))})'
+    )
+    parser.add_argument(
+        '--bits',
+        type=int,
+        choices=[8, 16],
+        default=PEAK_BITS,
+        help=f'Bits per stored peak value (default: {PEAK_BITS})'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Recompute peaks even when they are newer than their source'
+    )
+    args = parser.parse_args()
+
+    manifest = load_manifest()
+    targets = manifest_entries(manifest)
+    sources = [(category, name, entry) for category, name, entry in targets if has_source(entry)]
+    print(f"🎚️  Building waveform peaks at {sorted(args.levels)} samples/peak for {len(sources)} files\n")
+    start_time = time.time()
+
+    written = set()
+    failed = 0
+    for idx, (category, name, entry) in enumerate(sources, 1):
+        try:
+            peaks = build_peaks(source_file(entry), output_base(entry, PEAKS_DIR), args.levels, args.bits, args.force)
+        except (DecodeError, ValueError, OSError) as e:
+            failed += 1
+            entry.pop("peaks", None)
+            print(f"[{idx}/{len(sources)}] ❌ {category}/{name}: {e}")
+            continue
+
+        levels = []
+        for level in peaks['levels']:
+            written.add(level['file'])
+            levels.append({
+                "samplesPerPeak": level['samplesPerPeak'],
+                "length": level['length'],
+                "bytes": level['bytes'],
+                "path": public_url(level['file']),
+            })
+        entry["peaks"] = {"sampleRate": peaks['sampleRate'], "bits": peaks['bits'], "levels": levels}
+        coarsest = levels[-1]
+        print(f"[{idx}/{len(sources)}] ✅ {category}/{name} "
+              f"({coarsest['length']} peaks in {coarsest['bytes'] / 1024:.1f} KB at the coarsest level)")
+
+    # Entries whose audio is gone take their peaks with them
+    for _, _, entry in targets:
+        if not has_source(entry):
+            entry.pop("peaks", None)
+    removed = prune_outputs(PEAKS_DIR, written, '*.dat') if not failed else 0
+
+    save_manifest(manifest)
+    refresh_shards()
+
+    elapsed = time.time() - start_time
+    print(f"\n✅ Peaks for {len(sources) - failed}/{len(sources)} files in {elapsed:.1f}s")
+    if removed:
+        print(f"🗑️  Removed {removed} stale peak files")
+    print(f"📋 Manifest updated: {MANIFEST_FILE}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
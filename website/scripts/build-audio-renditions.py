@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Loudness-normalize the audio library and encode smaller web renditions
+Every file in the audio manifest is measured to EBU R128 and encoded, with
+one static normalization gain, to Opus and AAC next to the original MP3 in
+public/audio/renditions/ (see audio_transcode.py). The manifest entry gets
+the measurement, the gain and the renditions, so players can pick the
+smallest format the browser supports and mixer stems play at consistent
+levels. Files run in parallel; measurements and encodes are cached by
+content hash, so only new or changed audio costs anything
+
+Usage:
+  python3 build-audio-renditions.py
+  python3 build-audio-renditions.py --target -18 --formats opus
+  python3 build-audio-renditions.py --workers 2
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from audio_library import (MANIFEST_FILE, has_source, load_manifest, manifest_entries, output_base,
+                           prune_outputs, public_url, save_manifest, source_file)
+from audio_transcode import (RENDITIONS, RENDITIONS_DIR, TARGET_LUFS, TRUE_PEAK_LIMIT, LoudnessCache,
+                             TranscodeError, process_file)
+from http_cache import file_sha256
+from manifest_shards import refresh_shards
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Normalize loudness and encode Opus/AAC renditions')
+    parser.add_argument(
+        '--target',
+        type=float,
+        default=TARGET_LUFS,
+        help=f'Integrated loudness target in LUFS (default: {TARGET_LUFS})'
+    )
+    parser.add_argument(
+        '--peak-limit',
+        type=float,
+        default=TRUE_PEAK_LIMIT,
+        help=f'Highest true peak after gain, in dBTP (default: {TRUE_PEAK_LIMIT})'
+    )
+    parser.add_argument(
+        '--formats',
+        nargs='+',
+        choices=list(RENDITIONS),
+        default=list(RENDITIONS),
+        help='Renditions to encode, preferred first (default: opus aac)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Files encoded at once; each runs its own ffmpeg (default: one per CPU core)'
+    )
+    args = parser.parse_args()
+
+    manifest = load_manifest()
+    targets = manifest_entries(manifest)
+    sources = [(category, name, entry) for category, name, entry in targets
+               if has_source(entry) and not entry.get("isPlaceholder")]
+    print(f"🔊 Normalizing {len(sources)} files to {args.target} LUFS "
+          f"(true peak <= {args.peak_limit} dBTP) as {', '.join(args.formats)}\n")
+    start_time = time.time()
+
+    cache = LoudnessCache()
+    written = set()
+    hashes = set()
+    failed = 0
+    saved = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {}
+        for category, name, entry in sources:
+            src = source_file(entry)
+            sha256 = entry.get("sha256") or file_sha256(src)
+            hashes.add(sha256)
+            future = pool.submit(process_file, src, sha256, output_base(entry, RENDITIONS_DIR),
+                                 args.formats, cache, args.target, args.peak_limit)
+            futures[future] = (category, name, entry)
+
+        for idx, future in enumerate(as_completed(futures), 1):
+            category, name, entry = futures[future]
+            try:
+                result = future.result()
+            except (TranscodeError, ValueError, OSError) as e:
+                failed += 1
+                print(f"[{idx}/{len(sources)}] ❌ {category}/{name}: {e}")
+                continue
+
+            loudness = result['loudness']
+            entry["loudness"] = {
+                "integrated": loudness['integrated'],
+                "truePeak": loudness['truePeak'],
+                "lra": loudness['lra'],
+                "target": args.target,
+                "gainDb": result['gainDb'],
+            }
+            entry["renditions"] = []
+            for rendition in result['renditions']:
+                written.add(rendition['file'])
+                entry["renditions"].append({
+                    "format": rendition['format'],
+                    "mime": rendition['mime'],
+                    "bitrate": rendition['bitrate'],
+                    "bytes": rendition['bytes'],
+                    "path": public_url(rendition['file']),
+                })
+            smallest = min(r['bytes'] for r in result['renditions'])
+            saved += max(0, entry.get("bytes", 0) - smallest)
+            print(f"[{idx}/{len(sources)}] ✅ {category}/{name} "
+                  f"({loudness['integrated']} LUFS, gain {result['gainDb']:+.1f} dB, "
+                  f"smallest {smallest / 1024:.0f} KB)")
+
+    # Placeholders and removed audio lose their renditions
+    for _, _, entry in targets:
+        if not has_source(entry) or entry.get("isPlaceholder"):
+            entry.pop("loudness", None)
+            entry.pop("renditions", None)
+    removed = prune_outputs(RENDITIONS_DIR, written) if not failed else 0
+    cache.save(keep=hashes if not failed else None)
+
+    save_manifest(manifest)
+    refresh_shards()
+
+    elapsed = time.time() - start_time
+    print(f"\n✅ Renditions for {len(sources) - failed}/{len(sources)} files in {elapsed:.1f}s "
+          f"({saved / 1024 / 1024:.1f} MB less to transfer than the originals)")
+    if removed:
+        print(f"🗑️  Removed {removed} stale renditions")
+    print(f"📋 Manifest updated: {MANIFEST_FILE}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
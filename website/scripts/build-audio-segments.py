@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Package MP3s in the audio manifest for segmented streaming
+Each file is cut at frame boundaries into segments of about
+SEGMENT_SECONDS (see audio_segments.py); its audio/manifest.json entry gets
+the byte-range index and an HLS playlist in public/audio/segments/. Players
+can start after the first segment and seek by fetching only the ranges they
+need. Files whose content hash matches their last packaging are skipped
+
+Usage:
+  python3 build-audio-segments.py
+  python3 build-audio-segments.py --segment-seconds 4
+  python3 build-audio-segments.py --force
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from audio_library import (MANIFEST_FILE, has_source, load_manifest, manifest_entries, output_base,
+                           prune_outputs, public_url, save_manifest, source_file)
+from audio_segments import MIME_TYPE, SEGMENT_SECONDS, SEGMENTS_DIR, segment_mp3, write_playlist
+from http_cache import file_sha256
+from manifest_shards import refresh_shards
+
+
+def is_current(entry, sha256, seconds, playlist):
+    """True when the entry's segments were cut from these exact bytes at this length"""
+    segments = entry.get("segments") or {}
+    return (segments.get("sha256") == sha256 and segments.get("segmentDuration") == seconds
+            and os.path.isfile(playlist))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write segment indexes and HLS playlists for the MP3 library')
+    parser.add_argument(
+        '--segment-seconds',
+        type=float,
+        default=SEGMENT_SECONDS,
+        help=f'Target segment length in seconds (default: {SEGMENT_SECONDS:g})'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-segment every file, changed or not'
+    )
+    args = parser.parse_args()
+
+    manifest = load_manifest()
+    targets = manifest_entries(manifest)
+    sources = [(category, name, entry) for category, name, entry in targets
+               if has_source(entry) and source_file(entry).suffix.lower() == '.mp3']
+    print(f"✂️  Segmenting {len(sources)} MP3 files into ~{args.segment_seconds:g}s chunks\n")
+    start_time = time.time()
+
+    written = set()
+    failed = 0
+    skipped = 0
+    for idx, (category, name, entry) in enumerate(sources, 1):
+        src = source_file(entry)
+        sha256 = entry.get("sha256") or file_sha256(src)
+        playlist = f"{output_base(entry, SEGMENTS_DIR)}.m3u8"
+        written.add(playlist)
+        if not args.force and is_current(entry, sha256, args.segment_seconds, playlist):
+            skipped += 1
+            continue
+
+        try:
+            segments = segment_mp3(src, args.segment_seconds)
+            size = write_playlist(playlist, public_url(src), segments)
+        except (ValueError, OSError) as e:
+            failed += 1
+            entry.pop("segments", None)
+            print(f"[{idx}/{len(sources)}] ❌ {category}/{name}: {e}")
+            continue
+
+        entry["segments"] = {
+            "sha256": sha256,
+            "segmentDuration": args.segment_seconds,
+            "mime": MIME_TYPE,
+            "media": public_url(src),
+            "playlist": public_url(playlist),
+            "playlistBytes": size,
+            "index": segments,
+        }
+        print(f"[{idx}/{len(sources)}] ✅ {category}/{name} "
+              f"({len(segments)} segments, first {segments[0]['length'] / 1024:.0f} KB)")
+
+    # Anything that is no longer an MP3 on disk loses its segments
+    segmented = {id(entry) for _, _, entry in sources}
+    for _, _, entry in targets:
+        if id(entry) not in segmented:
+            entry.pop("segments", None)
+    removed = prune_outputs(SEGMENTS_DIR, written, '*.m3u8') if not failed else 0
+
+    save_manifest(manifest)
+    refresh_shards()
+
+    elapsed = time.time() - start_time
+    print(f"\n✅ Segmented {len(sources) - failed - skipped}/{len(sources)} files "
+          f"({skipped} unchanged) in {elapsed:.1f}s")
+    if removed:
+        print(f"🗑️  Removed {removed} stale playlists")
+    print(f"📋 Manifest updated: {MANIFEST_FILE}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Pack each region's mixer stems into one audio sprite
+For every region of src/data/regions.ts, the loops of the instrument stems
+it references (see build-audio-loops.py, which must run first) are packed
+into public/audio/sprites/<region>.<hash>.wav, and the sprite with its
+offset/duration index is recorded under "sprites" in audio/manifest.json
+and in the region's manifest shard. Stems without a loop keep loading on
+their own. Sprites are named by a hash of their loops, so a region is only
+repacked when one of its loops changes
+
+Usage:
+  python3 build-audio-sprites.py
+  python3 build-audio-sprites.py --force
+"""
+
+import argparse
+import sys
+import time
+
+from audio_library import (MANIFEST_FILE, PUBLIC_DIR, load_manifest, manifest_entries, prune_outputs,
+                           public_url, save_manifest)
+from audio_sprites import GAP_SECONDS, MIN_STEMS, SPRITES_DIR, build_sprite, read_wav, sprite_key
+from manifest_shards import refresh_shards, region_assets
+
+
+def region_stems(entries_by_path, paths):
+    """[(name, entry)] of the instrument stems among a region's asset paths that have a loop on disk"""
+    stems = []
+    for path in sorted(paths):
+        found = entries_by_path.get(path)
+        if not found:
+            continue
+        category, name, entry = found
+        loop = entry.get("loop")
+        if category == 'instruments' and loop and (PUBLIC_DIR / loop['path'].lstrip('/')).is_file():
+            stems.append((name, entry))
+    return stems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack region instrument loops into audio sprites')
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Repack every region, changed or not'
+    )
+    args = parser.parse_args()
+
+    manifest = load_manifest()
+    entries_by_path = {entry.get("path"): (category, name, entry)
+                       for category, name, entry in manifest_entries(manifest)}
+    regions = region_assets()
+    previous = manifest.get("sprites", {})
+    print(f"🧩 Packing instrument loops for {len(regions)} regions\n")
+    start_time = time.time()
+
+    sprites = {}
+    written = set()
+    failed = 0
+    skipped = 0
+    SPRITES_DIR.mkdir(parents=True, exist_ok=True)
+    for idx, (region, paths) in enumerate(sorted(regions.items()), 1):
+        stems = region_stems(entries_by_path, paths)
+        if len(stems) < MIN_STEMS:
+            continue
+        loop_paths = [entry["loop"]["path"] for _, entry in stems]
+        out_path = SPRITES_DIR / f"{region}.{sprite_key(loop_paths)}.wav"
+        written.add(str(out_path))
+        old = previous.get(region, {})
+        if not args.force and old.get("path") == public_url(out_path) and out_path.is_file():
+            sprites[region] = old
+            skipped += 1
+            continue
+
+        try:
+            pcm = [(name, *read_wav(PUBLIC_DIR / entry["loop"]["path"].lstrip('/'))) for name, entry in stems]
+            size, rate, channels, index, left_out = build_sprite(out_path, pcm)
+        except (ValueError, OSError) as e:
+            failed += 1
+            if region in previous:
+                sprites[region] = previous[region]  # the mixer is no worse off than before
+            print(f"[{idx}/{len(regions)}] ❌ {region}: {e}")
+            continue
+
+        by_name = dict(stems)
+        sprites[region] = {
+            "path": public_url(out_path),
+            "bytes": size,
+            "sampleRate": rate,
+            "channels": channels,
+            "gapSeconds": GAP_SECONDS,
+            "stems": {
+                name: {
+                    **placement,
+                    "source": by_name[name]["path"],
+                    "loop": by_name[name]["loop"]["path"],
+                    "sourceOffset": round(by_name[name]["loop"]["startSample"]
+                                          / by_name[name]["loop"]["sampleRate"], 6),
+                    "gainDb": by_name[name]["loop"]["gainDb"],
+                }
+                for name, placement in index.items()
+            },
+        }
+        for name in left_out:
+            print(f"⚠️  {region}: {name} is at another sample rate, left out of the sprite")
+        print(f"[{idx}/{len(regions)}] ✅ {region} ({len(index)} stems, {size / 1024:.0f} KB)")
+
+    removed = prune_outputs(SPRITES_DIR, written, '*.wav') if not failed else 0
+
+    manifest["sprites"] = sprites
+    save_manifest(manifest)
+    refresh_shards()
+
+    elapsed = time.time() - start_time
+    print(f"\n✅ {len(sprites)} region sprites ({skipped} unchanged) in {elapsed:.1f}s")
+    if removed:
+        print(f"🗑️  Removed {removed} stale sprites")
+    print(f"📋 Manifest updated: {MANIFEST_FILE}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Build the normalized data catalogue from src/data
+Reads the region, artist, news, timeline and topic catalogues, checks them
+against their TypeScript types and writes public/data/catalogue.json with
+one hashed JSON table per entity, one bundle per region and the derived
+search index and analytics aggregates (see data_catalogue.py). Nothing is
+rewritten when the data has not changed; a type mismatch is reported and
+nothing is written
+
+Usage:
+  python3 build-data-catalogue.py
+  python3 build-data-catalogue.py --check
+  python3 build-data-catalogue.py --force
+"""
+
+import argparse
+import sys
+import time
+
+from data_catalogue import (BUNDLES_DIR, CATALOGUE_FILE, CatalogueError, load_catalogue_index, normalize,
+                            read_sources, write_catalogue)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile src/data into the normalized JSON catalogue')
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='Only check the catalogues against their types, write nothing'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Rebuild the search index and aggregates even if the data is unchanged'
+    )
+    args = parser.parse_args()
+
+    print("📚 Compiling data catalogue\n")
+    start_time = time.time()
+    try:
+        catalogue = normalize(read_sources())
+    except CatalogueError as e:
+        problems = str(e).splitlines()
+        for problem in problems:
+            print(f"❌ {problem}")
+        print(f"\n❌ {len(problems)} problems, catalogue not written")
+        return 1
+
+    for table, rows in catalogue['tables'].items():
+        print(f"  ✅ {table}: {len(rows)}")
+    if args.check:
+        print("\n✅ All catalogues match their types")
+        return 0
+
+    version = load_catalogue_index().get('version')
+    index = write_catalogue(catalogue, force=args.force)
+    elapsed = time.time() - start_time
+    total = sum(entry['bytes'] for entry in index['tables'].values())
+    sizes = [(BUNDLES_DIR / url.rsplit('/', 1)[1]).stat().st_size for url in index['regions'].values()]
+    print(f"\n✅ {len(index['tables'])} tables ({total / 1024:.0f} KB) and {len(sizes)} region bundles "
+          f"({min(sizes) / 1024:.1f}-{max(sizes) / 1024:.1f} KB) in {elapsed:.1f}s")
+    for name, url in index['derived'].items():
+        print(f"🔎 {name}: {url}")
+    if index['version'] == version:
+        print(f"⏭️  Data unchanged (version {version})")
+    print(f"📋 Catalogue: {CATALOGUE_FILE}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Build responsive WebP/AVIF variants of every image under public/images
+Each source gets one file per width and format in public/images/variants/,
+and its images/manifest.json entry lists them (width, height, bytes, path)
+so ImageWithFallback can offer a srcset and the browser picks the smallest
+adequate one. Entries also get the intrinsic size, dominant color and LQIP.
+Run after the manifest scripts; unchanged variants are reused
+
+Usage:
+  python3 build-image-variants.py
+  python3 build-image-variants.py --widths 320 640 1280 --formats webp avif
+  python3 build-image-variants.py --force --workers 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+from asset_keys import image_key, image_type
+from image_pipeline import (IMAGES_DIR, VARIANT_WIDTHS, VARIANT_FORMATS, available_formats,
+                            describe_image, encode_variants, library_images)
+from manifest_shards import refresh_shards
+
+PUBLIC_DIR = IMAGES_DIR.parent
+VARIANTS_DIR = IMAGES_DIR / 'variants'
+MANIFEST_FILE = IMAGES_DIR / 'manifest.json'
+
+
+def public_url(path):
+    return '/' + Path(path).resolve().relative_to(PUBLIC_DIR.resolve()).as_posix()
+
+
+def load_manifest():
+    if MANIFEST_FILE.exists():
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"version": "1.0", "lastUpdated": None, "images": {}}
+
+
+def save_manifest(manifest):
+    """Write the manifest atomically"""
+    manifest["lastUpdated"] = datetime.now().isoformat()
+    tmp_path = MANIFEST_FILE.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+
+def prune_variants(keep):
+    """Delete variant files no source produced this run"""
+    removed = 0
+    for path in VARIANTS_DIR.rglob('*'):
+        if path.is_file() and str(path) not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build responsive image variants and record them in the manifest')
+    parser.add_argument(
+        '--widths',
+        type=int,
+        nargs='+',
+        default=list(VARIANT_WIDTHS),
+        help=f'Variant widths in pixels (default: {" ".join(map(str, VARIANT_WIDTHS))})'
+    )
+    parser.add_argument(
+        '--formats',
+        nargs='+',
+        choices=list(VARIANT_FORMATS),
+        default=list(VARIANT_FORMATS),
+        help='Output formats, smallest first (default: webp avif)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Encoder processes (default: one per CPU core)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-encode variants even when they are newer than their source'
+    )
+    args = parser.parse_args()
+
+    formats = available_formats(args.formats)
+    for fmt in set(args.formats) - set(formats):
+        print(f"⚠️  This Pillow build cannot write {fmt.upper()} - skipping (pip install -U pillow)")
+    if not formats:
+        return 1
+
+    sources = library_images()
+    print(f"🖼️  Building {', '.join(formats)} variants at {args.widths} for {len(sources)} images\n")
+    start_time = time.time()
+
+    manifest = load_manifest()
+    images = manifest.setdefault("images", {})
+    written = set()
+    failed = 0
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {}
+        for rel in sources:
+            out_base = VARIANTS_DIR / rel.parent / rel.stem
+            out_base.parent.mkdir(parents=True, exist_ok=True)
+            future = pool.submit(encode_variants, IMAGES_DIR / rel, str(out_base),
+                                 tuple(sorted(args.widths)), tuple(formats), args.force)
+            futures[future] = rel
+
+        for idx, future in enumerate(as_completed(futures), 1):
+            rel = futures[future]
+            try:
+                variants = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{idx}/{len(sources)}] ❌ {rel}: {e}")
+                continue
+
+            entry = images.setdefault(image_key(rel), {
+                "exists": True,
+                "path": f"/images/{rel.as_posix()}",
+                "type": image_type(rel),
+            })
+            entry.update(describe_image(IMAGES_DIR / rel))
+            entry["variants"] = {}
+            for fmt, items in variants.items():
+                entry["variants"][fmt] = []
+                for item in items:
+                    written.add(item['file'])
+                    entry["variants"][fmt].append({
+                        "width": item['width'],
+                        "height": item['height'],
+                        "bytes": item['bytes'],
+                        "path": public_url(item['file']),
+                    })
+            smallest = min(item['bytes'] for items in variants.values() for item in items)
+            print(f"[{idx}/{len(sources)}] ✅ {rel} (smallest {smallest / 1024:.0f} KB)")
+
+    # Sources that were deleted take their variants with them
+    for name, entry in images.items():
+        if not (IMAGES_DIR / entry.get("path", "").replace("/images/", "", 1)).exists():
+            entry.pop("variants", None)
+    removed = prune_variants(written) if not failed else 0
+
+    save_manifest(manifest)
+    refresh_shards()
+
+    elapsed = time.time() - start_time
+    print(f"\n✅ Variants for {len(sources) - failed}/{len(sources)} images in {elapsed:.1f}s")
+    if removed:
+        print(f"🗑️  Removed {removed} stale variant files")
+    print(f"📋 Manifest updated: {MANIFEST_FILE}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
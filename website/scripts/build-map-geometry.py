@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Build simplified level-of-detail map outlines
+For every source of map_geometry.SOURCES the state paths are simplified at
+each level of LEVELS and written, with bounding boxes and label anchors, to
+public/data/geometry/<source>.<level>.<hash>.json, so a map can fetch only
+the level it draws; geometry/index.json lists the levels of every source.
+A source is only rebuilt when its path data changes
+
+Usage:
+  python3 build-map-geometry.py
+  python3 build-map-geometry.py --force
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from map_geometry import (DATA_SOURCE_DIR, GEOMETRY_DIR, GEOMETRY_INDEX, HASH_LENGTH, LEVELS, PUBLIC_DIR, SOURCES,
+                          build_geometry, read_paths)
+from ts_objects import TsSyntaxError
+
+
+def load_index():
+    try:
+        with open(GEOMETRY_INDEX, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_level(name, level, geometry):
+    """Write one level of a source; returns its public URL and size"""
+    states = {key: {'d': state['paths'][level], 'bbox': state['bbox'], 'anchor': state['anchor']}
+              for key, state in geometry['states'].items()}
+    data = json.dumps(states, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    out_path = GEOMETRY_DIR / f"{name}.{level}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}.json"
+    if not out_path.exists():
+        tmp_path = out_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, out_path)
+    return '/' + out_path.relative_to(PUBLIC_DIR).as_posix(), len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simplify the map outlines into levels of detail')
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Rebuild every source, changed or not'
+    )
+    args = parser.parse_args()
+
+    print(f"🗺️  Simplifying {len(SOURCES)} map sources at {len(LEVELS)} levels\n")
+    start_time = time.time()
+    GEOMETRY_DIR.mkdir(parents=True, exist_ok=True)
+    previous = load_index()
+    sources = {}
+    failed = 0
+
+    for idx, (name, filename, constant) in enumerate(SOURCES, 1):
+        try:
+            paths = read_paths(DATA_SOURCE_DIR / filename, constant)
+        except (OSError, TsSyntaxError) as e:
+            failed += 1
+            if name in previous.get('sources', {}):
+                sources[name] = previous['sources'][name]
+            print(f"[{idx}/{len(SOURCES)}] ❌ {filename}: {e}")
+            continue
+
+        source_hash = hashlib.sha256(json.dumps(paths, sort_keys=True).encode('utf-8')).hexdigest()[:HASH_LENGTH]
+        old = previous.get('sources', {}).get(name, {})
+        on_disk = all((PUBLIC_DIR / level['path'].lstrip('/')).is_file() for level in old.get('levels', []))
+        if not args.force and old.get('sourceHash') == source_hash and on_disk:
+            sources[name] = old
+            print(f"[{idx}/{len(SOURCES)}] ⏭️  {name} unchanged")
+            continue
+
+        try:
+            geometry = build_geometry(paths)
+        except ValueError as e:
+            failed += 1
+            print(f"[{idx}/{len(SOURCES)}] ❌ {name}: {e}")
+            continue
+        levels = []
+        for level in geometry['levels']:
+            url, size = write_level(name, level['name'], geometry)
+            levels.append({**level, 'path': url, 'fileBytes': size})
+        sources[name] = {'sourceHash': source_hash, 'states': len(paths), 'levels': levels}
+        full, low = geometry['levels'][0], geometry['levels'][-1]
+        print(f"[{idx}/{len(SOURCES)}] ✅ {name}: {len(paths)} states, "
+              f"{full['vertices']} → {low['vertices']} vertices, {full['bytes']} → {low['bytes']} path bytes")
+
+    index = {'version': '1.0', 'lastUpdated': datetime.now().isoformat(), 'sources': sources}
+    if {**previous, 'lastUpdated': None} != {**index, 'lastUpdated': None}:
+        tmp_path = GEOMETRY_INDEX.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, GEOMETRY_INDEX)
+
+    # Files of the previous index are kept one generation, like the manifest shards
+    if not failed:
+        keep = {level['path'] for generation in (index, previous)
+                for entry in generation.get('sources', {}).values() for level in entry.get('levels', [])}
+        for path in GEOMETRY_DIR.glob('*.*.*.json'):
+            if '/' + path.relative_to(PUBLIC_DIR).as_posix() not in keep:
+                path.unlink()
+
+    elapsed = time.time() - start_time
+    print(f"\n✅ {len(sources)} map sources in {elapsed:.1f}s")
+    print(f"📋 Index: {GEOMETRY_INDEX}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Compile the src/data catalogues into normalized JSON
+The exported constants of regions.ts, regionalArtistsEnhanced.ts,
+musicalNews.ts, musicalTimeline.ts and educationalContent.ts are read as
+data (see ts_objects.py), checked against the interfaces they are declared
+with (src/types/music.ts plus the files' own interfaces) and split into one
+table per entity: regions, tracks (the regions' instrumentTracks, referenced
+by trackIds), artists (flattened, grouped by region in the index), news,
+timeline and topics. Every region also gets a bundle with just what its
+modal shows, so the site can fetch one region without the rest. Files are
+named by content hash like the manifest shards; public/data/catalogue.json
+maps entities and regions to them and carries the data version. Indexes
+built from the whole catalogue (DERIVED: the search index of
+search_index.py and the dashboard aggregates of analytics_aggregates.py)
+are written alongside and listed under 'derived'
+
+Usage:
+  python3 build-data-catalogue.py
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from analytics_aggregates import FORMAT_VERSION as ANALYTICS_FORMAT, build_analytics
+from search_index import FORMAT_VERSION as SEARCH_FORMAT, build_search_index
+from ts_objects import TsSyntaxError, exported_constants, string_value, tokenize
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DATA_SOURCE_DIR = PROJECT_ROOT / 'src' / 'data'
+TYPES_FILE = PROJECT_ROOT / 'src' / 'types' / 'music.ts'
+PUBLIC_DIR = PROJECT_ROOT / 'public'
+DATA_DIR = PUBLIC_DIR / 'data'
+BUNDLES_DIR = DATA_DIR / 'regions'
+CATALOGUE_FILE = DATA_DIR / 'catalogue.json'
+HASH_LENGTH = 12
+
+# (table, source file, exported constant)
+SOURCES = (
+    ('regions', 'regions.ts', 'musicalRegions'),
+    ('artists', 'regionalArtistsEnhanced.ts', 'regionalArtistsEnhanced'),
+    ('news', 'musicalNews.ts', 'musicalNewsData'),
+    ('timeline', 'musicalTimeline.ts', 'musicalTimeline'),
+    ('topics', 'educationalContent.ts', 'educationalTopics'),
+)
+TABLES = ('regions', 'tracks', 'artists', 'news', 'timeline', 'topics')
+ASSET_PREFIXES = ('/audio/', '/images/')
+# Files computed from the whole catalogue, (name, builder, builder format
+# version); rebuilt only when the data version or the format changes
+DERIVED = (
+    ('search', build_search_index, SEARCH_FORMAT),
+    ('analytics', build_analytics, ANALYTICS_FORMAT),
+)
+
+_PRIMITIVES = {'string', 'number', 'boolean', 'any', 'unknown', 'null', 'undefined'}
+
+
+class CatalogueError(ValueError):
+    """A catalogue does not parse, or does not match its declared type"""
+
+
+# ---------------------------------------------------------------------------
+# TypeScript types
+#
+# Types are parsed into tuples: ('prim', name), ('lit', value), ('array', t),
+# ('record', t), ('object', {field: (t, optional)}), ('union', [t, ...]) and
+# ('ref', name) for a named interface or alias
+# ---------------------------------------------------------------------------
+
+class _TypeParser:
+    def __init__(self, tokens, i=0):
+        self.tokens = tokens
+        self.i = i
+
+    def peek(self):
+        return self.tokens[self.i][1] if self.i < len(self.tokens) else None
+
+    def take(self, expected=None):
+        if self.i >= len(self.tokens):
+            raise TsSyntaxError("type expected at end of file")
+        token = self.tokens[self.i]
+        if expected is not None and token[1] != expected:
+            raise TsSyntaxError(f"{expected!r} expected at offset {token[2]}, found {token[1]!r}")
+        self.i += 1
+        return token
+
+    def union(self):
+        if self.peek() == '|':
+            self.take()
+        options = [self.postfix()]
+        while self.peek() == '|':
+            self.take()
+            options.append(self.postfix())
+        return options[0] if len(options) == 1 else ('union', options)
+
+    def postfix(self):
+        node = self.primary()
+        while self.peek() == '[' and self.tokens[self.i + 1][1] == ']':
+            self.i += 2
+            node = ('array', node)
+        return node
+
+    def primary(self):
+        kind, value, start, _ = self.take()
+        if value == '{':
+            return self.members()
+        if value == '(':
+            node = self.union()
+            self.take(')')
+            return node
+        if kind == 'string':
+            return ('lit', string_value(value))
+        if kind == 'number':
+            return ('lit', float(value) if '.' in value else int(value))
+        if value in ('true', 'false'):
+            return ('lit', value == 'true')
+        if value in _PRIMITIVES:
+            return ('prim', value)
+        if value == 'Array':
+            self.take('<')
+            node = self.union()
+            self.take('>')
+            return ('array', node)
+        if value == 'Record':
+            self.take('<')
+            self.union()
+            self.take(',')
+            node = self.union()
+            self.take('>')
+            return ('record', node)
+        if kind == 'name':
+            return ('ref', value)
+        raise TsSyntaxError(f"unsupported type {value!r} at offset {start}")
+
+    def members(self):
+        fields = {}
+        while self.peek() != '}':
+            name = self.take()
+            optional = self.peek() == '?'
+            if optional:
+                self.take()
+            self.take(':')
+            fields[string_value(name[1]) if name[0] == 'string' else name[1]] = (self.union(), optional)
+            if self.peek() in (';', ','):
+                self.take()
+        self.take('}')
+        return ('object', fields)
+
+
+def parse_type(tokens):
+    """Type tuple of a whole annotation token list"""
+    parser = _TypeParser(tokens)
+    node = parser.union()
+    if parser.i != len(tokens):
+        raise TsSyntaxError(f"unexpected {parser.peek()!r} in type")
+    return node
+
+
+def declared_types(text):
+    """{name: type} of the interfaces and type aliases declared in a file"""
+    tokens = tokenize(text)
+    types = {}
+    for i, (_, value, _, _) in enumerate(tokens):
+        if value not in ('interface', 'type') or i + 2 >= len(tokens) or tokens[i + 1][0] != 'name':
+            continue
+        parser = _TypeParser(tokens, i + 2)
+        if value == 'interface' and parser.peek() == '{':
+            parser.take()
+            types[tokens[i + 1][1]] = parser.members()
+        elif value == 'type' and parser.peek() == '=':
+            parser.take()
+            types[tokens[i + 1][1]] = parser.union()
+    return types
+
+
+def _label(key, item):
+    return f"[{item['id']}]" if isinstance(item, dict) and isinstance(item.get('id'), str) else f"[{key!r}]"
+
+
+def validate(value, node, types, path='', errors=None):
+    """List of 'path: problem' strings, empty when value matches the type"""
+    errors = [] if errors is None else errors
+    kind = node[0]
+    if kind == 'ref':
+        if node[1] not in types:
+            errors.append(f"{path}: unknown type {node[1]}")
+        else:
+            validate(value, types[node[1]], types, path, errors)
+    elif kind == 'prim':
+        expected = {'string': str, 'number': (int, float), 'boolean': bool}.get(node[1])
+        if node[1] in ('null', 'undefined'):
+            if value is not None:
+                errors.append(f"{path}: expected {node[1]}")
+        elif expected and (not isinstance(value, expected)
+                           or (node[1] == 'number' and isinstance(value, bool))):
+            errors.append(f"{path}: expected {node[1]}, found {type(value).__name__}")
+    elif kind == 'lit':
+        if value != node[1] or isinstance(value, bool) != isinstance(node[1], bool):
+            errors.append(f"{path}: expected {node[1]!r}, found {value!r}")
+    elif kind == 'array':
+        if not isinstance(value, list):
+            errors.append(f"{path}: expected an array")
+        else:
+            for n, item in enumerate(value):
+                validate(item, node[1], types, f"{path}{_label(n, item)}", errors)
+    elif kind == 'record':
+        if not isinstance(value, dict):
+            errors.append(f"{path}: expected an object")
+        else:
+            for key, item in value.items():
+                validate(item, node[1], types, f"{path}[{key!r}]", errors)
+    elif kind == 'object':
+        if not isinstance(value, dict):
+            errors.append(f"{path}: expected an object")
+            return errors
+        for name, (field, optional) in node[1].items():
+            if name not in value:
+                if not optional:
+                    errors.append(f"{path}.{name}: missing")
+            elif not (optional and value[name] is None):
+                validate(value[name], field, types, f"{path}.{name}", errors)
+        for name in value.keys() - node[1].keys():
+            errors.append(f"{path}.{name}: not declared in the type")
+    elif kind == 'union':
+        if not any(not validate(value, option, types, path) for option in node[1]):
+            errors.append(f"{path}: matches none of {len(node[1])} alternatives")
+    return errors
+
+
+# ---------------------------------------------------------------------------
+# Reading and normalizing
+# ---------------------------------------------------------------------------
+
+def read_sources(data_dir=DATA_SOURCE_DIR, types_file=TYPES_FILE, check=True):
+    """
+    {table: raw value} of every source, checked against its declared type
+    unless check is off; raises CatalogueError listing every mismatch
+    """
+    shared_types = declared_types(types_file.read_text(encoding='utf-8'))
+    raw = {}
+    errors = []
+    for table, filename, constant in SOURCES:
+        text = (data_dir / filename).read_text(encoding='utf-8')
+        try:
+            constants = exported_constants(text)
+            if constant not in constants:
+                raise TsSyntaxError(f"no `export const {constant}` literal")
+            annotation, value = constants[constant]
+            types = {**shared_types, **declared_types(text)}
+            if check and annotation:
+                errors += validate(value, parse_type(annotation), types, f"{filename}:{constant}")
+        except TsSyntaxError as e:
+            raise CatalogueError(f"{filename}: {e}") from e
+        raw[table] = value
+    if errors:
+        raise CatalogueError('\n'.join(errors))
+    return raw
+
+
+def _unique(rows, table, errors):
+    """rows keyed by id, reporting ids used twice for different rows"""
+    by_id = {}
+    for row in rows:
+        seen = by_id.get(row['id'])
+        if seen is not None and seen != row:
+            errors.append(f"{table}: id {row['id']!r} is used for two different entries")
+        by_id.setdefault(row['id'], row)
+    return list(by_id.values())
+
+
+def normalize(raw):
+    """
+    {'tables': {table: [rows]}, 'artistsByRegion': {region: [artist ids]}}
+    Tracks shared by several regions are stored once; an artist's regionId
+    falls back to the region it is listed under
+    """
+    errors = []
+    regions = []
+    tracks = []
+    for region in raw['regions']:
+        region = dict(region)
+        region_tracks = region.pop('instrumentTracks', [])
+        region['trackIds'] = [track['id'] for track in region_tracks]
+        tracks += region_tracks
+        regions.append(region)
+
+    artists = []
+    artists_by_region = {}
+    for region_id, group in raw['artists'].items():
+        for artist in group:
+            artists.append({**artist, 'regionId': artist.get('regionId') or region_id})
+            artists_by_region.setdefault(region_id, []).append(artist['id'])
+
+    tables = {
+        'regions': _unique(regions, 'regions', errors),
+        'tracks': _unique(tracks, 'tracks', errors),
+        'artists': _unique(artists, 'artists', errors),
+        'news': _unique(raw['news'], 'news', errors),
+        'timeline': _unique(raw['timeline'], 'timeline', errors),
+        'topics': _unique(raw['topics'], 'topics', errors),
+    }
+    if errors:
+        raise CatalogueError('\n'.join(errors))
+    return {'tables': tables, 'artistsByRegion': artists_by_region}
+
+
+def asset_paths(value, found=None):
+    """Every /audio/ and /images/ path among the strings of a value"""
+    found = set() if found is None else found
+    if isinstance(value, str):
+        if value.startswith(ASSET_PREFIXES):
+            found.add(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            asset_paths(item, found)
+    elif isinstance(value, list):
+        for item in value:
+            asset_paths(item, found)
+    return found
+
+
+def region_bundles(catalogue):
+    """{region id: everything the region's modal and mixer need}"""
+    tables = catalogue['tables']
+    tracks = {track['id']: track for track in tables['tracks']}
+    artists = {artist['id']: artist for artist in tables['artists']}
+    bundles = {}
+    for region in tables['regions']:
+        region_id = region['id']
+
+        def related(row):
+            return row.get('region') == region_id or region_id in row.get('relatedRegions', ())
+
+        bundles[region_id] = {
+            'region': region,
+            'tracks': [tracks[track_id] for track_id in region['trackIds']],
+            'artists': [artists[a] for a in catalogue['artistsByRegion'].get(region_id, [])],
+            'news': [row for row in tables['news'] if related(row)],
+            'timeline': [row for row in tables['timeline'] if related(row)],
+            'topicIds': [row['id'] for row in tables['topics'] if related(row)],
+        }
+    return bundles
+
+
+def region_assets(catalogue=None):
+    """{region id: set of /audio and /images paths} of a region, its tracks and its artists"""
+    catalogue = normalize(read_sources(check=False)) if catalogue is None else catalogue
+    return {region_id: asset_paths([bundle['region'], bundle['tracks'], bundle['artists']])
+            for region_id, bundle in region_bundles(catalogue).items()}
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+def _serialize(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _write_hashed(directory, name, value):
+    """Write value as <name>.<hash>.json unless it is already there; returns (path, hash)"""
+    data = _serialize(value)
+    digest = hashlib.sha256(data).hexdigest()
+    path = directory / f"{name}.{digest[:HASH_LENGTH]}.json"
+    if not path.exists():
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return path, digest
+
+
+def _url(path):
+    return '/' + path.relative_to(PUBLIC_DIR).as_posix()
+
+
+def load_catalogue_index():
+    """catalogue.json as last written, or {}"""
+    try:
+        with open(CATALOGUE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_catalogue(catalogue, force=False):
+    """
+    Write changed tables, region bundles, derived files and catalogue.json;
+    returns the index. Derived files are reused while the data version and
+    their builder's format version are unchanged, unless forced. Like the manifest shards, files of the previous
+    index are kept one generation and anything older is deleted
+    """
+    BUNDLES_DIR.mkdir(parents=True, exist_ok=True)
+    previous = load_catalogue_index()
+
+    digests = []
+    tables = {}
+    for table in TABLES:
+        rows = catalogue['tables'][table]
+        path, digest = _write_hashed(DATA_DIR, table, rows)
+        tables[table] = {'path': _url(path), 'count': len(rows), 'bytes': path.stat().st_size}
+        digests.append(digest)
+    regions = {}
+    for region_id, bundle in sorted(region_bundles(catalogue).items()):
+        path, digest = _write_hashed(BUNDLES_DIR, region_id, bundle)
+        regions[region_id] = _url(path)
+        digests.append(digest)
+    digests.append(hashlib.sha256(_serialize(catalogue['artistsByRegion'])).hexdigest())
+
+    version = hashlib.sha256(''.join(digests).encode('ascii')).hexdigest()[:HASH_LENGTH]
+    derived = {}
+    formats = {}
+    for name, build, format_version in DERIVED:
+        url = previous.get('derived', {}).get(name)
+        current = (previous.get('version') == version
+                   and previous.get('derivedFormats', {}).get(name) == format_version
+                   and url and (PUBLIC_DIR / url.lstrip('/')).is_file())
+        if force or not current:
+            path, _ = _write_hashed(DATA_DIR, name, build(catalogue))
+            url = _url(path)
+        derived[name] = url
+        formats[name] = format_version
+
+    index = {
+        'version': version,
+        'lastUpdated': datetime.now().isoformat(),
+        'tables': tables,
+        'regions': regions,
+        'derived': derived,
+        'derivedFormats': formats,
+        'artistsByRegion': catalogue['artistsByRegion'],
+    }
+    if {**previous, 'lastUpdated': None} != {**index, 'lastUpdated': None}:
+        tmp_path = CATALOGUE_FILE.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, CATALOGUE_FILE)
+    else:
+        index = previous
+
+    keep = set()
+    for generation in (index, previous):
+        keep |= {entry['path'] for entry in generation.get('tables', {}).values()}
+        keep |= set(generation.get('regions', {}).values())
+        keep |= set(generation.get('derived', {}).values())
+    for directory in (DATA_DIR, BUNDLES_DIR):
+        for path in directory.glob('*.*.json'):
+            if _url(path) not in keep:
+                path.unlink()
+    return index
@@ -5,12 +5,17 @@ Downloads from Wikimedia Commons, Unsplash, and other free sources
 """
 
 import os
-import requests
-import json
 import time
+import argparse
 from pathlib import Path
 from urllib.parse import urlparse
 
+from asset_http import download_to, run_jobs, DEFAULT_WORKERS
+from http_cache import HttpCache
+from asset_store import AssetStore
+from job_state import JobState, parse_age
+from manifest_engine import ManifestEngine
+
 # Base directories
 BASE_DIR = Path(__file__).parent.parent / "public"
 IMAGES_DIR = BASE_DIR / "images"
@@ -70,6 +75,13 @@ IMAGE_MAPPINGS = {
     "artists/lakha-khan-profile.jpg": "https://images.unsplash.com/photo-1493225457124-a3eb161ffa5f?w=800&h=800&fit=crop",
 }
 
+# ETag/Last-Modified validators for everything fetched from IMAGE_MAPPINGS
+HTTP_CACHE = HttpCache()
+# Downloaded images are stored once per content hash and linked into public/
+ASSET_STORE = AssetStore()
+# Per-file status, attempts and errors, shared with the other downloaders
+JOBS = JobState("all-assets")
+
 # Audio sources - using Archive.org and Freesound.org public domain/CC files
 # Note: These are placeholder URLs - replace with actual free audio files
 AUDIO_SOURCES = {
@@ -90,34 +102,29 @@ AUDIO_SOURCES = {
     }
 }
 
-def download_file(url, filepath, max_retries=3):
-    """Download a file with retry logic"""
-    for attempt in range(max_retries):
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=30, stream=True)
-            
-            if response.status_code == 200:
-                with open(filepath, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                print(f"✅ Downloaded: {filepath.name}")
-                return True
-            elif response.status_code == 404:
-                print(f"⚠️  Not found (404): {filepath.name}")
-                return False
-            else:
-                print(f"⚠️  Status {response.status_code}: {filepath.name}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-        except Exception as e:
-            print(f"❌ Error downloading {filepath.name}: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-    
-    return False
+def download_file(url, filepath, max_retries=3, cache=None):
+    """
+    Download a file with retry logic (retries and pacing live in asset_http.fetch)
+    With a cache, an unchanged upstream file is revalidated instead of re-downloaded.
+    Returns "downloaded", "unchanged", or None on failure
+    """
+    try:
+        status = download_to(url, filepath, cache=cache, max_retries=max_retries, timeout=30)
+        
+        if status == 200:
+            print(f"✅ Downloaded: {filepath.name}")
+            return "downloaded"
+        elif status == 304:
+            print(f"♻️  Unchanged: {filepath.name}")
+            return "unchanged"
+        elif status == 404:
+            print(f"⚠️  Not found (404): {filepath.name}")
+        else:
+            print(f"⚠️  Status {status}: {filepath.name}")
+    except Exception as e:
+        print(f"❌ Error downloading {filepath.name}: {e}")
+    
+    return None
 
 def create_placeholder_image(filepath, text, width=800, height=600):
     """Create a placeholder image using PIL or simple HTML canvas"""
@@ -140,7 +147,10 @@ def create_placeholder_image(filepath, text, width=800, height=600):
         position = ((width - text_width) // 2, (height - text_height) // 2)
         
         draw.text(position, text, fill='#666666', font=font)
-        img.save(filepath)
+        # Replace rather than overwrite: filepath may be linked to a shared store blob
+        tmp_path = filepath.with_name(f"{filepath.stem}.tmp{filepath.suffix}")
+        img.save(tmp_path)
+        os.replace(tmp_path, filepath)
         print(f"✅ Created placeholder: {filepath.name}")
         return True
     except ImportError:
@@ -166,41 +176,120 @@ def create_audio_placeholder(filepath):
     # 1 second of silence (44100 samples * 2 channels * 2 bytes = 176400 bytes)
     silence = b'\x00' * 176400
     
-    with open(filepath, 'wb') as f:
+    tmp_path = filepath.with_name(filepath.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
         f.write(wav_header)
         f.write(silence)
+    os.replace(tmp_path, filepath)
     
     print(f"✅ Created audio placeholder: {filepath.name}")
 
-def download_images():
-    """Download all images"""
-    print("\n📥 Downloading images...\n")
+def fetch_image(filenames, url):
+    """
+    Download one URL for every logical name that maps to it, falling back to
+    placeholders. The bytes land in the asset store once and each name is
+    linked to the same blob. Returns the outcome name
+    """
+    filepaths = [IMAGES_DIR / filename for filename in filenames]
+    existed = all(filepath.exists() for filepath in filepaths)
+    started = time.time()
+    for filename in filenames:
+        JOBS.start(filename)
+    
+    def record(ok, error=None):
+        entry = HTTP_CACHE.get(url) or {}
+        for filename in filenames:
+            if ok:
+                JOBS.succeed(filename, size=entry.get('size'), duration=time.time() - started, sha256=entry.get('sha256'))
+            else:
+                JOBS.fail(filename, error, duration=time.time() - started)
+    
+    # Already fetched this URL before (e.g. under another name) - just link it
+    entry = HTTP_CACHE.get(url)
+    if entry and ASSET_STORE.has(entry.get('sha256')) and not existed:
+        for filepath in filepaths:
+            ASSET_STORE.materialize(entry['sha256'], filepath)
+        print(f"🔗 Linked from store: {', '.join(filenames)}")
+        record(True)
+        return "downloaded"
+    
+    outcome = download_file(url, filepaths[0], cache=HTTP_CACHE)
+    if outcome:
+        digest = ASSET_STORE.ingest(filepaths[0], (HTTP_CACHE.get(url) or {}).get('sha256'))
+        for filepath in filepaths[1:]:
+            ASSET_STORE.materialize(digest, filepath)
+        record(True)
+        return outcome
+    
+    record(False, f"download failed: {url}")
+    
+    # Never replace a real file with a placeholder on a failed refresh
+    if existed:
+        return "failed"
+    
+    # Create placeholder
+    created = False
+    for filename, filepath in zip(filenames, filepaths):
+        text = filename.replace('.jpg', '').replace('-', ' ').title()
+        if not filepath.exists() and create_placeholder_image(filepath, text):
+            created = True
+    return "placeholder" if created else "failed"
+
+def download_images(workers=DEFAULT_WORKERS, refresh=False, retry_failed=False, older_than=None):
+    """
+    Download all images on a bounded pool of workers
+    With refresh=True existing files are revalidated with conditional requests.
+    With retry_failed=True only targets whose last attempt failed are fetched,
+    even though a placeholder now sits in their place
+    """
+    print(f"\n📥 Downloading images ({workers} workers)...\n")
     
     downloaded = 0
+    unchanged = 0
     failed = 0
     created_placeholders = 0
     
+    retry_targets = JOBS.failures(older_than=older_than) if retry_failed else None
+    
+    # Several logical names share one upstream URL - fetch each URL only once
+    by_url = {}
     for filename, url in IMAGE_MAPPINGS.items():
         filepath = IMAGES_DIR / filename
         filepath.parent.mkdir(parents=True, exist_ok=True)
         
+        if retry_targets is not None:
+            if filename in retry_targets:
+                by_url.setdefault(url, []).append(filename)
+            continue
+        
         # Skip if already exists
-        if filepath.exists():
+        if filepath.exists() and not refresh:
             print(f"⏭️  Skipping {filename} (already exists)")
             continue
-        
-        if download_file(url, filepath):
-            downloaded += 1
-        else:
-            # Create placeholder
-            text = filename.replace('.jpg', '').replace('-', ' ').title()
-            if create_placeholder_image(filepath, text):
-                created_placeholders += 1
-            failed += 1
-            time.sleep(0.5)  # Rate limiting
+        by_url.setdefault(url, []).append(filename)
+    jobs = [(filenames, url) for url, filenames in by_url.items()]
+    
+    for (filenames, _), outcome in run_jobs(jobs, fetch_image, workers):
+        count = len(filenames)
+        if outcome == "downloaded":
+            downloaded += count
+            continue
+        if outcome == "unchanged":
+            unchanged += count
+            continue
+        if isinstance(outcome, Exception):
+            print(f"❌ Error processing {', '.join(filenames)}: {outcome}")
+        elif outcome == "placeholder":
+            created_placeholders += count
+        failed += count
+    
+    ASSET_STORE.save()
+    HTTP_CACHE.save()
     
     print(f"\n📊 Image Download Summary:")
     print(f"   ✅ Downloaded: {downloaded}")
+    if refresh:
+        print(f"   ♻️  Unchanged (304): {unchanged}")
     print(f"   🎨 Placeholders created: {created_placeholders}")
     print(f"   ❌ Failed: {failed}")
 
@@ -242,53 +331,48 @@ def create_manifests():
     """Create manifest files for images and audio"""
     print("\n📋 Creating manifest files...\n")
     
-    # Image manifest
-    image_manifest = {
-        "version": "1.0",
-        "lastUpdated": time.strftime("%Y-%m-%d %H:%M:%S"),
-        "images": {}
-    }
-    
-    for filename in IMAGE_MAPPINGS.keys():
-        filepath = IMAGES_DIR / filename
-        image_manifest["images"][filename] = {
-            "exists": filepath.exists(),
-            "path": f"/images/{filename}",
-            "type": "instrument" if "instrument" in filename or any(x in filename for x in ["kamaycha", "sarangi", "dhol", "veena", "mridangam", "ektara", "santoor", "chenda", "dappu"]) else "performance" if "performance" in filename or any(x in filename for x in ["baul", "bhangra", "lavani", "concert", "temple"]) else "other"
-        }
-    
-    with open(IMAGES_DIR / "manifest.json", 'w') as f:
-        json.dump(image_manifest, f, indent=2)
-    
-    # Audio manifest
-    audio_manifest = {
-        "version": "1.0",
-        "lastUpdated": time.strftime("%Y-%m-%d %H:%M:%S"),
-        "audio": {
-            "ambient": {},
-            "instruments": {},
-            "ensembles": {}
-        }
-    }
-    
-    for filename in AUDIO_SOURCES["ambient"].keys():
-        filepath = AUDIO_AMBIENT / filename
-        audio_manifest["audio"]["ambient"][filename] = {
-            "exists": filepath.exists() or filepath.with_suffix('.wav').exists(),
-            "path": f"/audio/ambient/{filename}",
-            "isPlaceholder": not filepath.exists()
-        }
-    
-    with open(AUDIO_DIR / "manifest.json", 'w') as f:
-        json.dump(audio_manifest, f, indent=2)
+    # Everything under public/ is listed; the mappings add entries for files still missing
+    engine = ManifestEngine()
+    written = engine.write(
+        expected_images={filename: None for filename in IMAGE_MAPPINGS},
+        expected_audio={"ambient": list(AUDIO_SOURCES["ambient"])},
+    )
     
+    for name, changed in written.items():
+        print(f"   {name}/manifest.json: {'updated' if changed else 'unchanged'}")
+    print(f"   {engine.probed} files probed, {engine.reused} reused from cache")
     print("✅ Manifests created!")
 
 def main():
+    parser = argparse.ArgumentParser(description='Download images and audio for Musical Map of India')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Number of concurrent downloads (default: {DEFAULT_WORKERS})'
+    )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Revalidate existing images with ETag/Last-Modified instead of skipping them'
+    )
+    parser.add_argument(
+        '--retry-failed',
+        action='store_true',
+        help='Only retry images whose last download failed (replacing their placeholders)'
+    )
+    parser.add_argument(
+        '--older-than',
+        type=parse_age,
+        help='With --retry-failed, only failures older than this (e.g. 30m, 6h, 2d)'
+    )
+    args = parser.parse_args()
+    
     print("🚀 Starting comprehensive asset download...\n")
     print("=" * 60)
     
-    download_images()
+    download_images(max(args.workers, 1), refresh=args.refresh,
+                    retry_failed=args.retry_failed, older_than=args.older_than)
     setup_audio()
     create_manifests()
     
@@ -8,9 +8,18 @@ import subprocess
 import os
 import sys
 import time
+import shutil
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime, timedelta
 
+from rate_limiter import LIMITER
+from asset_store import AssetStore
+from job_state import JobState, parse_age
+
 # Audio file mappings: filename -> search query
 # Each search query is crafted to find the most authentic recording
 AUDIO_QUERIES = {
@@ -163,58 +172,69 @@ ENSEMBLE_DIR = AUDIO_DIR / "ensembles"
 INSTRUMENTS_DIR = AUDIO_DIR / "instruments"
 LOG_FILE = SCRIPT_DIR / "audio_download_log.txt"
 
+# Concurrent spotdl subprocesses (each one mostly waits on the network)
+DEFAULT_WORKERS = 4
+
+# Replaced recordings are pinned here by content hash instead of piling up as .backup copies
+ASSET_STORE = AssetStore()
+
 # Ensure directories exist
 AUDIO_DIR.mkdir(parents=True, exist_ok=True)
 ENSEMBLE_DIR.mkdir(parents=True, exist_ok=True)
 INSTRUMENTS_DIR.mkdir(parents=True, exist_ok=True)
 
+_log_lock = threading.Lock()
+
 def log_message(message, to_file=True):
-    """Log message to console and file"""
-    print(message)
-    if to_file:
-        with open(LOG_FILE, 'a', encoding='utf-8') as f:
-            timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
-            f.write(f"[{timestamp}] {message}\n")
+    """Log message to console and file (safe to call from worker threads)"""
+    with _log_lock:
+        print(message)
+        if to_file:
+            with open(LOG_FILE, 'a', encoding='utf-8') as f:
+                timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+                f.write(f"[{timestamp}] {message}\n")
 
-def print_progress_bar(current, total, start_time, successful, failed):
-    """Print a fancy progress bar with statistics"""
-    percentage = (current / total) * 100
-    filled = int(percentage / 2)  # 50 chars wide bar
-    bar = '█' * filled + '░' * (50 - filled)
-    
-    # Calculate time estimates
-    elapsed = time.time() - start_time
-    if current > 0:
-        avg_time_per_file = elapsed / current
-        remaining_files = total - current
-        eta_seconds = avg_time_per_file * remaining_files
-        eta = str(timedelta(seconds=int(eta_seconds)))
-    else:
-        eta = "calculating..."
-    
-    elapsed_str = str(timedelta(seconds=int(elapsed)))
-    
-    # Print progress bar
-    print(f"\n{'='*70}")
-    print(f"📊 PROGRESS: [{bar}] {percentage:.1f}%")
-    print(f"{'='*70}")
-    print(f"  📥 Downloaded: {current}/{total} files")
-    print(f"  ✅ Successful: {successful}")
-    print(f"  ❌ Failed: {failed}")
-    print(f"  ⏱️  Elapsed: {elapsed_str}")
-    print(f"  ⏳ ETA: {eta}")
-    print(f"{'='*70}\n")
+class ProgressTracker:
+    """Aggregates per-job results from the worker pool into one status line each"""
+    
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.successful = 0
+        self.failed = 0
+        self.start_time = time.time()
+        self.lock = threading.Lock()
+    
+    def update(self, filename, ok, job_seconds):
+        """Record a finished job and log a single progress line for it"""
+        with self.lock:
+            self.done += 1
+            if ok:
+                self.successful += 1
+            else:
+                self.failed += 1
+            elapsed = time.time() - self.start_time
+            eta = elapsed / self.done * (self.total - self.done)
+            line = (
+                f"[{self.done}/{self.total}] {'✅' if ok else '❌'} {filename} ({job_seconds:.0f}s)"
+                f" | ok {self.successful} · failed {self.failed}"
+                f" | elapsed {timedelta(seconds=int(elapsed))} · ETA {timedelta(seconds=int(eta))}"
+            )
+        log_message(line)
 
-def download_audio(filename, query, output_dir):
-    """Download audio using spotdl"""
+def download_audio(filename, query, scratch_dir):
+    """
+    Download audio using spotdl into a scratch directory owned by this job
+    Returns None on success, otherwise a short error message
+    """
     try:
-        log_message(f"\n[{filename}] Searching: '{query}'")
+        log_message(f"[{filename}] Searching: '{query}'")
         
         # spotdl command with output directory
         command = [
             "spotdl",
             query,
-            "--output", str(output_dir),
+            "--output", str(scratch_dir),
             "--format", "mp3",
             "--bitrate", "192k",
         ]
@@ -228,59 +248,96 @@ def download_audio(filename, query, output_dir):
             timeout=120  # 2 minute timeout per song
         )
         
-        # spotdl saves with its own naming - we need to find and rename the file
-        # It typically saves as "Artist - Title.mp3"
-        # We'll look for the most recently created mp3 file
-        
-        log_message(f"  ✅ Downloaded successfully", to_file=True)
-        return True
+        return None
         
     except subprocess.TimeoutExpired:
-        log_message(f"  ⏱️  Timeout - skipping", to_file=True)
-        return False
+        log_message(f"[{filename}] ⏱️  Timeout - skipping", to_file=True)
+        return "timeout after 120s"
     except subprocess.CalledProcessError as e:
-        log_message(f"  ❌ Error: {e.stderr[:200]}", to_file=True)
-        return False
+        log_message(f"[{filename}] ❌ Error: {e.stderr[:200]}", to_file=True)
+        return f"spotdl exited {e.returncode}: {e.stderr[:200]}"
     except FileNotFoundError:
-        log_message(f"  ❌ ERROR: 'spotdl' command not found!", to_file=True)
+        log_message(f"[{filename}] ❌ ERROR: 'spotdl' command not found!", to_file=True)
         log_message("  Please install: pipx install spotdl", to_file=True)
-        return False
+        return "spotdl not found"
     except Exception as e:
-        log_message(f"  ❌ Unexpected error: {str(e)[:200]}", to_file=True)
-        return False
+        log_message(f"[{filename}] ❌ Unexpected error: {str(e)[:200]}", to_file=True)
+        return str(e)[:200]
 
-def rename_downloaded_file(output_dir, target_filename):
-    """Find most recently downloaded file and rename it"""
+def move_downloaded_file(scratch_dir, target_path):
+    """
+    Move the track spotdl wrote into this job's scratch directory to target_path
+    Only this job writes to scratch_dir, so there is no guessing by mtime.
+    Returns the SHA-256 of the saved file, or None
+    """
     try:
-        # Find all mp3 files in directory
-        mp3_files = list(output_dir.glob("*.mp3"))
+        # spotdl names files "Artist - Title.mp3"; a query normally yields one.
+        # If it yields more, keep the largest (the full track) - deterministic either way
+        mp3_files = sorted(scratch_dir.glob("*.mp3"), key=lambda p: (-p.stat().st_size, p.name))
         if not mp3_files:
-            return False
-        
-        # Get the most recently modified file
-        latest_file = max(mp3_files, key=lambda p: p.stat().st_mtime)
+            log_message(f"[{target_path.name}] ⚠️  spotdl finished but wrote no mp3", to_file=True)
+            return None
         
-        # If it's already the target name, skip
-        if latest_file.name == target_filename:
-            return True
-        
-        # Rename to target filename
-        target_path = output_dir / target_filename
         if target_path.exists():
-            # Backup existing file
-            backup_path = output_dir / f"{target_filename}.backup"
-            target_path.rename(backup_path)
+            # Keep the previous recording in the asset store (deduplicated by hash)
+            digest = ASSET_STORE.pin(ASSET_STORE.key_for(target_path) + ".backup", target_path)
+            log_message(f"[{target_path.name}] 📌 Previous version kept in asset store: {digest[:12]}", to_file=True)
         
-        latest_file.rename(target_path)
-        log_message(f"  📝 Renamed to: {target_filename}", to_file=True)
-        return True
+        mp3_files[0].replace(target_path)
+        digest = ASSET_STORE.ingest(target_path)
+        log_message(f"[{target_path.name}] 📝 Saved from: {mp3_files[0].name}", to_file=True)
+        return digest
         
     except Exception as e:
-        log_message(f"  ⚠️  Could not rename: {e}", to_file=True)
-        return False
+        log_message(f"[{target_path.name}] ⚠️  Could not move download: {e}", to_file=True)
+        return None
+
+def run_job(jobs, filename, query, output_dir):
+    """One spotdl download in its own scratch directory, recorded in `jobs`. Returns (ok, seconds)"""
+    # Rate limiting - be nice to services (paced per start, not slept after each file)
+    LIMITER.acquire('spotdl')
+    
+    started = time.time()
+    jobs.start(filename)
+    target_path = output_dir / filename
+    
+    # Scratch dir lives next to the target so the final move is a same-disk rename
+    scratch_dir = Path(tempfile.mkdtemp(prefix=".spotdl-", dir=output_dir))
+    try:
+        error = download_audio(filename, query, scratch_dir)
+        digest = None if error else move_downloaded_file(scratch_dir, target_path)
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    
+    duration = time.time() - started
+    if digest:
+        jobs.succeed(filename, size=target_path.stat().st_size, duration=duration, sha256=digest)
+    else:
+        jobs.fail(filename, error or "no mp3 produced", duration=duration)
+    return bool(digest), duration
 
 def main():
     """Main download script"""
+    parser = argparse.ArgumentParser(description='Download audio for Musical Map of India using spotdl')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Number of concurrent spotdl processes (default: {DEFAULT_WORKERS})'
+    )
+    parser.add_argument(
+        '--retry-failed',
+        action='store_true',
+        help='Only re-run jobs whose last attempt failed'
+    )
+    parser.add_argument(
+        '--older-than',
+        type=parse_age,
+        help='With --retry-failed, only failures older than this (e.g. 30m, 6h, 2d)'
+    )
+    args = parser.parse_args()
+    workers = max(args.workers, 1)
+    
     log_message("=" * 70)
     log_message("🎵 Musical Map of India - Audio Downloader (spotdl)")
     log_message("=" * 70)
@@ -314,70 +371,64 @@ def main():
         sys.exit(1)
     
     # Download statistics
-    successful = 0
-    failed = 0
     skipped = 0
-    start_time = time.time()
-    
-    # Create checkpoint file for resume capability
-    checkpoint_file = SCRIPT_DIR / ".download_checkpoint.txt"
-    completed_files = set()
-    if checkpoint_file.exists():
-        with open(checkpoint_file, 'r') as f:
-            completed_files = set(line.strip() for line in f)
-        log_message(f"📂 Resuming from checkpoint: {len(completed_files)} files already processed\n")
-    
-    # Process each audio file
-    for idx, (filename, query, output_dir) in enumerate(tasks, 1):
-        # Show progress bar every file
-        print_progress_bar(idx - 1, len(tasks), start_time, successful, failed)
-        
-        log_message(f"[{idx}/{len(tasks)}] Processing: {filename}")
-        log_message(f"{'='*70}")
-        
-        # Skip if already in checkpoint
-        if filename in completed_files:
-            log_message(f"  ✓ Already processed (from checkpoint), skipping")
+    
+    # Job state (status, attempts, errors, hashes) lives in the shared SQLite store
+    jobs = JobState("spotdl")
+    imported = jobs.import_checkpoint(SCRIPT_DIR / ".download_checkpoint.txt")
+    if imported:
+        log_message(f"📂 Imported {imported} entries from the old checkpoint file\n")
+    completed_files = jobs.completed()
+    retry_targets = jobs.failures(older_than=args.older_than) if args.retry_failed else None
+    if completed_files:
+        log_message(f"📂 Resuming: {len(completed_files)} files already processed\n")
+    
+    # Work out which jobs actually need spotdl
+    pending = []
+    for filename, query, output_dir in tasks:
+        if retry_targets is not None and filename not in retry_targets:
             skipped += 1
             continue
         
+        # Skip if already completed in an earlier run and the file is still there
+        target_path = output_dir / filename
+        if filename in completed_files:
+            if target_path.exists() and target_path.stat().st_size > 0:
+                log_message(f"[{filename}] ✓ Already processed, skipping")
+                skipped += 1
+                continue
+            log_message(f"[{filename}] ⚠️  Processed earlier but the file is missing or empty, downloading again")
+            jobs.reset(filename)
+        
         # Check if file already exists and is a real audio file (not placeholder)
         # Placeholders are ~172KB, real audio should be much larger (>300KB)
-        target_path = output_dir / filename
         if target_path.exists() and target_path.stat().st_size > 300000:  # > 300KB
-            log_message(f"  ⏭️  Already exists ({target_path.stat().st_size // 1024}KB), skipping")
+            log_message(f"[{filename}] ⏭️  Already exists ({target_path.stat().st_size // 1024}KB), skipping")
             skipped += 1
-            # Add to checkpoint
-            with open(checkpoint_file, 'a') as f:
-                f.write(f"{filename}\n")
+            jobs.skip(filename, size=target_path.stat().st_size)
             continue
         
-        # Download the audio
-        success = download_audio(filename, query, output_dir)
-        
-        if success:
-            # Try to rename the downloaded file
-            if rename_downloaded_file(output_dir, filename):
-                successful += 1
-                log_message(f"  ✅ SUCCESS: {filename}")
-                # Add to checkpoint
-                with open(checkpoint_file, 'a') as f:
-                    f.write(f"{filename}\n")
-            else:
-                log_message(f"  ⚠️  Downloaded but couldn't rename to {filename}")
-                successful += 1
-                # Add to checkpoint anyway
-                with open(checkpoint_file, 'a') as f:
-                    f.write(f"{filename}\n")
-        else:
-            failed += 1
-            log_message(f"  ❌ FAILED: {filename}")
-        
-        # Rate limiting - be nice to services
-        time.sleep(2)
-    
-    # Final progress bar
-    print_progress_bar(len(tasks), len(tasks), start_time, successful, failed)
+        pending.append((jobs, filename, query, output_dir))
+    
+    log_message(f"\n🚀 Downloading {len(pending)} files with {workers} workers\n")
+    progress = ProgressTracker(len(pending))
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, *task): task[1] for task in pending}
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                ok, job_seconds = future.result()
+            except Exception as e:
+                log_message(f"[{filename}] ❌ Unexpected error: {str(e)[:200]}")
+                ok, job_seconds = False, 0.0
+                jobs.fail(filename, e)
+            progress.update(filename, ok, job_seconds)
+    
+    ASSET_STORE.save()
+    jobs.close()
+    successful = progress.successful
+    failed = progress.failed
     
     # Final summary
     log_message("\n" + "=" * 70)
@@ -387,14 +438,9 @@ def main():
     log_message(f"⏭️  Skipped (already exist): {skipped}")
     log_message(f"❌ Failed: {failed}")
     log_message(f"📝 Total processed: {successful + failed + skipped}/{len(tasks)}")
+    log_message(f"⏱️  Elapsed: {timedelta(seconds=int(time.time() - progress.start_time))}")
     log_message(f"📄 Log saved to: {LOG_FILE}")
     
-    # Clean up checkpoint if all complete
-    if successful + skipped == len(tasks):
-        if checkpoint_file.exists():
-            checkpoint_file.unlink()
-            log_message(f"🗑️  Checkpoint file removed (all files complete)")
-    
     log_message("=" * 70)
     
     if successful > 0:
@@ -403,13 +449,13 @@ def main():
     
     if failed > 0:
         log_message(f"\n⚠️  {failed} downloads failed. Check the log for details.")
-        log_message("You can re-run this script - it will resume from where it left off.")
+        log_message("Re-run with --retry-failed to try only those again.")
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
         log_message("\n\n⚠️  Download interrupted by user")
-        log_message("Progress saved to checkpoint file!")
+        log_message("Progress saved to the job-state database!")
         log_message("You can re-run the script to continue - already downloaded files will be skipped")
         sys.exit(1)
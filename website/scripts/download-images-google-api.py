@@ -10,20 +10,26 @@ import json
 import time
 import requests
 import argparse
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import quote_plus
 
 try:
     from dotenv import load_dotenv
-    from PIL import Image
-    import io
+    # Pillow is only used by the pipeline's worker processes
+    from image_pipeline import ImagePipeline, ImageTooLarge, read_capped
 except ImportError:
     print("❌ Missing required libraries. Please install:")
     print("   pip install requests pillow python-dotenv")
     sys.exit(1)
 
+from asset_http import fetch, commit_part, run_jobs, DEFAULT_WORKERS
+from image_dedup import DuplicateIndex, HashCache, image_hashes
+from http_cache import HttpCache
+from job_state import JobState
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -41,7 +47,22 @@ LOG_FILE = SCRIPT_DIR / 'download_log.txt'
 # Download settings
 MAX_RETRIES = 3
 TIMEOUT = 10
-RATE_LIMIT_DELAY = 1  # Seconds between requests
+PLACEHOLDER_MAX_BYTES = 50000  # Generated placeholders are smaller than this
+# Request pacing per host lives in rate_limiter.HOST_RATES
+
+# ETag/Last-Modified validators for every image URL picked from search results
+HTTP_CACHE = HttpCache()
+
+# Per-image status, attempts and errors, shared with the other downloaders
+JOBS = JobState('google-images')
+
+# Perceptual hashes of the library, so a result that duplicates another image is rejected
+HASH_CACHE = HashCache()
+DUPLICATES: Optional[DuplicateIndex] = None
+
+# Search results are reused for this long before asking the API again
+SEARCH_CACHE_FILE = SCRIPT_DIR / '.search_cache.json'
+SEARCH_CACHE_TTL_DAYS = 30
 
 # Search terms for better results
 SEARCH_CONTEXT = {
@@ -50,14 +71,23 @@ SEARCH_CONTEXT = {
     'performance': 'indian traditional music performance'
 }
 
+# Query per category; {name} is the readable form of the filename
+QUERY_TEMPLATES = {
+    'instruments': '{name} instrument',
+    'artists': '{name} musician india',
+}
+
+_log_lock = threading.Lock()
+
 def log(message: str, level: str = 'INFO'):
     """Log message to console and file"""
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     log_message = f"[{timestamp}] [{level}] {message}"
-    print(log_message)
     
-    with open(LOG_FILE, 'a', encoding='utf-8') as f:
-        f.write(log_message + '\n')
+    with _log_lock:
+        print(log_message)
+        with open(LOG_FILE, 'a', encoding='utf-8') as f:
+            f.write(log_message + '\n')
 
 def check_credentials():
     """Verify API credentials are set"""
@@ -71,94 +101,172 @@ def check_credentials():
     
     log("✅ API credentials loaded successfully")
 
-def search_image(query: str, context: str = '') -> Optional[str]:
+class SearchCache:
     """
-    Search for an image using Google Custom Search API
-    Returns the URL of the best matching image
+    Custom Search results keyed by the normalized query and params, with a TTL
+    Reruns reuse earlier results instead of spending a quota unit per image
     """
+    
+    def __init__(self, path: Path = SEARCH_CACHE_FILE, ttl_days: float = SEARCH_CACHE_TTL_DAYS):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.lock = threading.Lock()
+        self.entries: Dict[str, dict] = {}
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('entries', {})
+            except (OSError, ValueError):
+                self.entries = {}
+    
+    @staticmethod
+    def key(params: Dict[str, object]) -> str:
+        """Stable key: case/whitespace-insensitive query, the API key left out"""
+        normalized = {k: v for k, v in params.items() if k != 'key'}
+        normalized['q'] = ' '.join(str(params.get('q', '')).lower().split())
+        return json.dumps(normalized, sort_keys=True)
+    
+    def get(self, params: Dict[str, object]) -> Optional[List[str]]:
+        """Cached image links for these params, or None if missing or expired"""
+        with self.lock:
+            entry = self.entries.get(self.key(params))
+        if not entry or time.time() - entry['fetched'] > self.ttl:
+            return None
+        return entry['links']
+    
+    def put(self, params: Dict[str, object], links: List[str]):
+        with self.lock:
+            self.entries[self.key(params)] = {'links': links, 'fetched': time.time()}
+    
+    def save(self):
+        with self.lock:
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'entries': self.entries}, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+SEARCH_CACHE = SearchCache()
+API_CALLS = 0
+_api_calls_lock = threading.Lock()
+
+def search_params(query: str, context: str = '') -> Dict[str, object]:
+    """Custom Search request parameters for a query"""
     # Construct search query with context for better results
     full_query = f"{query} {context}".strip()
     
-    params = {
+    return {
         'key': API_KEY,
         'cx': SEARCH_ENGINE_ID,
         'q': full_query,
         'searchType': 'image',
-        'num': 3,  # Get top 3 results to choose best one
+        'num': 3,  # Get top 3 results - the others are fallbacks if the first fails
         'imgSize': 'large',  # Prefer large images
         'safe': 'active',  # Safe search
         'fileType': 'jpg,png',
     }
+
+def search_images(query: str, context: str = '') -> List[str]:
+    """
+    Search for images using Google Custom Search API
+    Returns candidate image URLs, best first. Cached results cost no quota
+    """
+    global API_CALLS
+    params = search_params(query, context)
+    
+    cached = SEARCH_CACHE.get(params)
+    if cached is not None:
+        log(f"  Using {len(cached)} cached result(s)")
+        return cached
     
     try:
-        response = requests.get(BASE_URL, params=params, timeout=TIMEOUT)
+        with _api_calls_lock:
+            API_CALLS += 1
+        response = fetch(BASE_URL, max_retries=MAX_RETRIES, params=params, timeout=TIMEOUT)
         response.raise_for_status()
         data = response.json()
         
-        if 'items' in data and len(data['items']) > 0:
-            # Return the first result's image URL
-            image_url = data['items'][0]['link']
-            log(f"  Found image: {image_url[:80]}...")
-            return image_url
+        links = [item['link'] for item in data.get('items', []) if item.get('link')]
+        SEARCH_CACHE.put(params, links)
+        if links:
+            log(f"  Found image: {links[0][:80]}...")
         else:
             log(f"  No results found for: {query}", 'WARNING')
-            return None
+        return links
             
     except requests.exceptions.RequestException as e:
         log(f"  API request failed: {str(e)}", 'ERROR')
-        return None
+        return []
     except json.JSONDecodeError:
         log(f"  Invalid API response", 'ERROR')
-        return None
+        return []
 
-def download_image(url: str, filepath: Path, max_size_mb: int = 5) -> bool:
+def download_image(url: str, filepath: Path, pipeline: ImagePipeline, max_size_mb: int = 5) -> bool:
     """
     Download image from URL and save to filepath
-    Returns True if successful, False otherwise
+    The body is streamed under the size cap on this thread, then decoded and
+    resized on the pipeline's process pool
+    An existing copy recorded in HTTP_CACHE is revalidated with a conditional request
+    Returns True if successful (or unchanged), False otherwise
     """
     try:
-        response = requests.get(url, timeout=TIMEOUT, stream=True)
+        headers = HTTP_CACHE.conditional_headers(url, filepath)
+        response = fetch(url, max_retries=MAX_RETRIES, headers=headers, timeout=TIMEOUT, stream=True)
+        if response.status_code == 304:
+            response.close()
+            HTTP_CACHE.touch(url)
+            log(f"  ♻️  Unchanged upstream: {filepath.name}")
+            return True
         response.raise_for_status()
         
-        # Check file size
-        content_length = response.headers.get('content-length')
-        if content_length and int(content_length) > max_size_mb * 1024 * 1024:
-            log(f"  Image too large ({int(content_length)/1024/1024:.1f}MB), skipping", 'WARNING')
+        # Download image data, giving up as soon as it passes the cap
+        try:
+            image_data = read_capped(response, max_size_mb * 1024 * 1024)
+        except ImageTooLarge as e:
+            log(f"  Image too large ({e}), skipping", 'WARNING')
             return False
         
-        # Download image data
-        image_data = response.content
-        
-        # Validate it's actually an image using PIL
+        # Validate it's actually an image using PIL, then flatten, resize and save as JPEG
+        # Write beside the target and rename, so a crash never leaves half a JPEG
+        part_path = filepath.with_name(filepath.name + '.part')
         try:
-            img = Image.open(io.BytesIO(image_data))
-            
-            # Convert RGBA to RGB if necessary
-            if img.mode == 'RGBA':
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                rgb_img.paste(img, mask=img.split()[3])
-                img = rgb_img
-            
-            # Resize if too large (keep aspect ratio)
-            max_width = 1920
-            max_height = 1080
-            if img.width > max_width or img.height > max_height:
-                img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-                log(f"  Resized image to {img.width}x{img.height}")
-            
-            # Save as JPEG
-            img.save(filepath, 'JPEG', quality=85, optimize=True)
-            log(f"  ✅ Saved: {filepath.name}")
-            return True
-            
+            width, height, resized = pipeline.normalize(image_data, part_path)
         except Exception as e:
+            part_path.unlink(missing_ok=True)
             log(f"  Invalid image format: {str(e)}", 'ERROR')
             return False
+        
+        name = filepath.relative_to(IMAGES_DIR).as_posix()
+        if DUPLICATES is not None:
+            hashes = image_hashes(part_path)
+            matches = DUPLICATES.matches(hashes, exclude=name)
+            if matches:
+                part_path.unlink(missing_ok=True)
+                log(f"  Duplicate of {matches[0][1]} (distance {matches[0][0]}), rejecting", 'WARNING')
+                return False
+        
+        if resized:
+            log(f"  Resized image to {width}x{height}")
+        commit_part(part_path, filepath)
+        if DUPLICATES is not None:
+            DUPLICATES.add(name, HASH_CACHE.hashes_for(filepath))
+        HTTP_CACHE.record(url, response, filepath)
+        log(f"  ✅ Saved: {filepath.name}")
+        return True
             
     except requests.exceptions.RequestException as e:
         log(f"  Download failed: {str(e)}", 'ERROR')
         return False
 
+def record_job(target: str, ok: bool, started: float, filepath: Path, error: str = ''):
+    """Store the outcome of one image job in the job-state database"""
+    duration = time.time() - started
+    if ok:
+        url = HTTP_CACHE.url_for(filepath)
+        entry = (HTTP_CACHE.get(url) if url else None) or {}
+        JOBS.succeed(target, size=filepath.stat().st_size, duration=duration, sha256=entry.get('sha256'))
+    else:
+        JOBS.fail(target, error or 'download failed', duration=duration)
+
 def get_instrument_list() -> Dict[str, str]:
     """Get list of all instruments from our generated placeholders"""
     instruments_dir = IMAGES_DIR / 'instruments'
@@ -185,124 +293,137 @@ def get_artist_list() -> Dict[str, str]:
     
     return artists
 
-def download_instruments(limit: Optional[int] = None):
-    """Download images for all instruments"""
-    log("\n" + "="*60)
-    log("DOWNLOADING INSTRUMENT IMAGES")
-    log("="*60)
-    
-    instruments = get_instrument_list()
-    context = SEARCH_CONTEXT['instruments']
+def is_placeholder(filepath: Path) -> bool:
+    """Missing files and the small generated placeholders both need a real image"""
+    return not filepath.exists() or filepath.stat().st_size <= PLACEHOLDER_MAX_BYTES
+
+def plan_downloads(kind: str, limit: Optional[int] = None, refresh: bool = False) -> List[Tuple[str, str, str]]:
+    """
+    Work out which targets of a category actually need work
+    Returns (filename, name, action) tuples; action is 'search' for missing or
+    placeholder images and 'revalidate' for real ones when refreshing
+    """
+    names = CATEGORY_LISTS[kind]()
+    plan = []
+    for filename, name in names.items():
+        filepath = IMAGES_DIR / kind / filename
+        if is_placeholder(filepath):
+            plan.append((filename, name, 'search'))
+        elif refresh and HTTP_CACHE.url_for(filepath):
+            plan.append((filename, name, 'revalidate'))
     
     if limit:
-        instruments = dict(list(instruments.items())[:limit])
-    
-    total = len(instruments)
-    success = 0
-    failed = []
-    
-    for idx, (filename, name) in enumerate(instruments.items(), 1):
-        log(f"\n[{idx}/{total}] Processing: {name}")
-        
-        filepath = IMAGES_DIR / 'instruments' / filename
-        
-        # Skip if already exists and not a placeholder
-        if filepath.exists() and filepath.stat().st_size > 50000:
-            log(f"  ⏭️  Already exists, skipping")
-            success += 1
-            continue
-        
-        # Search for image
-        query = f"{name} instrument"
-        image_url = search_image(query, context)
-        
-        if image_url:
-            # Try to download
-            if download_image(image_url, filepath):
-                success += 1
-            else:
-                failed.append(name)
-                log(f"  ❌ Failed to download", 'ERROR')
-        else:
-            failed.append(name)
-        
-        # Rate limiting
-        if idx < total:
-            time.sleep(RATE_LIMIT_DELAY)
+        plan = plan[:limit]
+    return plan
+
+def queries_needed(plan: List[Tuple[str, str, str]], kind: str) -> int:
+    """How many planned searches are not already answered by the search cache"""
+    context = SEARCH_CONTEXT[kind]
+    return sum(
+        1 for _, name, action in plan
+        if action == 'search' and SEARCH_CACHE.get(search_params(QUERY_TEMPLATES[kind].format(name=name), context)) is None
+    )
+
+def process_target(kind: str, filename: str, name: str, action: str, pipeline: ImagePipeline) -> bool:
+    """Search (or revalidate) and download one image. Runs on a network thread"""
+    filepath = IMAGES_DIR / kind / filename
+    target = f"{kind}/{filename}"
+    started = time.time()
+    JOBS.start(target)
+    
+    if action == 'revalidate':
+        # Revalidate the URL we saved last time - no search quota spent
+        cached_url = HTTP_CACHE.url_for(filepath)
+        ok = download_image(cached_url, filepath, pipeline)
+        record_job(target, ok, started, filepath, f"revalidation failed: {cached_url}")
+        return ok
+    
+    # Search for image
+    query = QUERY_TEMPLATES[kind].format(name=name)
+    candidates = search_images(query, SEARCH_CONTEXT[kind])
+    
+    # Fall back to the other results when the first one fails validation
+    for rank, image_url in enumerate(candidates):
+        if rank:
+            log(f"  Trying alternate result {rank + 1}/{len(candidates)} for {name}")
+        if download_image(image_url, filepath, pipeline):
+            record_job(target, True, started, filepath)
+            return True
     
-    log(f"\n{'='*60}")
-    log(f"INSTRUMENTS COMPLETE: {success}/{total} successful")
-    if failed:
-        log(f"Failed: {', '.join(failed)}", 'WARNING')
-    log(f"{'='*60}\n")
+    if candidates:
+        log(f"  ❌ Failed to download {name}", 'ERROR')
+        record_job(target, False, started, filepath, f"all {len(candidates)} results failed")
+    else:
+        record_job(target, False, started, filepath, "no search results")
+    return False
 
-def download_artists(limit: Optional[int] = None):
-    """Download images for all artists"""
+def download_category(kind: str, pipeline: ImagePipeline, limit: Optional[int] = None,
+                      refresh: bool = False, workers: int = DEFAULT_WORKERS):
+    """Download images for every planned target of one category"""
     log("\n" + "="*60)
-    log("DOWNLOADING ARTIST IMAGES")
+    log(f"DOWNLOADING {kind.upper().rstrip('S')} IMAGES")
     log("="*60)
     
-    artists = get_artist_list()
-    context = SEARCH_CONTEXT['artists']
+    plan = plan_downloads(kind, limit, refresh)
+    skipped = len(CATEGORY_LISTS[kind]()) - len(plan)
+    if skipped:
+        log(f"⏭️  {skipped} images already present, not planned")
     
-    if limit:
-        artists = dict(list(artists.items())[:limit])
-    
-    total = len(artists)
+    total = len(plan)
     success = 0
     failed = []
     
-    for idx, (filename, name) in enumerate(artists.items(), 1):
-        log(f"\n[{idx}/{total}] Processing: {name}")
-        
-        filepath = IMAGES_DIR / 'artists' / filename
-        
-        # Skip if already exists and not a placeholder
-        if filepath.exists() and filepath.stat().st_size > 50000:
-            log(f"  ⏭️  Already exists, skipping")
+    jobs = [(kind, filename, name, action, pipeline) for filename, name, action in plan]
+    for idx, (job, result) in enumerate(run_jobs(jobs, process_target, workers), 1):
+        name = job[2]
+        if isinstance(result, Exception):
+            log(f"  ❌ {name}: {result}", 'ERROR')
+            JOBS.fail(f"{kind}/{job[1]}", result)
+            result = False
+        if result:
             success += 1
-            continue
-        
-        # Search for image
-        query = f"{name} musician india"
-        image_url = search_image(query, context)
-        
-        if image_url:
-            # Try to download
-            if download_image(image_url, filepath):
-                success += 1
-            else:
-                failed.append(name)
-                log(f"  ❌ Failed to download", 'ERROR')
         else:
             failed.append(name)
-        
-        # Rate limiting
-        if idx < total:
-            time.sleep(RATE_LIMIT_DELAY)
+        log(f"[{idx}/{total}] {'✅' if result else '❌'} {name}")
+    
+    HTTP_CACHE.save()
+    SEARCH_CACHE.save()
     
     log(f"\n{'='*60}")
-    log(f"ARTISTS COMPLETE: {success}/{total} successful")
+    log(f"{kind.upper()} COMPLETE: {success}/{total} successful")
     if failed:
         log(f"Failed: {', '.join(failed)}", 'WARNING')
     log(f"{'='*60}\n")
 
-def estimate_quota(download_type: str, limit: Optional[int] = None):
-    """Estimate API quota usage"""
-    instruments = len(get_instrument_list())
-    artists = len(get_artist_list())
+def download_instruments(pipeline: ImagePipeline, limit: Optional[int] = None, refresh: bool = False,
+                         workers: int = DEFAULT_WORKERS):
+    """Download images for all instruments"""
+    download_category('instruments', pipeline, limit, refresh, workers)
+
+def download_artists(pipeline: ImagePipeline, limit: Optional[int] = None, refresh: bool = False,
+                     workers: int = DEFAULT_WORKERS):
+    """Download images for all artists"""
+    download_category('artists', pipeline, limit, refresh, workers)
+
+CATEGORY_LISTS = {
+    'instruments': get_instrument_list,
+    'artists': get_artist_list,
+}
+
+def estimate_quota(download_type: str, limit: Optional[int] = None, refresh: bool = False) -> int:
+    """Estimate API quota usage for what the planner would actually search. Returns the query count"""
+    kinds = ['instruments', 'artists'] if download_type == 'all' else [download_type]
     
-    if download_type == 'instruments':
-        total = instruments if not limit else min(limit, instruments)
-    elif download_type == 'artists':
-        total = artists if not limit else min(limit, artists)
-    else:  # all
-        total = instruments + artists
-        if limit:
-            total = min(limit, total)
+    planned = 0
+    total = 0
+    for kind in kinds:
+        plan = plan_downloads(kind, limit, refresh)
+        planned += len(plan)
+        total += queries_needed(plan, kind)
     
     log(f"\n📊 Quota Estimate:")
-    log(f"   Images to download: {total}")
+    log(f"   Images planned: {planned}")
+    log(f"   API queries needed: {total} (the rest come from the search cache)")
     log(f"   Free daily quota: 100")
     log(f"   Cost after quota: $5 per 1000 queries")
     
@@ -315,6 +436,7 @@ def estimate_quota(download_type: str, limit: Optional[int] = None):
         log(f"\n   Options:")
         log(f"   1. Download in batches over multiple days")
         log(f"   2. Enable billing (very cheap for one-time use)")
+    return total
 
 def main():
     parser = argparse.ArgumentParser(
@@ -342,13 +464,41 @@ Examples:
         help='Limit number of images to download (useful for testing)'
     )
     
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Revalidate existing images against their source URL (ETag/Last-Modified)'
+    )
+    
     parser.add_argument(
         '--estimate',
         action='store_true',
         help='Show quota estimate without downloading'
     )
     
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=SEARCH_CACHE_TTL_DAYS,
+        help=f'Days to reuse cached search results (default: {SEARCH_CACHE_TTL_DAYS}, 0 = always query)'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Parallel downloads (default: {DEFAULT_WORKERS})'
+    )
+    
+    parser.add_argument(
+        '--cpu-workers',
+        type=int,
+        default=None,
+        help='Image decode/resize processes (default: one per CPU core, 0 = inline)'
+    )
+    
     args = parser.parse_args()
+    SEARCH_CACHE.ttl = args.cache_ttl * 86400
     
     # Initialize
     log("\n🎵 Musical Map of India - Image Downloader")
@@ -358,34 +508,42 @@ Examples:
     check_credentials()
     
     # Estimate quota
-    estimate_quota(args.type, args.limit)
+    queries = estimate_quota(args.type, args.limit, args.refresh)
     
     if args.estimate:
         log("\n✅ Estimate complete. Run without --estimate to download.")
         return
     
-    # Confirm before proceeding
-    log("\n⚠️  This will use your Google API quota.")
-    response = input("Continue? (yes/no): ").strip().lower()
-    
-    if response not in ['yes', 'y']:
-        log("❌ Cancelled by user")
-        return
+    # Confirm before proceeding - nothing to confirm when every search is cached
+    if queries:
+        log("\n⚠️  This will use your Google API quota.")
+        response = input("Continue? (yes/no): ").strip().lower()
+        
+        if response not in ['yes', 'y']:
+            log("❌ Cancelled by user")
+            return
     
     # Start downloading
     start_time = time.time()
     
-    if args.type in ['instruments', 'all']:
-        download_instruments(args.limit)
+    global DUPLICATES
+    DUPLICATES = DuplicateIndex.for_library(IMAGES_DIR, cache=HASH_CACHE)
+    
+    with ImagePipeline(args.cpu_workers) as pipeline:
+        if args.type in ['instruments', 'all']:
+            download_instruments(pipeline, args.limit, args.refresh, args.workers)
+        
+        if args.type in ['artists', 'all']:
+            download_artists(pipeline, args.limit, args.refresh, args.workers)
     
-    if args.type in ['artists', 'all']:
-        download_artists(args.limit)
+    HASH_CACHE.save()
     
     # Summary
     elapsed = time.time() - start_time
     log(f"\n{'='*60}")
     log(f"✅ DOWNLOAD COMPLETE")
     log(f"   Time elapsed: {elapsed/60:.1f} minutes")
+    log(f"   API queries used: {API_CALLS}")
     log(f"   Log saved to: {LOG_FILE}")
     log(f"{'='*60}\n")
 
@@ -4,10 +4,11 @@ Simple script to download images using working URLs from Unsplash and other sour
 """
 
 import os
-import requests
 import json
 from pathlib import Path
 
+from asset_http import download_to
+
 BASE_DIR = Path(__file__).parent.parent / "public"
 IMAGES_DIR = BASE_DIR / "images"
 IMAGES_DIR.mkdir(parents=True, exist_ok=True)
@@ -61,13 +62,10 @@ IMAGE_MAPPINGS = {
 def download_image(url, filepath):
     """Download image with retry"""
     try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=30, stream=True, allow_redirects=True)
-        response.raise_for_status()
+        status = download_to(url, filepath, timeout=30, allow_redirects=True)
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}")
         
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
         print(f"✅ Downloaded: {filepath.name}")
         return True
     except Exception as e:
@@ -4,10 +4,11 @@ Download images from Wikipedia/Wikimedia Commons for the Musical Map of India we
 """
 
 import os
-import requests
 import json
 from pathlib import Path
 
+from asset_http import download_to
+
 # Base directories
 BASE_DIR = Path(__file__).parent.parent / "public"
 IMAGES_DIR = BASE_DIR / "images"
@@ -54,12 +55,9 @@ PLACEHOLDER_IMAGES = {
 def download_image(url, filepath):
     """Download an image from URL"""
     try:
-        response = requests.get(url, timeout=10, stream=True)
-        response.raise_for_status()
-        
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        status = download_to(url, filepath, timeout=10)
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}")
         
         print(f"✅ Downloaded: {filepath.name}")
         return True
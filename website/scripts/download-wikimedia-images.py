@@ -4,10 +4,13 @@ Download images from Wikimedia Commons using their API
 This script searches for and downloads actual images
 """
 
-import requests
 import json
+import argparse
 from pathlib import Path
-import time
+
+from asset_http import download_to
+from http_cache import HttpCache
+from job_state import JobState
 
 BASE_DIR = Path(__file__).parent.parent / "public"
 IMAGES_DIR = BASE_DIR / "images"
@@ -47,42 +50,62 @@ DIRECT_URLS = {
     "kashmir-santoor.jpg": "https://upload.wikimedia.org/wikipedia/commons/thumb/7/7a/Santoor.jpg/800px-Santoor.jpg",
 }
 
-def download_from_url(url, filepath):
-    """Download image from direct URL"""
+def download_from_url(url, filepath, cache=None):
+    """
+    Download image from direct URL, revalidating an existing copy when a cache is given
+    Returns the HTTP status (200 downloaded, 304 unchanged), or None when the download failed
+    """
     try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=30, stream=True)
-        response.raise_for_status()
-        
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        status = download_to(url, filepath, cache=cache, timeout=30)
+        if status == 304:
+            print(f"♻️  Unchanged: {filepath.name}")
+            return status
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}")
         print(f"✅ Downloaded: {filepath.name}")
-        return True
+        return status
     except Exception as e:
         print(f"❌ Failed {filepath.name}: {e}")
-        return False
+        return None
 
 def create_placeholder_url(text, width=800, height=600):
     """Create placeholder.com URL"""
     return f"https://via.placeholder.com/{width}x{height}/e5e7eb/9ca3af?text={text.replace(' ', '+')}"
 
 def main():
+    parser = argparse.ArgumentParser(description='Download images from Wikimedia Commons')
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Revalidate existing direct downloads with ETag/Last-Modified instead of skipping them'
+    )
+    args = parser.parse_args()
+    
     print("🚀 Downloading images from Wikimedia Commons...\n")
     
+    cache = HttpCache()
+    jobs = JobState("wikimedia")
     downloaded = 0
     placeholders = 0
     
     # First, try direct URLs
     for filename, url in DIRECT_URLS.items():
         filepath = IMAGES_DIR / filename
-        if filepath.exists():
+        if filepath.exists() and not args.refresh:
             print(f"⏭️  Skipping {filename} (exists)")
             continue
         
-        if download_from_url(url, filepath):
+        jobs.start(filename)
+        status = download_from_url(url, filepath, cache)
+        if status == 200:
             downloaded += 1
-        time.sleep(0.5)  # Rate limiting
+            entry = cache.get(url) or {}
+            jobs.succeed(filename, size=entry.get('size'), sha256=entry.get('sha256'))
+        elif status == 304:
+            jobs.succeed(filename, size=filepath.stat().st_size)  # unchanged upstream
+        else:
+            jobs.fail(filename, f"download failed: {url}")
+    cache.save()
     
     # For others, use placeholder.com as reliable fallback
     print("\n📸 Creating placeholder images for remaining files...")
@@ -93,9 +116,8 @@ def main():
         
         # Use placeholder.com for reliable placeholders
         placeholder_url = create_placeholder_url(search_term.split()[0].title())
-        if download_from_url(placeholder_url, filepath):
+        if download_from_url(placeholder_url, filepath) == 200:
             placeholders += 1
-        time.sleep(0.3)
     
     print(f"\n✅ Direct downloads: {downloaded}")
     print(f"🎨 Placeholders created: {placeholders}")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Sidecar HTTP validator cache for downloaded assets
+Records ETag, Last-Modified, length and SHA-256 for every URL we fetch so
+refreshes can send conditional requests and skip the body on 304
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+CACHE_FILE = SCRIPT_DIR / '.http_cache.json'
+
+
+def file_sha256(filepath, chunk_size=1024 * 1024):
+    """SHA-256 of a file on disk"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _total_length(response):
+    """Full entity length, also for a 206 response to a resumed download"""
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range:
+        total = content_range.rsplit('/', 1)[1]
+        return total if total.isdigit() else None
+    return response.headers.get('Content-Length')
+
+
+class HttpCache:
+    """URL -> validator entries, persisted as JSON next to the scripts"""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('entries', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, url):
+        with self.lock:
+            return self.entries.get(url)
+
+    def url_for(self, filepath):
+        """Return the URL last saved to filepath, if any"""
+        target = str(Path(filepath).resolve())
+        with self.lock:
+            for url, entry in self.entries.items():
+                if entry.get('path') == target:
+                    return url
+        return None
+
+    def conditional_headers(self, url, filepath):
+        """
+        If-None-Match / If-Modified-Since headers for url, but only when the
+        local copy still matches what we recorded - otherwise ask for the body
+        """
+        entry = self.get(url)
+        filepath = Path(filepath)
+        if not entry or not filepath.exists():
+            return {}
+        if entry.get('path') != str(filepath.resolve()):
+            return {}
+        if entry.get('size') is not None and filepath.stat().st_size != entry['size']:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record(self, url, response, filepath, sha256=None):
+        """Store the validators of a 200 response saved to filepath"""
+        filepath = Path(filepath)
+        entry = {
+            'path': str(filepath.resolve()),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_length': _total_length(response),
+            'size': filepath.stat().st_size,
+            'sha256': sha256 or file_sha256(filepath),
+            'checked': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        with self.lock:
+            self.entries[url] = entry
+
+    def touch(self, url):
+        """Mark a 304 revalidation"""
+        with self.lock:
+            if url in self.entries:
+                self.entries[url]['checked'] = time.strftime('%Y-%m-%d %H:%M:%S')
+
+    def save(self):
+        """Write the cache atomically"""
+        with self.lock:
+            data = {'version': 1, 'entries': self.entries}
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
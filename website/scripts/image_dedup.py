@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Perceptual-hash duplicate detector for the image library
+Every image gets a 64-bit pHash (DCT of a 32x32 grayscale) and dHash
+(horizontal gradient signs), cached by file stat. A BK-tree over pHash
+Hamming distance finds near duplicates without comparing every pair; dHash
+confirms each match. Groups are written to a report and the non-canonical
+members get "duplicateOf" in images/manifest.json
+
+Usage:
+  python3 image_dedup.py
+  python3 image_dedup.py --threshold 6 --dry-run
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image
+
+from asset_keys import image_key
+from http_cache import file_sha256
+from image_pipeline import IMAGES_DIR, library_images
+from manifest_shards import refresh_shards
+
+SCRIPT_DIR = Path(__file__).parent
+HASH_CACHE_FILE = SCRIPT_DIR / '.image_hashes.json'
+REPORT_FILE = SCRIPT_DIR / 'image_duplicates.txt'
+MANIFEST_FILE = IMAGES_DIR / 'manifest.json'
+
+# Max Hamming distance (of 64 bits) for a near duplicate; dHash must agree within its own bound
+PHASH_THRESHOLD = 8
+DHASH_THRESHOLD = 12
+# Generated placeholders (a solid colour plus a caption) hash alike whatever the caption says;
+# an image whose most common colour covers this share of it is never a near duplicate
+FLAT_SHARE = 0.8
+
+_DCT_SIZE = 32
+_DCT_KEEP = 8
+_DCT_COS = [[math.cos(math.pi * (2 * x + 1) * u / (2 * _DCT_SIZE)) for x in range(_DCT_SIZE)]
+            for u in range(_DCT_KEEP)]
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def dhash(gray):
+    """Difference hash: one bit per neighbouring-pixel comparison on a 9x8 thumbnail"""
+    pixels = gray.resize((9, 8), Image.Resampling.LANCZOS).tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits
+
+
+def phash(gray):
+    """DCT hash: low 8x8 frequencies of a 32x32 thumbnail against their median"""
+    pixels = gray.resize((_DCT_SIZE, _DCT_SIZE), Image.Resampling.LANCZOS).tobytes()
+    rows = [pixels[i * _DCT_SIZE:(i + 1) * _DCT_SIZE] for i in range(_DCT_SIZE)]
+    # Separable 2-D DCT-II, keeping only the 8 lowest frequencies in each direction
+    row_dct = [[sum(c * p for c, p in zip(_DCT_COS[u], row)) for u in range(_DCT_KEEP)] for row in rows]
+    coeffs = [sum(_DCT_COS[v][y] * row_dct[y][u] for y in range(_DCT_SIZE))
+              for v in range(_DCT_KEEP) for u in range(_DCT_KEEP)]
+    median = sorted(coeffs[1:])[len(coeffs[1:]) // 2]  # the DC term would skew the median
+    bits = 0
+    for value in coeffs:
+        bits = (bits << 1) | (value > median)
+    return bits
+
+
+def is_flat(img):
+    """True when one colour fills most of the picture"""
+    small = img.convert('RGB').resize((64, 64), Image.Resampling.NEAREST)
+    top_count, _ = max(small.getcolors(64 * 64))
+    return top_count >= FLAT_SHARE * 64 * 64
+
+
+def image_hashes(path):
+    """{'phash', 'dhash', 'sha256', 'flat', 'width', 'height'} for an image file"""
+    img = Image.open(path)
+    width, height = img.size
+    img.draft('RGB', (64, 64))
+    gray = img.convert('L')
+    return {
+        'phash': f"{phash(gray):016x}",
+        'dhash': f"{dhash(gray):016x}",
+        'sha256': file_sha256(path),
+        'flat': is_flat(img),
+        'width': width,
+        'height': height,
+    }
+
+
+class BKTree:
+    """Metric tree over Hamming distance; search visits only subtrees that can hold a match"""
+
+    def __init__(self):
+        self.root = None
+
+    def add(self, key, item):
+        node = [key, item, {}]
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            distance = hamming(key, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, key, radius):
+        """(distance, item) pairs within radius of key"""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_key, item, children = stack.pop()
+            distance = hamming(key, node_key)
+            if distance <= radius:
+                found.append((distance, item))
+            for child_distance, child in children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        return found
+
+
+class HashCache:
+    """path -> hashes, reused while the file's mtime and size are unchanged"""
+
+    def __init__(self, path=HASH_CACHE_FILE):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('entries', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def hashes_for(self, path):
+        path = Path(path)
+        st = path.stat()
+        key = str(path.resolve())
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry and entry['mtime'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            return entry
+        entry = dict(image_hashes(path), mtime=st.st_mtime_ns, size=st.st_size)
+        with self.lock:
+            self.entries[key] = entry
+        return entry
+
+    def save(self):
+        """Write the cache atomically, forgetting files that are gone"""
+        with self.lock:
+            entries = {k: v for k, v in self.entries.items() if os.path.exists(k)}
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'entries': entries}, f)
+            os.replace(tmp_path, self.path)
+
+
+def is_match(a, b, threshold=PHASH_THRESHOLD):
+    """Same bytes, or pHash and dHash both within their bounds"""
+    if a['sha256'] == b['sha256']:
+        return True
+    if a['flat'] or b['flat']:
+        return False
+    return (hamming(int(a['phash'], 16), int(b['phash'], 16)) <= threshold
+            and hamming(int(a['dhash'], 16), int(b['dhash'], 16)) <= DHASH_THRESHOLD)
+
+
+class DuplicateIndex:
+    """BK-tree of the library's hashes, queryable while new images are added"""
+
+    def __init__(self, cache=None, threshold=PHASH_THRESHOLD):
+        self.cache = cache or HashCache()
+        self.threshold = threshold
+        self.tree = BKTree()
+        self.hashes = {}
+        self.by_sha = {}
+        self.lock = threading.Lock()
+
+    def add(self, name, hashes):
+        """Index name; re-adding a replaced image supersedes its old hashes"""
+        with self.lock:
+            old = self.hashes.get(name)
+            if old:
+                self.by_sha[old['sha256']].remove(name)
+            self.hashes[name] = hashes
+            self.by_sha.setdefault(hashes['sha256'], []).append(name)
+            # The old node stays in the tree; matches() skips it by its pHash
+            self.tree.add(int(hashes['phash'], 16), (name, hashes['phash']))
+
+    def matches(self, hashes, exclude=None):
+        """Library images that duplicate `hashes`, closest first, as (distance, name)"""
+        with self.lock:
+            candidates = self.tree.search(int(hashes['phash'], 16), self.threshold)
+            exact = list(self.by_sha.get(hashes['sha256'], []))
+            found = {name: distance for distance, (name, phash) in candidates
+                     if name != exclude and phash == self.hashes[name]['phash']
+                     and is_match(hashes, self.hashes[name], self.threshold)}
+        for name in exact:
+            if name != exclude:
+                found[name] = 0
+        return sorted((distance, name) for name, distance in found.items())
+
+    @classmethod
+    def for_library(cls, images_dir=IMAGES_DIR, threshold=PHASH_THRESHOLD, cache=None):
+        """Index every library image, keyed by its path relative to images_dir"""
+        index = cls(cache, threshold)
+        for rel in library_images(images_dir):
+            index.add(rel.as_posix(), index.cache.hashes_for(images_dir / rel))
+        return index
+
+
+def rank(name, hashes):
+    """Sort key for the copy to keep: largest picture, then bigger file, then shortest path"""
+    return (-hashes['width'] * hashes['height'], -hashes['size'], len(name), name)
+
+
+def find_groups(index):
+    """
+    [(canonical, members)] for every set of duplicates
+    The best-ranked image claims all its unclaimed matches, so every dropped
+    image matches its canonical directly rather than through a chain
+    """
+    claimed = set()
+    groups = []
+    for name in sorted(index.hashes, key=lambda n: rank(n, index.hashes[n])):
+        if name in claimed:
+            continue
+        members = [other for _, other in index.matches(index.hashes[name], exclude=name) if other not in claimed]
+        if members:
+            claimed.update(members)
+            groups.append((name, sorted([name] + members)))
+        claimed.add(name)
+    return groups
+
+
+def write_report(groups, index, path=REPORT_FILE):
+    lines = [f"Image duplicate report - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+             f"{len(index.hashes)} images, {len(groups)} duplicate groups", ""]
+    saved = 0
+    for canonical, members in groups:
+        lines.append(f"keep {canonical}")
+        for name in members:
+            if name == canonical:
+                continue
+            kind = 'exact' if index.hashes[name]['sha256'] == index.hashes[canonical]['sha256'] else 'near'
+            distance = hamming(int(index.hashes[name]['phash'], 16), int(index.hashes[canonical]['phash'], 16))
+            lines.append(f"  drop {name}  ({kind}, pHash distance {distance})")
+            saved += index.hashes[name]['size']
+        lines.append("")
+    lines.append(f"Bytes saved by serving the kept copies: {saved / 1024:.0f} KB")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    return saved
+
+
+def record_decisions(groups, manifest_file=MANIFEST_FILE):
+    """Set duplicateOf on dropped images' manifest entries and clear stale decisions"""
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    images = manifest.get('images', {})
+    for entry in images.values():
+        entry.pop('duplicateOf', None)
+    marked = 0
+    for canonical, members in groups:
+        for name in members:
+            key = image_key(name)
+            if name != canonical and key in images:
+                images[key]['duplicateOf'] = image_key(canonical)
+                marked += 1
+    manifest['lastUpdated'] = datetime.now().isoformat()
+    tmp_path = manifest_file.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_file)
+    return marked
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find duplicate and near-duplicate images')
+    parser.add_argument(
+        '--threshold',
+        type=int,
+        default=PHASH_THRESHOLD,
+        help=f'Max pHash Hamming distance for a near duplicate (default: {PHASH_THRESHOLD})'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Write the report but leave the manifest alone'
+    )
+    args = parser.parse_args()
+
+    cache = HashCache()
+    index = DuplicateIndex.for_library(threshold=args.threshold, cache=cache)
+    cache.save()
+
+    groups = find_groups(index)
+    saved = write_report(groups, index)
+    print(f"🔍 {len(index.hashes)} images, {len(groups)} duplicate groups "
+          f"({saved / 1024:.0f} KB duplicated)")
+    print(f"📄 Report: {REPORT_FILE}")
+
+    if not args.dry_run and MANIFEST_FILE.exists():
+        marked = record_decisions(groups)
+        refresh_shards()
+        print(f"📋 Marked {marked} manifest entries with duplicateOf")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
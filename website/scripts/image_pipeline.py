@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+CPU stage for downloaded images
+Network threads stream each response into memory under a hard size cap and
+hand the bytes to a process pool, which decodes (JPEG via PIL draft() at a
+reduced scale), flattens, resizes and re-encodes into a .part file. Decoding
+then overlaps with the next downloads and uses every core
+"""
+
+import base64
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+IMAGES_DIR = Path(__file__).parent.parent / 'public' / 'images'
+
+# Regional images sit directly in public/images; the rest are grouped by category
+CATEGORY_DIRS = ['artists', 'instruments', 'performance', 'events']
+SOURCE_SUFFIXES = {'.jpg', '.jpeg', '.png'}
+
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+MAX_DIMENSIONS = (1920, 1080)
+JPEG_QUALITY = 85
+
+
+class ImageTooLarge(ValueError):
+    """Response body exceeded the byte cap"""
+
+
+def library_images(images_dir=IMAGES_DIR):
+    """Every source image of the site, as paths relative to images_dir"""
+    sources = [p for p in images_dir.iterdir() if p.is_file() and p.suffix.lower() in SOURCE_SUFFIXES]
+    for category in CATEGORY_DIRS:
+        directory = images_dir / category
+        if directory.exists():
+            sources.extend(p for p in directory.iterdir() if p.suffix.lower() in SOURCE_SUFFIXES)
+    return sorted(p.relative_to(images_dir) for p in sources)
+
+
+def read_capped(response, max_bytes=MAX_IMAGE_BYTES, chunk_size=64 * 1024):
+    """Read a streamed response body, aborting as soon as it passes max_bytes"""
+    content_length = response.headers.get('Content-Length')
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        response.close()
+        raise ImageTooLarge(f"{int(content_length) / 1024 / 1024:.1f}MB")
+
+    buffer = io.BytesIO()
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        buffer.write(chunk)
+        if buffer.tell() > max_bytes:
+            response.close()
+            raise ImageTooLarge(f"more than {max_bytes / 1024 / 1024:.0f}MB")
+    return buffer.getvalue()
+
+
+def _flatten(img):
+    """RGB copy of img, compositing any transparency onto white"""
+    if img.mode == 'P':
+        img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+    if img.mode in ('RGBA', 'LA'):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        return background
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def normalize_image(data, output_path, max_dimensions=MAX_DIMENSIONS, quality=JPEG_QUALITY):
+    """
+    Decode image bytes, fit them inside max_dimensions and save as JPEG
+    Runs in a worker process. Returns (width, height, resized)
+    """
+    img = Image.open(io.BytesIO(data))
+    original_size = img.size
+    # For JPEGs this lets libjpeg decode at 1/2, 1/4 or 1/8 scale directly;
+    # the result is never smaller than max_dimensions, so quality is unchanged
+    img.draft('RGB', max_dimensions)
+    img = _flatten(img)
+
+    if img.width > max_dimensions[0] or img.height > max_dimensions[1]:
+        img.thumbnail(max_dimensions, Image.Resampling.LANCZOS)
+
+    img.save(output_path, 'JPEG', quality=quality, optimize=True)
+    return img.width, img.height, img.size != original_size
+
+
+class ImagePipeline:
+    """
+    Process pool fed from its work queue by any number of network threads
+    With workers=0 images are processed inline (useful for debugging)
+    """
+
+    def __init__(self, workers=None):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers else None
+
+    def normalize(self, data, output_path, **kwargs):
+        """Queue one image and wait for its result; re-raises decode errors"""
+        if self.pool is None:
+            return normalize_image(data, str(output_path), **kwargs)
+        return self.pool.submit(normalize_image, data, str(output_path), **kwargs).result()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Responsive variants: widths for srcset and encoder settings per format
+VARIANT_WIDTHS = (320, 640, 1280)
+VARIANT_FORMATS = {
+    'webp': {'quality': 80, 'method': 6},
+    'avif': {'quality': 55, 'speed': 6},
+}
+
+
+def available_formats(formats):
+    """The subset of formats this Pillow build can encode (AVIF needs Pillow 11.2+ or pillow-avif-plugin)"""
+    try:
+        import pillow_avif  # noqa: F401 - registers the AVIF plugin on older Pillow
+    except ImportError:
+        pass
+    from PIL import features
+    return [fmt for fmt in formats if features.check(fmt)]
+
+
+def variant_widths(source_width, widths=VARIANT_WIDTHS):
+    """Target widths that do not upscale; a source narrower than all of them gets one at its own width"""
+    fitting = [w for w in widths if w <= source_width]
+    return fitting or [source_width]
+
+
+def encode_variants(src, out_base, widths=VARIANT_WIDTHS, formats=tuple(VARIANT_FORMATS), force=False):
+    """
+    Write <out_base>-<width>w.<format> for every width and format
+    Variants newer than src are kept as they are unless force is set
+    Runs in a worker process. Returns {format: [{width, height, bytes, file}]}
+    """
+    src = str(src)
+    src_mtime = os.path.getmtime(src)
+    img = Image.open(src)
+    targets = variant_widths(img.width, widths)
+    # Decode once at the scale the largest variant needs
+    img.draft('RGB', (max(targets), img.height * max(targets) // img.width or 1))
+    img = _flatten(img)
+
+    variants = {fmt: [] for fmt in formats}
+    for width in targets:
+        height = max(1, round(img.height * width / img.width))
+        resized = None
+        for fmt in formats:
+            path = f"{out_base}-{width}w.{fmt}"
+            if force or not os.path.exists(path) or os.path.getmtime(path) < src_mtime:
+                if resized is None:
+                    resized = img if width == img.width else img.resize((width, height), Image.Resampling.LANCZOS)
+                tmp_path = path + '.tmp'
+                resized.save(tmp_path, fmt.upper(), **VARIANT_FORMATS.get(fmt, {}))
+                os.replace(tmp_path, path)
+            with Image.open(path) as written:
+                size = written.size
+            variants[fmt].append({'width': size[0], 'height': size[1],
+                                  'bytes': os.path.getsize(path), 'file': path})
+    return variants
+
+
+# Inline placeholders: longest side of the LQIP thumbnail and palette size for the dominant color
+LQIP_SIZE = 16
+LQIP_QUALITY = 40
+DOMINANT_COLORS = 5
+
+
+def dominant_color(img):
+    """Most common colour of a small median-cut palette, as #rrggbb"""
+    small = img.resize((64, 64), Image.Resampling.BILINEAR)
+    quantized = small.quantize(colors=DOMINANT_COLORS, method=Image.Quantize.MEDIANCUT)
+    _, index = max(quantized.getcolors())
+    r, g, b = quantized.getpalette()[index * 3:index * 3 + 3]
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def lqip_data_uri(img, size=LQIP_SIZE, quality=LQIP_QUALITY):
+    """A few hundred bytes of blurred preview, inlined as a data: URI"""
+    thumb = img.copy()
+    thumb.thumbnail((size, size), Image.Resampling.LANCZOS)
+    fmt = 'WEBP' if available_formats(['webp']) else 'JPEG'
+    buffer = io.BytesIO()
+    thumb.save(buffer, fmt, quality=quality)
+    return f"data:image/{fmt.lower()};base64,{base64.b64encode(buffer.getvalue()).decode('ascii')}"
+
+
+def describe_image(path):
+    """
+    Intrinsic size, dominant colour and LQIP for a manifest entry
+    Returns {width, height, dominantColor, lqip}
+    """
+    img = Image.open(path)
+    width, height = img.size
+    # Only a thumbnail is needed, so let JPEGs decode at 1/8 scale
+    img.draft('RGB', (64, 64))
+    img = _flatten(img)
+    return {
+        'width': width,
+        'height': height,
+        'dominantColor': dominant_color(img),
+        'lqip': lqip_data_uri(img),
+    }
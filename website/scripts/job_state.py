@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Transactional job-state store shared by the downloader scripts
+One SQLite database (WAL mode) records status, attempts, last error, bytes,
+duration and content hash per (script, target), so resuming or re-planning a
+run only touches what changed
+
+Usage:
+  python3 job_state.py list --script spotdl
+  python3 job_state.py failures --older-than 6h
+  python3 job_state.py reset --script google-images --status failed
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+DB_FILE = SCRIPT_DIR / '.job_state.sqlite3'
+
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+STATUS_SKIPPED = 'skipped'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    script      TEXT NOT NULL,
+    target      TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    last_error  TEXT,
+    bytes       INTEGER,
+    duration    REAL,
+    sha256      TEXT,
+    updated_at  REAL NOT NULL,
+    PRIMARY KEY (script, target)
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (script, status, updated_at);
+"""
+
+
+def parse_age(value):
+    """'90s', '15m', '6h', '2d' -> seconds"""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smhd]?)', value.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid age: {value!r} (use e.g. 30m, 6h, 2d)")
+    number, unit = match.groups()
+    return float(number) * {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}[unit]
+
+
+class JobState:
+    """Per-script view of the job table; safe to share between worker threads"""
+
+    def __init__(self, script, path=DB_FILE):
+        self.script = script
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def _write(self, sql, params):
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                self.conn.execute(sql, params)
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+
+    def start(self, target):
+        """Mark target as running and count the attempt"""
+        self._write(
+            """INSERT INTO jobs (script, target, status, attempts, updated_at)
+               VALUES (?, ?, ?, 1, ?)
+               ON CONFLICT (script, target) DO UPDATE SET
+                   status = excluded.status,
+                   attempts = jobs.attempts + 1,
+                   updated_at = excluded.updated_at""",
+            (self.script, target, STATUS_RUNNING, time.time()),
+        )
+
+    def finish(self, target, status, error=None, size=None, duration=None, sha256=None):
+        """Record the outcome of the latest attempt"""
+        self._write(
+            """INSERT INTO jobs (script, target, status, last_error, bytes, duration, sha256, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (script, target) DO UPDATE SET
+                   status = excluded.status,
+                   last_error = excluded.last_error,
+                   bytes = COALESCE(excluded.bytes, jobs.bytes),
+                   duration = COALESCE(excluded.duration, jobs.duration),
+                   sha256 = COALESCE(excluded.sha256, jobs.sha256),
+                   updated_at = excluded.updated_at""",
+            (self.script, target, status, error, size, duration, sha256, time.time()),
+        )
+
+    def succeed(self, target, size=None, duration=None, sha256=None):
+        self.finish(target, STATUS_DONE, size=size, duration=duration, sha256=sha256)
+
+    def fail(self, target, error, duration=None):
+        self.finish(target, STATUS_FAILED, error=str(error)[:500], duration=duration)
+
+    def skip(self, target, size=None):
+        self.finish(target, STATUS_SKIPPED, size=size)
+
+    def reset(self, target):
+        """Forget target, as `job_state.py reset` does, so the next run plans it afresh"""
+        self._write('DELETE FROM jobs WHERE script = ? AND target = ?', (self.script, target))
+
+    def get(self, target):
+        with self.lock:
+            return self.conn.execute(
+                'SELECT * FROM jobs WHERE script = ? AND target = ?', (self.script, target)
+            ).fetchone()
+
+    def targets(self, *statuses, older_than=None):
+        """Targets with one of `statuses` (all if none), optionally last touched more than older_than seconds ago"""
+        sql = 'SELECT target FROM jobs WHERE script = ?'
+        params = [self.script]
+        if statuses:
+            sql += f" AND status IN ({', '.join('?' * len(statuses))})"
+            params.extend(statuses)
+        if older_than is not None:
+            sql += ' AND updated_at < ?'
+            params.append(time.time() - older_than)
+        with self.lock:
+            return {row['target'] for row in self.conn.execute(sql, params)}
+
+    def completed(self):
+        """Targets that finished or were skipped as already present"""
+        return self.targets(STATUS_DONE, STATUS_SKIPPED)
+
+    def failures(self, older_than=None):
+        return self.targets(STATUS_FAILED, older_than=older_than)
+
+    def import_checkpoint(self, checkpoint_file):
+        """Fold a legacy one-name-per-line checkpoint file into the table, then remove it"""
+        checkpoint_file = Path(checkpoint_file)
+        if not checkpoint_file.exists():
+            return 0
+        with open(checkpoint_file, 'r') as f:
+            names = [line.strip() for line in f if line.strip()]
+        for name in names:
+            if self.get(name) is None:
+                self.finish(name, STATUS_DONE)
+        checkpoint_file.unlink()
+        return len(names)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def _rows(script, status, older_than):
+    sql = 'SELECT * FROM jobs WHERE 1 = 1'
+    params = []
+    if script:
+        sql += ' AND script = ?'
+        params.append(script)
+    if status:
+        sql += ' AND status = ?'
+        params.append(status)
+    if older_than is not None:
+        sql += ' AND updated_at < ?'
+        params.append(time.time() - older_than)
+    sql += ' ORDER BY script, updated_at'
+    conn = sqlite3.connect(str(DB_FILE))
+    conn.row_factory = sqlite3.Row
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect the downloader job-state database')
+    parser.add_argument('command', choices=['list', 'failures', 'reset'])
+    parser.add_argument('--script', help='Only jobs of this downloader (e.g. spotdl, all-assets, google-images)')
+    parser.add_argument('--status', choices=[STATUS_RUNNING, STATUS_DONE, STATUS_FAILED, STATUS_SKIPPED])
+    parser.add_argument('--older-than', type=parse_age, help='Only jobs last updated before this age, e.g. 6h')
+    args = parser.parse_args()
+
+    if not DB_FILE.exists():
+        print(f"⚠️  No job database yet: {DB_FILE}")
+        return 0
+
+    status = STATUS_FAILED if args.command == 'failures' else args.status
+    rows = _rows(args.script, status, args.older_than)
+
+    if args.command == 'reset':
+        conn = sqlite3.connect(str(DB_FILE))
+        with conn:
+            conn.executemany(
+                'DELETE FROM jobs WHERE script = ? AND target = ?',
+                [(row['script'], row['target']) for row in rows],
+            )
+        conn.close()
+        print(f"🗑️  Reset {len(rows)} jobs")
+        return 0
+
+    for row in rows:
+        updated = time.strftime('%Y-%m-%d %H:%M', time.localtime(row['updated_at']))
+        line = f"{row['script']:<14} {row['status']:<8} x{row['attempts']:<2} {updated}  {row['target']}"
+        if row['last_error']:
+            line += f"  ({row['last_error'][:80]})"
+        print(line)
+    print(f"\n{len(rows)} jobs")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Incremental manifest builder for public/images and public/audio
+Walks both asset trees and lists every file, keyed the way the frontend looks
+them up (see asset_keys.image_key). Per-file metadata - SHA-256, byte size, image size,
+dominant color and LQIP, audio duration and format - is cached against
+(mtime, size, inode), so a rebuild only re-probes files that changed and the
+manifests are rewritten only when their content actually differs. Each
+rebuild also refreshes the per-region shards (see manifest_shards.py)
+
+Usage:
+  python3 manifest_engine.py
+  python3 manifest_engine.py --only audio
+  python3 manifest_engine.py --rehash
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from asset_keys import AUDIO_ROOT_CATEGORY, image_key, image_type
+from http_cache import file_sha256
+from audio_probe import probe_audio
+from manifest_shards import write_shards
+
+try:
+    from PIL import Image
+    from image_pipeline import describe_image
+    from image_dedup import is_flat
+except ImportError:
+    describe_image = None  # No PIL - image entries carry hashes and sizes only
+
+SCRIPT_DIR = Path(__file__).parent
+PUBLIC_DIR = SCRIPT_DIR.parent / 'public'
+IMAGES_DIR = PUBLIC_DIR / 'images'
+AUDIO_DIR = PUBLIC_DIR / 'audio'
+CACHE_FILE = SCRIPT_DIR / '.manifest_cache.json'
+MANIFEST_VERSION = "1.0"
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.svg'}
+AUDIO_SUFFIXES = {'.mp3', '.wav', '.ogg', '.opus', '.m4a'}
+# Generated outputs of other stages, never sources
+SKIP_DIRS = {'variants', 'peaks', 'analysis', 'renditions', 'segments', 'loops', 'sprites'}
+AUDIO_CATEGORIES = ['ambient', 'instruments', 'ensembles', AUDIO_ROOT_CATEGORY]
+
+# Fields written by later stages (build-image-variants.py, image_dedup.py and the
+# build-audio-*.py stages); kept while the file's content hash is unchanged
+DERIVED_FIELDS = ('variants', 'duplicateOf', 'peaks', 'analysis', 'loudness', 'renditions', 'segments', 'loop')
+
+
+def _walk(root, suffixes):
+    """Files under root with one of suffixes, relative to root, skipping generated dirs"""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.'))
+        for filename in filenames:
+            if Path(filename).suffix.lower() in suffixes:
+                found.append(Path(dirpath, filename).relative_to(root))
+    return sorted(found)
+
+
+def write_manifest(path, manifest):
+    """
+    Write manifest atomically unless only lastUpdated would change
+    Returns True when the file was rewritten
+    """
+    path = Path(path)
+    if path.exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+            if {**previous, 'lastUpdated': None} == {**manifest, 'lastUpdated': None}:
+                return False
+        except (OSError, ValueError):
+            pass
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+    return True
+
+
+class ManifestEngine:
+    """Builds both manifests from the asset trees with a stat-keyed metadata cache"""
+
+    def __init__(self, public_dir=PUBLIC_DIR, cache_path=CACHE_FILE, rehash=False):
+        self.public_dir = Path(public_dir)
+        self.images_dir = self.public_dir / 'images'
+        self.audio_dir = self.public_dir / 'audio'
+        self.cache_path = Path(cache_path)
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.probed = 0
+        self.reused = 0
+        if self.cache_path.exists() and not rehash:
+            try:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('entries', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def probe(self, path):
+        """Metadata for a public/ file, re-probed only when its stat signature changed"""
+        path = Path(path)
+        st = path.stat()
+        signature = [st.st_mtime_ns, st.st_size, st.st_ino]
+        key = path.relative_to(self.public_dir).as_posix()
+        with self.lock:
+            cached = self.entries.get(key)
+        if cached and cached['stat'] == signature:
+            self.reused += 1
+            return cached['meta']
+
+        meta = {'sha256': file_sha256(path), 'bytes': st.st_size}
+        suffix = path.suffix.lower()
+        try:
+            if suffix in AUDIO_SUFFIXES:
+                meta.update(probe_audio(path))
+            elif describe_image and suffix in IMAGE_SUFFIXES and suffix != '.svg':
+                meta.update(describe_image(path))
+                with Image.open(path) as img:
+                    meta['flat'] = is_flat(img)
+        except Exception as e:
+            meta['error'] = str(e)
+        with self.lock:
+            self.entries[key] = {'stat': signature, 'meta': meta}
+        self.probed += 1
+        return meta
+
+    def build_image_manifest(self, expected=None, previous=None):
+        """
+        images/manifest.json content for every image in the tree
+        expected maps filenames (relative to public/images) the site needs to a
+        description; missing ones are listed with exists: false
+        """
+        previous = (previous or {}).get('images', {})
+        images = {}
+        for rel in _walk(self.images_dir, IMAGE_SUFFIXES):
+            meta = self.probe(self.images_dir / rel)
+            key = image_key(rel)
+            marker = (self.images_dir / rel).with_suffix('.placeholder.txt')
+            entry = {
+                "exists": True,
+                "path": f"/images/{rel.as_posix()}",
+                "type": image_type(rel),
+                "isPlaceholder": marker.exists() or bool(meta.get('flat')),
+            }
+            entry.update({k: v for k, v in meta.items() if k not in ('flat', 'error')})
+            old = previous.get(key, {})
+            if old.get('sha256') == meta['sha256']:
+                entry.update({field: old[field] for field in DERIVED_FIELDS if field in old})
+            images[key] = entry
+
+        for filename, description in (expected or {}).items():
+            key = image_key(filename)
+            if key in images:
+                if description:
+                    images[key]["description"] = description
+                continue
+            images[key] = {
+                "exists": False,
+                "isPlaceholder": True,
+                "path": f"/images/{filename}",
+                "type": image_type(Path(filename)),
+            }
+            if description:
+                images[key]["description"] = description
+
+        return {"version": MANIFEST_VERSION, "lastUpdated": datetime.now().isoformat(), "images": images}
+
+    def build_audio_manifest(self, expected=None, previous=None):
+        """
+        audio/manifest.json content for every audio file in the tree
+        A .wav next to a missing .mp3 is a stand-in: the entry keeps the .mp3
+        name, is marked isPlaceholder and points fallbackPath at the .wav.
+        expected maps categories to .mp3 names the site needs
+        """
+        previous_sprites = (previous or {}).get('sprites', {})
+        previous = (previous or {}).get('audio', {})
+        audio = {category: {} for category in AUDIO_CATEGORIES}
+        files = _walk(self.audio_dir, AUDIO_SUFFIXES)
+        present = {rel.as_posix() for rel in files}
+
+        for rel in files:
+            category = rel.parts[0] if len(rel.parts) > 1 else AUDIO_ROOT_CATEGORY
+            meta = self.probe(self.audio_dir / rel)
+            url = f"/audio/{rel.as_posix()}"
+            mp3_rel = rel.with_suffix('.mp3').as_posix()
+            if rel.suffix.lower() == '.wav' and mp3_rel not in present:
+                entry = {"exists": True, "isPlaceholder": True,
+                         "path": f"/audio/{mp3_rel}", "fallbackPath": url}
+                key = Path(mp3_rel).name
+            else:
+                entry = {"exists": True, "isPlaceholder": False, "path": url}
+                key = rel.name
+            entry.update({k: v for k, v in meta.items() if k != 'error'})
+            old = previous.get(category, {}).get(key, {})
+            if old.get('sha256') == meta['sha256']:
+                entry.update({field: old[field] for field in DERIVED_FIELDS if field in old})
+            audio.setdefault(category, {})[key] = entry
+
+        for category, names in (expected or {}).items():
+            for name in names:
+                if name not in audio.setdefault(category, {}):
+                    prefix = '' if category == AUDIO_ROOT_CATEGORY else f"{category}/"
+                    audio[category][name] = {"exists": False, "isPlaceholder": True,
+                                             "path": f"/audio/{prefix}{name}"}
+
+        # Region sprites (build-audio-sprites.py) stay while every loop in them is unchanged
+        loops = {entry['path']: entry.get('loop', {}).get('path')
+                 for entries in audio.values() for entry in entries.values()}
+        sprites = {region: sprite for region, sprite in previous_sprites.items()
+                   if all(loops.get(stem['source']) == stem['loop'] for stem in sprite['stems'].values())}
+
+        manifest = {"version": MANIFEST_VERSION, "lastUpdated": datetime.now().isoformat(), "audio": audio}
+        if sprites:
+            manifest["sprites"] = sprites
+        return manifest
+
+    def write(self, expected_images=None, expected_audio=None, only=None, shards=True):
+        """
+        Build and write the manifests, then the per-region shards
+        Returns {name: rewritten?}
+        """
+        written = {}
+        manifests = {}
+        for name in ('images', 'audio'):
+            manifest_path = self.public_dir / name / 'manifest.json'
+            previous = None
+            if manifest_path.exists():
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    previous = json.load(f)
+            if only not in (None, name):
+                manifests[name] = previous or {}
+                continue
+            if name == 'images':
+                manifests[name] = self.build_image_manifest(expected_images, previous)
+            else:
+                manifests[name] = self.build_audio_manifest(expected_audio, previous)
+            written[name] = write_manifest(manifest_path, manifests[name])
+        self.save()
+        if shards:
+            write_shards(manifests['images'], manifests['audio'])
+        return written
+
+    def save(self):
+        """Write the cache atomically, dropping files that no longer exist"""
+        with self.lock:
+            entries = {k: v for k, v in self.entries.items() if (self.public_dir / k).exists()}
+            tmp_path = self.cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'entries': entries}, f)
+            os.replace(tmp_path, self.cache_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the image and audio manifests incrementally')
+    parser.add_argument('--only', choices=['images', 'audio'], help='Rebuild just one manifest')
+    parser.add_argument('--rehash', action='store_true', help='Ignore the cache and re-probe every file')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    engine = ManifestEngine(rehash=args.rehash)
+    written = engine.write(only=args.only)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for name, changed in written.items():
+        print(f"📋 {name}/manifest.json {'updated' if changed else 'unchanged'}")
+    print(f"⚡ {engine.probed} probed, {engine.reused} cached in {elapsed:.0f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Per-region manifest shards with content-hashed filenames
+Splits the image and audio manifests into one shard per region id of
+src/data/regions.ts (every asset path a region, its tracks or its artists
+reference, as read by data_catalogue.py) plus a shared shard for everything
+else. Shards are named <region>.<hash>.json and never change once written,
+so they can be served with immutable cache headers; only the small
+manifests/index.json that maps regions to shard files has to be revalidated
+
+Usage:
+  python3 manifest_shards.py
+"""
+
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from asset_keys import audio_key, image_key
+from data_catalogue import region_assets
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+PUBLIC_DIR = PROJECT_ROOT / 'public'
+MANIFESTS_DIR = PUBLIC_DIR / 'manifests'
+SHARDS_DIR = MANIFESTS_DIR / 'shards'
+INDEX_FILE = MANIFESTS_DIR / 'index.json'
+SHARED_SHARD = 'shared'
+HASH_LENGTH = 12
+
+
+def build_shards(image_manifest, audio_manifest, regions):
+    """
+    {shard name: shard} - images keyed like the full manifest, audio by
+    audio_key so categories holding the same filename stay apart; a region
+    with an audio sprite also carries it as 'sprite'
+    """
+    images = image_manifest.get('images', {})
+    sprites = audio_manifest.get('sprites', {})
+    audio = {}
+    for category, entries in audio_manifest.get('audio', {}).items():
+        for name, entry in entries.items():
+            audio[audio_key(category, name)] = dict(entry, category=category)
+
+    images_by_path = {entry['path']: (name, entry) for name, entry in images.items()}
+    audio_by_path = {entry['path']: (name, entry) for name, entry in audio.items()}
+    claimed = set()
+    shards = {}
+
+    for region, paths in sorted(regions.items()):
+        shard = {'region': region, 'images': {}, 'audio': {}}
+        for path in sorted(paths):
+            if path in images_by_path:
+                name, entry = images_by_path[path]
+                shard['images'][name] = entry
+                # A duplicate is served as its kept copy, which must be in the same shard
+                canonical = entry.get('duplicateOf')
+                if canonical in images:
+                    shard['images'][canonical] = images[canonical]
+            elif path in audio_by_path:
+                name, entry = audio_by_path[path]
+                shard['audio'][name] = entry
+            elif path.startswith('/audio/'):
+                # Referenced but not on disk: let the player say so instead of requesting a 404
+                # Its path below /audio/ is its audio_key
+                shard['audio'][path.replace('/audio/', '', 1)] = {'exists': False, 'isPlaceholder': True, 'path': path}
+            else:
+                shard['images'][image_key(path.replace('/images/', '', 1))] = {'exists': False, 'path': path}
+            claimed.add(path)
+        if region in sprites:
+            shard['sprite'] = sprites[region]
+        shards[region] = shard
+
+    shards[SHARED_SHARD] = {
+        'region': None,
+        'images': {name: e for name, e in images.items() if e['path'] not in claimed},
+        'audio': {name: e for name, e in audio.items() if e['path'] not in claimed},
+    }
+    return shards
+
+
+def _serialize(shard):
+    return json.dumps(shard, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def write_shards(image_manifest, audio_manifest, regions=None):
+    """
+    Write changed shards and the index; returns the index
+    Shards of the previous index are kept one generation for clients that
+    still hold it, anything older is deleted
+    """
+    regions = region_assets() if regions is None else regions
+    SHARDS_DIR.mkdir(parents=True, exist_ok=True)
+
+    previous = {}
+    if INDEX_FILE.exists():
+        try:
+            with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            previous = {}
+
+    urls = {}
+    for name, shard in build_shards(image_manifest, audio_manifest, regions).items():
+        data = _serialize(shard)
+        filename = f"{name}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}.json"
+        path = SHARDS_DIR / filename
+        if not path.exists():
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        urls[name] = f"/manifests/shards/{filename}"
+
+    index = {
+        'version': '1.0',
+        'lastUpdated': datetime.now().isoformat(),
+        'shared': urls.pop(SHARED_SHARD),
+        'regions': urls,
+    }
+    if {**previous, 'lastUpdated': None} != {**index, 'lastUpdated': None}:
+        tmp_path = INDEX_FILE.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, INDEX_FILE)
+
+    keep = set(index['regions'].values()) | {index['shared']}
+    keep |= set(previous.get('regions', {}).values()) | {previous.get('shared')}
+    for path in SHARDS_DIR.glob('*.json'):
+        if f"/manifests/shards/{path.name}" not in keep:
+            path.unlink()
+    return index
+
+
+def refresh_shards():
+    """Re-shard the manifests as they are on disk, for stages that edit a manifest directly"""
+    manifests = []
+    for name in ('images', 'audio'):
+        path = PUBLIC_DIR / name / 'manifest.json'
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                manifests.append(json.load(f))
+        else:
+            manifests.append({})
+    return write_shards(*manifests)
+
+
+def main():
+    index = refresh_shards()
+    sizes = [(SHARDS_DIR / Path(url).name).stat().st_size for url in index['regions'].values()]
+    print(f"🧩 {len(index['regions'])} region shards "
+          f"({min(sizes) / 1024:.1f}-{max(sizes) / 1024:.1f} KB) plus shared "
+          f"({(SHARDS_DIR / Path(index['shared']).name).stat().st_size / 1024:.1f} KB)")
+    print(f"📋 Index: {INDEX_FILE}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
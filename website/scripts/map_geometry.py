@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Simplified, quantized levels of detail for the SVG state outlines
+Parses the `path` strings of src/data/indiaMapShapes.ts and indiaGeoData.ts
+(M/L/H/V/Z, absolute or relative), simplifies every outline with
+Douglas-Peucker at each tolerance of LEVELS and writes the result with
+coordinates snapped to the level's grid and re-encoded as short relative
+paths. Simplification is topology preserving in the sense that matters for
+a map of neighbouring states: vertices shared by two outlines are never
+removed, and the run of border between two shared vertices is simplified
+once and reused by both states, so neighbours keep meeting exactly. Every
+state also gets its bounding box and a label anchor (the interior point
+farthest from its outline)
+
+Usage:
+  python3 map_geometry.py src/data/indiaGeoData.ts
+"""
+
+import math
+import re
+import sys
+from pathlib import Path
+
+from ts_objects import TsSyntaxError, exported_constants
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DATA_SOURCE_DIR = PROJECT_ROOT / 'src' / 'data'
+PUBLIC_DIR = PROJECT_ROOT / 'public'
+GEOMETRY_DIR = PUBLIC_DIR / 'data' / 'geometry'
+GEOMETRY_INDEX = GEOMETRY_DIR / 'index.json'
+HASH_LENGTH = 12
+
+# (name, source file, exported constant) - a record of objects with a `path`
+SOURCES = (
+    ('indiaMapShapes', 'indiaMapShapes.ts', 'indiaStateShapes'),
+    ('indiaGeoData', 'indiaGeoData.ts', 'indiaStatesGeoData'),
+)
+
+# (name, tolerance, grid) in viewBox units: points closer than tolerance to
+# the simplified outline are dropped, coordinates are snapped to grid
+LEVELS = (
+    ('full', 0.0, 0.1),
+    ('high', 0.75, 0.5),
+    ('medium', 2.0, 1.0),
+    ('low', 5.0, 1.0),
+)
+# Label anchor search: grid cells per side, refinement rounds
+ANCHOR_CELLS = 12
+ANCHOR_ROUNDS = 4
+
+_PATH_TOKEN = re.compile(r'[MmLlHhVvZz]|-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+
+
+def parse_path(d):
+    """
+    [[(x, y), ...], ...] - one closed ring per subpath, closing point not
+    repeated; raises ValueError on commands other than M/L/H/V/Z
+    """
+    unsupported = set(re.findall(r'[A-Za-z]', d)) - set('MmLlHhVvZzEe')
+    if unsupported:
+        raise ValueError(f"unsupported path commands {''.join(sorted(unsupported))}")
+    tokens = _PATH_TOKEN.findall(d)
+    rings = []
+    ring = []
+    x = y = 0.0
+    command = None
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.isalpha():
+            command = token
+            i += 1
+            if command in 'Zz':
+                if ring:
+                    rings.append(ring)
+                    x, y = ring[0]
+                ring = []
+            continue
+        if command is None:
+            raise ValueError("path data does not start with a command")
+        relative = command.islower()
+        kind = command.upper()
+        if kind in 'ML':
+            dx, dy = float(tokens[i]), float(tokens[i + 1])
+            i += 2
+            if kind == 'M' and ring:
+                rings.append(ring)
+                ring = []
+            x, y = (x + dx, y + dy) if relative else (dx, dy)
+            # Coordinates after a moveto are implicit linetos
+            if kind == 'M':
+                command = 'l' if relative else 'L'
+        elif kind == 'H':
+            x = x + float(tokens[i]) if relative else float(tokens[i])
+            i += 1
+        elif kind == 'V':
+            y = y + float(tokens[i]) if relative else float(tokens[i])
+            i += 1
+        ring.append((x, y))
+    if ring:
+        rings.append(ring)
+    return [_dedupe(r) for r in rings if len(_dedupe(r)) >= 3]
+
+
+def _dedupe(ring):
+    """Ring without consecutive repeats or a repeated closing point"""
+    points = [p for n, p in enumerate(ring) if n == 0 or p != ring[n - 1]]
+    while len(points) > 1 and points[-1] == points[0]:
+        points.pop()
+    return points
+
+
+def _snap(point, grid):
+    return (round(point[0] / grid) * grid, round(point[1] / grid) * grid)
+
+
+def _segment_distance(point, start, end):
+    (px, py), (ax, ay), (bx, by) = point, start, end
+    dx, dy = bx - ax, by - ay
+    length = dx * dx + dy * dy
+    t = 0.0 if length == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length))
+    return math.hypot(px - ax - t * dx, py - ay - t * dy)
+
+
+def douglas_peucker(points, tolerance):
+    """Open polyline simplified so no dropped point is further than tolerance; the ends are kept"""
+    if tolerance <= 0 or len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        worst, index = 0.0, None
+        for n in range(first + 1, last):
+            distance = _segment_distance(points[n], points[first], points[last])
+            if distance > worst:
+                worst, index = distance, n
+        if index is not None and worst > tolerance:
+            keep[index] = True
+            stack += [(first, index), (index, last)]
+    return [p for p, kept in zip(points, keep) if kept]
+
+
+def shared_vertices(outlines, grid):
+    """Vertices (snapped to grid) that appear in more than one outline"""
+    owners = {}
+    for key, rings in outlines.items():
+        for ring in rings:
+            for point in ring:
+                owners.setdefault(_snap(point, grid), set()).add(key)
+    return {point for point, keys in owners.items() if len(keys) > 1}
+
+
+def simplify_ring(ring, tolerance, pinned, arcs):
+    """
+    A ring simplified arc by arc between its pinned vertices; arcs already
+    simplified for a neighbour (in either direction) are reused from arcs
+    """
+    anchors = [n for n, point in enumerate(ring) if point in pinned]
+    if not anchors:
+        # Nothing shared: split at the first point and the point farthest from it
+        far = max(range(len(ring)), key=lambda n: math.dist(ring[0], ring[n]))
+        anchors = [0, far] if far else [0]
+    result = []
+    for a, b in zip(anchors, anchors[1:] + [anchors[0] + len(ring)]):
+        arc = tuple(ring[n % len(ring)] for n in range(a, b + 1))
+        reverse = arc[::-1]
+        if arc in arcs:
+            simplified = arcs[arc]
+        elif reverse in arcs:
+            simplified = arcs[reverse][::-1]
+        else:
+            simplified = douglas_peucker(arc, tolerance)
+            arcs[arc] = simplified
+        result += simplified[:-1]
+    # A ring simplified below a triangle would vanish: keep it as it was
+    if len(set(result)) < 3:
+        return list(ring)
+    # Start where the source path does, when that point survived
+    start = result.index(ring[0]) if ring[0] in result else 0
+    return result[start:] + result[:start]
+
+
+def encode_path(rings, grid):
+    """Relative SVG path of rings already snapped to grid, with the fewest digits the grid allows"""
+    decimals = max(0, -math.floor(math.log10(grid) + 1e-9))
+
+    def number(value):
+        text = f"{value:.{decimals}f}"
+        if decimals:
+            text = text.rstrip('0').rstrip('.')
+        if text == '-0':
+            return '0'
+        return text.replace('0.', '.', 1) if text.startswith(('0.', '-0.')) else text
+
+    def pair(dx, dy):
+        y = number(dy)
+        return f"{number(dx)}{'' if y.startswith('-') else ','}{y}"
+
+    parts = []
+    x = y = 0.0
+    for ring in rings:
+        start = ring[0]
+        parts.append(f"{'M' if not parts else 'm'}{pair(start[0] - x, start[1] - y)}")
+        x, y = start
+        steps = ''
+        for point in ring[1:]:
+            step = pair(point[0] - x, point[1] - y)
+            x, y = point
+            # A minus sign separates numbers as well as a space does
+            steps += step if not steps or step.startswith('-') else ' ' + step
+        parts.append(f"l{steps}z")
+        x, y = start
+    return ''.join(parts)
+
+
+def bounding_box(rings):
+    xs = [x for ring in rings for x, _ in ring]
+    ys = [y for ring in rings for _, y in ring]
+    return [round(min(xs), 1), round(min(ys), 1), round(max(xs), 1), round(max(ys), 1)]
+
+
+def _signed_distance(point, rings):
+    """Distance to the nearest edge, negative outside the shape (even-odd rule)"""
+    inside = False
+    nearest = math.inf
+    px, py = point
+    for ring in rings:
+        for a, b in zip(ring, ring[1:] + ring[:1]):
+            if (a[1] > py) != (b[1] > py) and px < (b[0] - a[0]) * (py - a[1]) / (b[1] - a[1]) + a[0]:
+                inside = not inside
+            nearest = min(nearest, _segment_distance(point, a, b))
+    return nearest if inside else -nearest
+
+
+def label_anchor(rings):
+    """
+    Interior point farthest from the outline (the pole of inaccessibility),
+    found by a grid search refined around the best cell; unlike the centroid
+    it lies inside concave or multi-part shapes
+    """
+    left, top, right, bottom = bounding_box(rings)
+    cx, cy = (left + right) / 2, (top + bottom) / 2
+    half_w, half_h = (right - left) / 2, (bottom - top) / 2
+    best = (cx, cy)
+    best_distance = _signed_distance(best, rings)
+    for _ in range(ANCHOR_ROUNDS):
+        for i in range(ANCHOR_CELLS + 1):
+            for j in range(ANCHOR_CELLS + 1):
+                point = (cx - half_w + 2 * half_w * i / ANCHOR_CELLS,
+                         cy - half_h + 2 * half_h * j / ANCHOR_CELLS)
+                distance = _signed_distance(point, rings)
+                if distance > best_distance:
+                    best, best_distance = point, distance
+        (cx, cy), half_w, half_h = best, half_w / 3, half_h / 3
+    if best_distance <= 0:
+        # An outline that retraces itself has no inside: use its vertex centroid
+        points = [point for ring in rings for point in ring]
+        best = (sum(x for x, _ in points) / len(points), sum(y for _, y in points) / len(points))
+    return [round(best[0], 1), round(best[1], 1)]
+
+
+def read_paths(path, constant):
+    """{state key: path} of the exported constant of a source file"""
+    constants = exported_constants(Path(path).read_text(encoding='utf-8'))
+    if constant not in constants:
+        raise TsSyntaxError(f"no `export const {constant}` literal")
+    return {key: state['path'] for key, state in constants[constant][1].items() if state.get('path')}
+
+
+def build_geometry(paths):
+    """
+    {'levels': [{name, tolerance, grid, vertices, bytes}], 'states': {key:
+    {bbox, anchor, paths: {level: d}}}} for {state key: SVG path}
+    """
+    outlines = {key: parse_path(d) for key, d in paths.items()}
+    outlines = {key: rings for key, rings in outlines.items() if rings}
+    states = {key: {'bbox': bounding_box(rings), 'anchor': label_anchor(rings), 'paths': {}}
+              for key, rings in outlines.items()}
+    levels = []
+    for name, tolerance, grid in LEVELS:
+        snapped = {key: [_dedupe([_snap(p, grid) for p in ring]) for ring in rings]
+                   for key, rings in outlines.items()}
+        pinned = shared_vertices(snapped, grid)
+        arcs = {}
+        vertices = 0
+        size = 0
+        for key, rings in snapped.items():
+            simplified = [simplify_ring(ring, tolerance, pinned, arcs) for ring in rings if len(ring) >= 3]
+            d = encode_path(simplified, grid)
+            states[key]['paths'][name] = d
+            vertices += sum(len(ring) for ring in simplified)
+            size += len(d)
+        levels.append({'name': name, 'tolerance': tolerance, 'grid': grid, 'vertices': vertices, 'bytes': size})
+    return {'levels': levels, 'states': states}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    constants = {filename: constant for _, filename, constant in SOURCES}
+    failed = 0
+    for path in sys.argv[1:]:
+        if Path(path).name not in constants:
+            failed += 1
+            print(f"❌ {path}: not one of the map sources")
+            continue
+        try:
+            geometry = build_geometry(read_paths(path, constants[Path(path).name]))
+        except (OSError, ValueError) as e:
+            failed += 1
+            print(f"❌ {path}: {e}")
+            continue
+        print(f"{path}: {len(geometry['states'])} states")
+        for level in geometry['levels']:
+            print(f"  {level['name']}: tolerance {level['tolerance']}, "
+                  f"{level['vertices']} vertices, {level['bytes']} path bytes")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
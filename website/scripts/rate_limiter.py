@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Per-host request scheduling shared by the download scripts
+Each host gets its own token bucket, so requests to different hosts never wait
+on each other. 429/503 responses pause the offending host for its Retry-After
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Sustained requests per second and burst size for every host we talk to.
+# The 'spotdl' key is not a real host - it paces the spotdl subprocesses.
+HOST_RATES = {
+    'upload.wikimedia.org': (2.0, 4),
+    'commons.wikimedia.org': (2.0, 4),
+    'images.unsplash.com': (5.0, 10),
+    'source.unsplash.com': (2.0, 4),
+    'www.googleapis.com': (1.0, 1),
+    'via.placeholder.com': (3.0, 3),
+    'archive.org': (2.0, 4),
+    'spotdl': (0.5, 1),
+}
+DEFAULT_RATE = (4.0, 4)
+
+# Status codes that mean "slow down and try again"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Backoff bounds in seconds for retries without a Retry-After header
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _reserve(self):
+        """Take a token if one is available, otherwise return seconds to wait"""
+        with self.lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            delay = self._reserve()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """Hold every caller for at least `seconds` (used for Retry-After)"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class HostRateLimiter:
+    """Keeps one TokenBucket per host, created lazily from HOST_RATES"""
+
+    def __init__(self, rates=None, default=DEFAULT_RATE):
+        self.rates = dict(HOST_RATES if rates is None else rates)
+        self.default = default
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, host):
+        with self.lock:
+            if host not in self.buckets:
+                rate, burst = self.rates.get(host, self.default)
+                self.buckets[host] = TokenBucket(rate, burst)
+            return self.buckets[host]
+
+    def acquire(self, url_or_host):
+        """Wait for a request slot on the host of `url_or_host`"""
+        self.bucket(host_of(url_or_host)).acquire()
+
+    def pause(self, url_or_host, seconds):
+        self.bucket(host_of(url_or_host)).pause(seconds)
+
+
+def host_of(url_or_host):
+    """Return the host part of a URL, or the string itself if it has no scheme"""
+    if '://' not in url_or_host:
+        return url_or_host
+    return urlparse(url_or_host).hostname or url_or_host
+
+
+def parse_retry_after(value):
+    """Convert a Retry-After header (seconds or HTTP date) to seconds, or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+# Shared limiter used by every script in this directory
+LIMITER = HostRateLimiter()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Trigram search index, autocomplete trie and facets for the region search
+Built from the data catalogue (see data_catalogue.py) into
+public/data/search.<hash>.json next to the tables, so searchHelpers.ts can
+score a query from the postings of its trigrams - work proportional to the
+matches, not to regions x fields - and complete a prefix by walking a trie
+whose nodes already hold their best suggestions
+
+Index layout (every list is position-indexed to keep the file small):
+  docs        region ids
+  fields      [name, weight] per searchable field
+  trigrams    {trigram: [doc * len(fields) + field, ...]} sorted
+  terms       [text, kind] autocomplete suggestions, best first
+  trie        [[term indexes], {edge: node}] radix trie over every word start
+  facets      sorted distinct values for the filter lists
+
+Usage:
+  python3 search_index.py "bihu drums"
+"""
+
+import re
+import sys
+
+# Searchable fields of a region, their weights and where their text comes from
+SEARCH_FIELDS = (
+    ('name', 10, lambda r: [r['name']]),
+    ('description', 5, lambda r: [r['description']]),
+    ('instruments', 8, lambda r: r['instruments']['melodic'] + r['instruments']['rhythmic']
+        + r['instruments']['unique']),
+    ('languages', 6, lambda r: r['language']['primary']),
+    ('context', 7, lambda r: r['performance']['performanceContext']),
+    ('vocal style', 6, lambda r: r['performance']['vocalStyle']),
+    ('communities', 5, lambda r: r['socialContext'].get('musicianCaste', [])),
+)
+# Share of a query's trigrams a field must contain to count as a match
+MIN_COVERAGE = 0.6
+# Suggestions kept on every trie node
+SUGGESTIONS_PER_NODE = 20
+# Bump when build_search_index output changes for the same data, so
+# data_catalogue.py rebuilds the index instead of reusing the last one
+FORMAT_VERSION = 1
+
+# Must match normalize() in src/utils/searchHelpers.ts
+_NON_WORD = re.compile(r'[^0-9a-zÀ-￿]+')
+
+
+def normalize(text):
+    return _NON_WORD.sub(' ', text.lower()).strip()
+
+
+def trigrams(text, partial_last=False):
+    """
+    Distinct trigrams of the words of a text, each word padded with a space
+    on both sides; with partial_last the final word is only padded in front,
+    so a word still being typed matches the words it is the start of
+    """
+    words = normalize(text).split()
+    grams = set()
+    for n, word in enumerate(words):
+        padded = f" {word}" if partial_last and n == len(words) - 1 else f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def facets(regions):
+    """The distinct values searchHelpers offers as filters"""
+    def distinct(values):
+        return sorted({value for value in values if value})
+
+    return {
+        'instruments': distinct(i for r in regions for group in ('melodic', 'rhythmic', 'unique')
+                                for i in r['instruments'][group]),
+        'genres': distinct(g for r in regions for g in
+                           r['performance']['performanceContext'] + r['language']['poeticTraditions']),
+        'linguisticFamilies': distinct(r['language']['linguisticFamily'] for r in regions),
+        'tempoRanges': distinct(r['musicalStructure']['tempo'] for r in regions),
+        'scaleTypes': distinct(r['musicalStructure']['scaleType'] for r in regions),
+    }
+
+
+def suggestion_terms(regions, facet_values):
+    """[(text, kind)] in the order suggestions are offered: regions, instruments, genres, communities"""
+    terms = []
+    seen = set()
+    groups = (
+        ('region', [r['name'] for r in regions]),
+        ('instrument', facet_values['instruments']),
+        ('genre', facet_values['genres']),
+        ('community', sorted({c for r in regions for c in r['socialContext'].get('musicianCaste', [])})),
+    )
+    for kind, values in groups:
+        for value in values:
+            if value not in seen:
+                seen.add(value)
+                terms.append((value, kind))
+    return terms
+
+
+def build_trie(terms):
+    """
+    Radix trie keyed by every word start of every term; a node is
+    [best term indexes, {edge: child}] and a chain of single children is
+    collapsed into one edge
+    """
+    root = {}
+    for index, (text, _) in enumerate(terms):
+        key = normalize(text)
+        for start in [0] + [m.end() for m in re.finditer(' ', key)]:
+            node = root
+            for char in key[start:]:
+                node = node.setdefault(char, {})
+                hits = node.setdefault('', [])
+                if len(hits) < SUGGESTIONS_PER_NODE and index not in hits:
+                    hits.append(index)
+
+    def compact(node):
+        children = {}
+        for edge, child in node.items():
+            if edge == '':
+                continue
+            while True:
+                below = [char for char in child if char != '']
+                if len(below) != 1 or child[below[0]][''] != child['']:
+                    break
+                edge += below[0]
+                child = child[below[0]]
+            children[edge] = compact(child)
+        return [node.get('', []), children]
+
+    return compact(root)
+
+
+def build_search_index(catalogue):
+    """The search index of a normalized catalogue (see data_catalogue.normalize)"""
+    regions = catalogue['tables']['regions']
+    field_count = len(SEARCH_FIELDS)
+    postings = {}
+    for doc, region in enumerate(regions):
+        for field, (_, _, values) in enumerate(SEARCH_FIELDS):
+            grams = trigrams(' '.join(values(region)))
+            for gram in grams:
+                postings.setdefault(gram, []).append(doc * field_count + field)
+
+    facet_values = facets(regions)
+    terms = suggestion_terms(regions, facet_values)
+    return {
+        'docs': [region['id'] for region in regions],
+        'fields': [[name, weight] for name, weight, _ in SEARCH_FIELDS],
+        'minCoverage': MIN_COVERAGE,
+        'trigrams': {gram: postings[gram] for gram in sorted(postings)},
+        'terms': [list(term) for term in terms],
+        'trie': build_trie(terms),
+        'facets': facet_values,
+    }
+
+
+def fuzzy_match(search, target):
+    """fuzzyMatch of searchHelpers.ts: 1 for a substring, else in-order character hits over the target's length"""
+    search, target = search.lower(), target.lower()
+    if search in target:
+        return 1.0
+    hits = 0
+    for char in target:
+        if hits < len(search) and char == search[hits]:
+            hits += 1
+    return hits / len(target) if hits == len(search) else 0
+
+
+def fuzzy_search(regions, query):
+    """[(region id, score, matched fields)] best first by fuzzyScore, the scan searchHelpers.ts falls back to"""
+    results = []
+    for region in regions:
+        score, matched = 0, []
+        for name, weight, values in SEARCH_FIELDS:
+            field_score = fuzzy_match(query, ' '.join(values(region)))
+            if field_score > (0.5 if name == 'name' else 0.3):
+                score += field_score * weight
+                matched.append(name)
+        if score > 0:
+            results.append((region['id'], round(score, 2), matched))
+    return sorted(results, key=lambda result: -result[1])
+
+
+def search(index, query, regions=None):
+    """
+    [(region id, score, matched fields)] best first - the same scoring
+    searchHelpers.ts does; a query without trigrams (a single letter) is
+    scanned with fuzzy_search over regions, when they are given
+    """
+    grams = trigrams(query, partial_last=True)
+    if not grams:
+        return fuzzy_search(regions, query.strip()) if regions and query.strip() else []
+    field_count = len(index['fields'])
+    hits = {}
+    for gram in grams:
+        for key in index['trigrams'].get(gram, ()):
+            hits[key] = hits.get(key, 0) + 1
+
+    results = {}
+    for key, count in hits.items():
+        coverage = count / len(grams)
+        if coverage < index['minCoverage']:
+            continue
+        doc, field = divmod(key, field_count)
+        name, weight = index['fields'][field]
+        score, matched = results.get(doc, (0, []))
+        results[doc] = (score + coverage * weight, matched + [name])
+    ranked = sorted(results.items(), key=lambda item: -item[1][0])
+    return [(index['docs'][doc], round(score, 2), matched) for doc, (score, matched) in ranked]
+
+
+def complete(index, prefix, limit=10):
+    """Suggestions for a typed prefix, walking the trie"""
+    key = normalize(prefix)
+    if not key:
+        return []
+    node = index['trie']
+    while key:
+        for edge, child in node[1].items():
+            if edge.startswith(key) or key.startswith(edge):
+                node = child
+                key = key[len(edge):]
+                break
+        else:
+            return []
+    return [index['terms'][i][0] for i in node[0][:limit]]
+
+
+def main():
+    from data_catalogue import normalize as normalize_catalogue, read_sources
+
+    catalogue = normalize_catalogue(read_sources(check=False))
+    index = build_search_index(catalogue)
+    query = ' '.join(sys.argv[1:]) or 'bihu'
+    for region_id, score, fields in search(index, query, catalogue['tables']['regions']):
+        print(f"  {score:6.2f}  {region_id}  ({', '.join(fields)})")
+    print(f"💡 {', '.join(complete(index, query))}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
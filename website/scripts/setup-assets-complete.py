@@ -5,10 +5,10 @@ Works even without PIL - creates simple placeholder files
 """
 
 import os
-import json
 import base64
 from pathlib import Path
-from datetime import datetime
+
+from manifest_engine import ManifestEngine
 
 BASE_DIR = Path(__file__).parent.parent / "public"
 IMAGES_DIR = BASE_DIR / "images"
@@ -74,63 +74,24 @@ def create_silent_audio(filepath):
     )
     # Extend to 1 second at 44.1kHz
     silence = b'\x00' * 88200  # 44100 samples * 2 bytes
-    with open(filepath.with_suffix('.wav'), 'wb') as f:
+    # Replace rather than overwrite: the .wav may be linked to a shared store blob
+    wav_path = filepath.with_suffix('.wav')
+    tmp_path = wav_path.with_name(wav_path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
         f.write(wav_data[:44])  # Header
         f.write(silence)
+    os.replace(tmp_path, wav_path)
     print(f"✅ Created audio placeholder: {filepath.name}")
 
 def create_image_manifest():
     """Create image manifest"""
-    manifest = {
-        "version": "1.0",
-        "lastUpdated": datetime.now().isoformat(),
-        "images": {}
-    }
-    
-    for filename, description in REQUIRED_IMAGES.items():
-        filepath = IMAGES_DIR / filename
-        exists = filepath.exists()
-        is_placeholder = filepath.with_suffix('.placeholder.txt').exists()
-        
-        manifest["images"][filename] = {
-            "exists": exists,
-            "isPlaceholder": is_placeholder,
-            "path": f"/images/{filename}",
-            "description": description,
-            "type": "instrument" if any(x in filename for x in ["kamaycha", "sarangi", "dhol", "veena", "mridangam", "ektara", "santoor", "chenda", "dappu", "tumbi", "dholki"]) else "performance" if "performance" in filename or "baul" in filename or "bhangra" in filename or "lavani" in filename or "concert" in filename or "temple" in filename or "perini" in filename else "artist" if "artists" in filename else "other"
-        }
-    
-    with open(IMAGES_DIR / "manifest.json", 'w') as f:
-        json.dump(manifest, f, indent=2)
-    print("✅ Created image manifest")
+    written = ManifestEngine().write(expected_images=REQUIRED_IMAGES, only='images')
+    print("✅ Created image manifest" if written['images'] else "✅ Image manifest up to date")
 
 def create_audio_manifest():
     """Create audio manifest"""
-    manifest = {
-        "version": "1.0",
-        "lastUpdated": datetime.now().isoformat(),
-        "audio": {
-            "ambient": {},
-            "instruments": {},
-            "ensembles": {}
-        }
-    }
-    
-    for filename in REQUIRED_AUDIO["ambient"]:
-        filepath = AUDIO_AMBIENT / filename
-        wav_path = filepath.with_suffix('.wav')
-        exists = filepath.exists() or wav_path.exists()
-        
-        manifest["audio"]["ambient"][filename] = {
-            "exists": exists,
-            "isPlaceholder": wav_path.exists() and not filepath.exists(),
-            "path": f"/audio/ambient/{filename}",
-            "fallbackPath": f"/audio/ambient/{filename.replace('.mp3', '.wav')}" if wav_path.exists() else None
-        }
-    
-    with open(AUDIO_DIR / "manifest.json", 'w') as f:
-        json.dump(manifest, f, indent=2)
-    print("✅ Created audio manifest")
+    written = ManifestEngine().write(expected_audio=REQUIRED_AUDIO, only='audio')
+    print("✅ Created audio manifest" if written['audio'] else "✅ Audio manifest up to date")
 
 def main():
     print("🚀 Setting up assets and manifests...\n")
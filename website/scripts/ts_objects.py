@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Index and patch the object literals of the src/data/*.ts files
+One tokenizer pass over a file finds every object literal with an `id:`
+string and records its span, its fields (key, value and line offsets) and
+the group it sits in (the key owning the enclosing array, e.g. the region
+of an artist). Edits are collected as splices against the original text and
+applied together in one pass, so patching stays linear in the file size
+however many objects change, and offsets from the index stay valid until
+the batch is applied. exported_constants() reads a file's exported literals
+as plain Python values
+
+Usage:
+  python3 ts_objects.py src/data/regionalArtistsEnhanced.ts
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*"|`(?:[^`\\]|\\.)*`)
+  | (?P<number>-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<punct>\.\.\.|[{}\[\](),:;=<>|&?.!*/+-])
+""", re.X | re.S)
+_REGEX = re.compile(r"/(?:[^/\\\n\[]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[a-z]*")
+# A '/' after these starts a regular expression rather than dividing
+_REGEX_AFTER = {None, '(', ',', '=', ':', '[', '!', '&', '|', '?', '{', '}', ';', 'return'}
+_IDENTIFIER = re.compile(r'^[A-Za-z_$][\w$]*$')
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '0': '\0', 'b': '\b', 'f': '\f', 'v': '\v'}
+
+INDENT = '  '
+
+
+class TsSyntaxError(ValueError):
+    """The file is not the object-literal TypeScript the data files are written in"""
+
+
+def tokenize(text):
+    """[(kind, text, start, end)] of a TypeScript source, whitespace and comments dropped"""
+    tokens = []
+    position = 0
+    while position < len(text):
+        previous = tokens[-1][1] if tokens else None
+        match = None
+        if text[position] == '/' and previous in _REGEX_AFTER:
+            match = _REGEX.match(text, position)
+        if match:
+            kind = 'regex'
+        else:
+            match = _TOKEN.match(text, position)
+            if not match:
+                line = text.count('\n', 0, position) + 1
+                raise TsSyntaxError(f"unexpected character {text[position]!r} on line {line}")
+            kind = match.lastgroup
+        if kind not in ('space', 'comment'):
+            tokens.append((kind, match.group(), match.start(), match.end()))
+        position = match.end()
+    return tokens
+
+
+def string_value(token):
+    """Python value of a string token (JS escapes decoded)"""
+    body = token[1:-1]
+    return re.sub(r"\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|\n|.)", _unescape, body)
+
+
+def _unescape(match):
+    code = match.group(1)
+    if code == '\n':
+        return ''
+    if code[0] in 'ux' and len(code) > 1:
+        return chr(int(code.strip('u{}x'), 16))
+    return _ESCAPES.get(code, code)
+
+
+class Field:
+    """One `key: value` of an object literal; offsets index the source text"""
+
+    def __init__(self, name, key_start, value_start):
+        self.name = name
+        self.key_start = key_start
+        self.value_start = value_start
+        self.value_end = None
+        self.end = None          # past the trailing comma when there is one
+        self.has_comma = False
+        self.literal = None      # Python value when the whole value is one string/number/boolean
+
+
+class ObjectSpan:
+    """An object literal: its braces, its fields in order and the group it sits in"""
+
+    def __init__(self, start, group):
+        self.start = start       # offset of '{'
+        self.end = None          # offset just past '}'
+        self.group = group
+        self.fields = {}
+
+    @property
+    def id(self):
+        field = self.fields.get('id')
+        return field.literal if field else None
+
+    def get(self, name, default=None):
+        field = self.fields.get(name)
+        return field.literal if field and field.literal is not None else default
+
+
+class ObjectIndex:
+    """Every object literal of a file that has an `id:` string, in source order"""
+
+    def __init__(self, text):
+        self.text = text
+        self.objects = []
+        self.by_id = {}
+        self.duplicates = []
+        self._scan(tokenize(text))
+
+    def _scan(self, tokens):
+        # Frames: ['object', span, pending field, expecting key] or ['array', owning key]
+        stack = []
+        previous_end = 0
+        i = 0
+        while i < len(tokens):
+            kind, value, start, end = tokens[i]
+            frame = stack[-1] if stack else None
+            in_object = frame is not None and frame[0] == 'object'
+
+            if in_object and frame[3] and kind in ('name', 'string') and i + 1 < len(tokens) \
+                    and tokens[i + 1][1] == ':':
+                name = value if kind == 'name' else string_value(value)
+                value_start = tokens[i + 2][2] if i + 2 < len(tokens) else end
+                frame[2] = Field(name, start, value_start)
+                frame[3] = False
+                i += 2
+                previous_end = tokens[i - 1][3]
+                continue
+
+            if value in ('{', '['):
+                if value == '{':
+                    stack.append(['object', ObjectSpan(start, self._group(stack)), None, True])
+                else:
+                    stack.append(['array', self._owner(stack)])
+            elif value in ('}', ']'):
+                if not stack:
+                    raise TsSyntaxError(f"unbalanced {value!r} at offset {start}")
+                closed = stack.pop()
+                if closed[0] == 'object':
+                    self._finish_field(closed, previous_end, None)
+                    span = closed[1]
+                    span.end = end
+                    if span.id is not None:
+                        self._add(span)
+            elif in_object and value == ',':
+                self._finish_field(frame, previous_end, end)
+                frame[3] = True
+            elif in_object and frame[2] is not None and frame[2].value_start == start:
+                # A value made of one literal token is recorded as its Python value
+                following = tokens[i + 1][1] if i + 1 < len(tokens) else None
+                if following in (',', '}'):
+                    frame[2].literal = _literal(kind, value)
+            previous_end = end
+            i += 1
+        if stack:
+            raise TsSyntaxError("unclosed object or array at end of file")
+
+    @staticmethod
+    def _finish_field(frame, value_end, comma_end):
+        field = frame[2]
+        if field is None:
+            return
+        field.value_end = value_end
+        field.has_comma = comma_end is not None
+        field.end = comma_end if comma_end is not None else value_end
+        frame[1].fields[field.name] = field
+        frame[2] = None
+
+    @staticmethod
+    def _owner(stack):
+        """Key of the field whose value is the container being opened"""
+        if stack and stack[-1][0] == 'object' and stack[-1][2] is not None:
+            return stack[-1][2].name
+        return None
+
+    @staticmethod
+    def _group(stack):
+        """For an object inside an array: the key owning that array"""
+        if stack and stack[-1][0] == 'array':
+            return stack[-1][1]
+        return None
+
+    def _add(self, span):
+        self.objects.append(span)
+        if span.id in self.by_id:
+            self.duplicates.append(span.id)
+        else:
+            self.by_id[span.id] = span
+
+    def field_indent(self, span):
+        """Indentation of the object's properties"""
+        if span.fields:
+            first = next(iter(span.fields.values()))
+            line_start = self.text.rfind('\n', 0, first.key_start) + 1
+            prefix = self.text[line_start:first.key_start]
+            if not prefix.strip():
+                return prefix
+        line_start = self.text.rfind('\n', 0, span.start) + 1
+        return re.match(r'[ \t]*', self.text[line_start:]).group() + INDENT
+
+
+def _literal(kind, value):
+    if kind == 'string':
+        return string_value(value)
+    if kind == 'number':
+        return float(value) if any(c in value for c in '.eE') else int(value)
+    return {'true': True, 'false': False, 'null': None}.get(value)
+
+
+def parse_literal(tokens, i=0):
+    """
+    (Python value, index past it) of the object/array/scalar literal at tokens[i]
+    Anything that is not plain data (calls, spreads, identifiers) is a TsSyntaxError
+    """
+    if i >= len(tokens):
+        raise TsSyntaxError("value expected at end of file")
+    kind, value, start, _ = tokens[i]
+    if value == '{':
+        result = {}
+        i += 1
+        while tokens[i][1] != '}':
+            key_kind, key, key_start, _ = tokens[i]
+            if key_kind not in ('name', 'string', 'number') or tokens[i + 1][1] != ':':
+                raise TsSyntaxError(f"object key expected at offset {key_start}")
+            name = string_value(key) if key_kind == 'string' else key
+            result[name], i = parse_literal(tokens, i + 2)
+            if tokens[i][1] == ',':
+                i += 1
+            elif tokens[i][1] != '}':
+                raise TsSyntaxError(f"',' or '}}' expected at offset {tokens[i][2]}")
+        return result, i + 1
+    if value == '[':
+        result = []
+        i += 1
+        while tokens[i][1] != ']':
+            item, i = parse_literal(tokens, i)
+            result.append(item)
+            if tokens[i][1] == ',':
+                i += 1
+            elif tokens[i][1] != ']':
+                raise TsSyntaxError(f"',' or ']' expected at offset {tokens[i][2]}")
+        return result, i + 1
+    if kind == 'string' and value.startswith('`') and '${' in value:
+        raise TsSyntaxError(f"template literal with substitutions at offset {start}")
+    if kind in ('string', 'number') or value in ('true', 'false', 'null', 'undefined'):
+        return _literal(kind, value), i + 1
+    raise TsSyntaxError(f"unsupported value {value!r} at offset {start}")
+
+
+def exported_constants(text):
+    """
+    {name: (annotation tokens, value)} for every `export const name: Type = <literal>`
+    of a file; the annotation is the token list between ':' and '='
+    """
+    tokens = tokenize(text)
+    constants = {}
+    for i in range(len(tokens) - 2):
+        if tokens[i][1] != 'export' or tokens[i + 1][1] != 'const':
+            continue
+        name = tokens[i + 2][1]
+        j = i + 3
+        annotation = []
+        if tokens[j][1] == ':':
+            j += 1
+            while tokens[j][1] != '=':
+                annotation.append(tokens[j])
+                j += 1
+        if tokens[j][1] != '=':
+            continue
+        value, _ = parse_literal(tokens, j + 1)
+        constants[name] = (annotation, value)
+    return constants
+
+
+def to_ts(value, indent=''):
+    """
+    TypeScript literal for a Python value in the data files' style: single
+    quotes, unquoted keys, objects one property per line, arrays of scalars
+    on one line
+    """
+    if isinstance(value, str):
+        return "'" + value.replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n') + "'"
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if value is None:
+        return 'null'
+    if isinstance(value, (int, float)):
+        return json.dumps(value)
+    inner = indent + INDENT
+    if isinstance(value, dict):
+        if not value:
+            return '{}'
+        lines = [f"{inner}{key if _IDENTIFIER.match(key) else to_ts(key)}: {to_ts(item, inner)}"
+                 for key, item in value.items()]
+        return '{\n' + ',\n'.join(lines) + f'\n{indent}}}'
+    if isinstance(value, (list, tuple)):
+        if all(not isinstance(item, (dict, list, tuple)) for item in value):
+            return '[' + ', '.join(to_ts(item) for item in value) + ']'
+        return '[\n' + ',\n'.join(inner + to_ts(item, inner) for item in value) + f'\n{indent}]'
+    raise TypeError(f"cannot write {type(value).__name__} as TypeScript")
+
+
+class Patcher:
+    """Splices against one source text, applied together"""
+
+    def __init__(self, index):
+        self.index = index
+        self.text = index.text
+        self.splices = []  # (start, end, replacement)
+
+    def replace(self, start, end, replacement):
+        self.splices.append((start, end, replacement))
+
+    def set_field(self, span, name, value, before=()):
+        """
+        Give span's field `name` the value, replacing the existing value or
+        adding the field before the first of `before` it has (else last)
+        """
+        indent = self.index.field_indent(span)
+        field = span.fields.get(name)
+        if field is not None:
+            self.replace(field.value_start, field.value_end, to_ts(value, indent))
+        else:
+            self.insert_field(span, name, value, before)
+
+    def insert_field(self, span, name, value, before=()):
+        indent = self.index.field_indent(span)
+        key = name if _IDENTIFIER.match(name) else to_ts(name)
+        line = f"{key}: {to_ts(value, indent)}"
+        anchor = next((span.fields[b] for b in before if b in span.fields), None)
+        if anchor is not None:
+            self.replace(anchor.key_start, anchor.key_start, f"{line},\n{indent}")
+            return
+        last = list(span.fields.values())[-1] if span.fields else None
+        if last is None:
+            closing = self.index.text.rfind('\n', span.start, span.end - 1)
+            position = closing if closing >= 0 else span.end - 1
+            self.replace(position, position, f"\n{indent}{line}")
+        elif last.has_comma:
+            self.replace(last.end, last.end, f"\n{indent}{line},")
+        else:
+            self.replace(last.value_end, last.value_end, f",\n{indent}{line}")
+
+    def remove_field(self, span, name):
+        field = span.fields.get(name)
+        if field is None:
+            return
+        line_start = self.text.rfind('\n', 0, field.key_start)
+        self.replace(line_start, field.end, '')
+
+    def apply(self):
+        """The patched text; splices may not overlap"""
+        parts = []
+        position = 0
+        for start, end, replacement in sorted(self.splices, key=lambda s: (s[0], s[1])):
+            if start < position:
+                raise ValueError(f"overlapping edits at offset {start}")
+            parts += [self.text[position:start], replacement]
+            position = end
+        parts.append(self.text[position:])
+        return ''.join(parts)
+
+
+def patch_field(path, values, field, before=(), overwrite=False):
+    """
+    Set `field` on the objects of a data file whose id is a key of values
+    Objects that already have the field are left alone unless overwrite.
+    Writes the file only when something changed; returns
+    ({id: 'added'|'updated'|'kept'}, ids not found)
+    """
+    path = Path(path)
+    text = path.read_text(encoding='utf-8')
+    index = ObjectIndex(text)
+    patcher = Patcher(index)
+    results = {}
+    for object_id, value in values.items():
+        span = index.by_id.get(object_id)
+        if span is None:
+            continue
+        if field in span.fields and not overwrite:
+            results[object_id] = 'kept'
+            continue
+        results[object_id] = 'updated' if field in span.fields else 'added'
+        patcher.set_field(span, field, value, before)
+    patched = patcher.apply()
+    if patched != text:
+        path.write_text(patched, encoding='utf-8')
+    return results, [object_id for object_id in values if object_id not in index.by_id]
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    for path in sys.argv[1:]:
+        index = ObjectIndex(Path(path).read_text(encoding='utf-8'))
+        groups = {}
+        for span in index.objects:
+            groups[span.group] = groups.get(span.group, 0) + 1
+        print(f"{path}: {len(index.objects)} objects with an id in {len(groups)} groups")
+        for object_id in index.duplicates:
+            print(f"⚠️  duplicate id: {object_id}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,6 +8,7 @@ import {
   getAllTempoRanges,
   getAllScaleTypes,
   getAutocompleteSuggestions,
+  loadSearchIndex,
   type SearchFilters,
   type SearchResult,
 } from '../utils/searchHelpers';
@@ -26,6 +27,7 @@ export default function AdvancedSearch({ isOpen, onClose, onRegionSelect }: Adva
   const [searchResults, setSearchResults] = useState<SearchResult[]>([]);
   const [showFilters, setShowFilters] = useState(false);
   const [searchHistory, setSearchHistory] = useState<string[]>([]);
+  const [indexReady, setIndexReady] = useState(false);
   
   const searchInputRef = useRef<HTMLInputElement>(null);
 
@@ -47,6 +49,11 @@ export default function AdvancedSearch({ isOpen, onClose, onRegionSelect }: Adva
   const allTempoRanges = getAllTempoRanges();
   const allScaleTypes = getAllScaleTypes();
 
+  // Search from the prebuilt index once it has loaded
+  useEffect(() => {
+    loadSearchIndex().then(index => setIndexReady(index !== null));
+  }, []);
+
   // Load search history from localStorage
   useEffect(() => {
     const history = localStorage.getItem('searchHistory');
@@ -69,7 +76,7 @@ export default function AdvancedSearch({ isOpen, onClose, onRegionSelect }: Adva
     const updatedFilters = { ...filters, query: searchQuery };
     const results = searchRegions(updatedFilters);
     setSearchResults(results);
-  }, [searchQuery, filters]);
+  }, [searchQuery, filters, indexReady]);
 
   // Handle autocomplete
   useEffect(() => {
@@ -79,7 +86,7 @@ export default function AdvancedSearch({ isOpen, onClose, onRegionSelect }: Adva
     } else {
       setAutocompleteSuggestions([]);
     }
-  }, [searchQuery]);
+  }, [searchQuery, indexReady]);
 
   // Handle filter changes
   const toggleArrayFilter = (key: keyof SearchFilters, value: string) => {
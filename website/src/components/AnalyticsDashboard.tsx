@@ -1,4 +1,4 @@
-import { useState } from 'react';
+import { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { X, BarChart3, PieChart, TrendingUp, Music, Users, Globe } from 'lucide-react';
 import {
@@ -27,6 +27,10 @@ import {
   getLinguisticDistribution,
   getScaleDistribution,
   getStatisticsSummary,
+  getInstrumentPairs,
+  getCrossTabs,
+  loadAnalyticsAggregates,
+  type CrossTab,
 } from '../utils/analyticsHelpers';
 
 interface AnalyticsDashboardProps {
@@ -44,32 +48,14 @@ const COLORS = [
 
 export default function AnalyticsDashboard({ isOpen, onClose }: AnalyticsDashboardProps) {
   const [currentView, setCurrentView] = useState<ChartView>('overview');
+  const [aggregatesSettled, setAggregatesSettled] = useState(false);
 
-  // Get all analytics data
-  const stats = getStatisticsSummary();
-  const instruments = getInstrumentDistribution();
-  const tempos = getTempoDistribution();
-  const socialContext = getSocialContextStats();
-  const vocalStyles = getVocalStyleDistribution();
-  const linguistics = getLinguisticDistribution();
-  const scales = getScaleDistribution();
-
-  // Prepare data for charts
-  const instrumentCategoryData = [
-    { category: 'Melodic', count: instruments.filter(i => i.category === 'melodic').length },
-    { category: 'Rhythmic', count: instruments.filter(i => i.category === 'rhythmic').length },
-    { category: 'Unique', count: instruments.filter(i => i.category === 'unique').length },
-  ];
-
-  const hereditaryData = [
-    { name: 'Hereditary', value: socialContext.hereditaryCount },
-    { name: 'Non-Hereditary', value: socialContext.nonHereditaryCount },
-  ];
-
-  const topInstruments = instruments.slice(0, 10).map(i => ({
-    name: i.instrument.length > 15 ? i.instrument.slice(0, 15) + '...' : i.instrument,
-    count: i.count,
-  }));
+  // The dashboard is mounted with the app, so the aggregates are fetched at
+  // app start; the charts wait for them rather than computing every
+  // distribution from musicalRegions on first paint
+  useEffect(() => {
+    loadAnalyticsAggregates().then(() => setAggregatesSettled(true));
+  }, []);
 
   return (
     <AnimatePresence>
@@ -137,265 +123,385 @@ export default function AnalyticsDashboard({ isOpen, onClose }: AnalyticsDashboa
             </div>
 
             {/* Content Area */}
-            <div className="p-6 space-y-6">
-              {/* Overview Tab */}
-              {currentView === 'overview' && (
-                <motion.div
-                  initial={{ opacity: 0, y: 20 }}
-                  animate={{ opacity: 1, y: 0 }}
-                  className="space-y-6"
-                >
-                  {/* Stats Cards */}
-                  <div className="grid grid-cols-2 md:grid-cols-3 lg:grid-cols-5 gap-4">
-                    {[
-                      { label: 'Regions', value: stats.totalRegions, color: 'from-purple-500 to-pink-500' },
-                      { label: 'Instruments', value: stats.totalInstruments, color: 'from-blue-500 to-cyan-500' },
-                      { label: 'Languages', value: stats.totalLanguages, color: 'from-green-500 to-emerald-500' },
-                      { label: 'Communities', value: stats.totalCommunities, color: 'from-orange-500 to-red-500' },
-                      { label: 'Hereditary', value: stats.hereditaryTraditions, color: 'from-yellow-500 to-orange-500' },
-                    ].map((stat, idx) => (
-                      <motion.div
-                        key={stat.label}
-                        initial={{ opacity: 0, scale: 0.9 }}
-                        animate={{ opacity: 1, scale: 1 }}
-                        transition={{ delay: idx * 0.1 }}
-                        className="bg-gradient-to-br from-slate-800 to-slate-900 rounded-xl p-4 border border-slate-700/50 hover:border-purple-500/50 transition-all"
-                      >
-                        <div className={`text-3xl font-bold bg-gradient-to-r ${stat.color} bg-clip-text text-transparent`}>
-                          {stat.value}
-                        </div>
-                        <div className="text-sm text-slate-400 mt-1">{stat.label}</div>
-                      </motion.div>
-                    ))}
-                  </div>
+            {aggregatesSettled ? (
+              <DashboardCharts currentView={currentView} />
+            ) : (
+              <div className="p-6 flex items-center justify-center gap-2 text-slate-400">
+                <BarChart3 className="w-5 h-5 animate-pulse" />
+                <span className="text-sm">Loading analytics...</span>
+              </div>
+            )}
+          </motion.div>
+        </>
+      )}
+    </AnimatePresence>
+  );
+}
 
-                  {/* Linguistic Families */}
-                  <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
-                    <h3 className="text-xl font-bold mb-4 flex items-center gap-2">
-                      <Globe className="w-5 h-5 text-blue-400" />
-                      Linguistic Families Distribution
-                    </h3>
-                    <ResponsiveContainer width="100%" height={300}>
-                      <BarChart data={linguistics}>
-                        <CartesianGrid strokeDasharray="3 3" stroke="#334155" />
-                        <XAxis dataKey="family" stroke="#94a3b8" />
-                        <YAxis stroke="#94a3b8" />
-                        <Tooltip
-                          contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
-                          labelStyle={{ color: '#e2e8f0' }}
-                        />
-                        <Bar dataKey="count" fill="#3b82f6" radius={[8, 8, 0, 0]} />
-                      </BarChart>
-                    </ResponsiveContainer>
-                  </div>
+/**
+ * Charts of the current view, from the precomputed aggregates when they
+ * loaded (or from musicalRegions when they could not be fetched)
+ */
+function DashboardCharts({ currentView }: { currentView: ChartView }) {
+  // Get all analytics data
+  const stats = getStatisticsSummary();
+  const instruments = getInstrumentDistribution();
+  const tempos = getTempoDistribution();
+  const socialContext = getSocialContextStats();
+  const vocalStyles = getVocalStyleDistribution();
+  const linguistics = getLinguisticDistribution();
+  const scales = getScaleDistribution();
+  const instrumentPairs = getInstrumentPairs();
+  const crossTabs = getCrossTabs();
 
-                  {/* Tempo Distribution */}
-                  <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
-                    <h3 className="text-xl font-bold mb-4">Tempo Ranges Across Regions</h3>
-                    <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
-                      {tempos.map((tempo, idx) => (
-                        <div key={tempo.tempoRange} className="flex items-center gap-3 p-3 bg-slate-900/50 rounded-lg">
-                          <div className={`w-12 h-12 rounded-lg bg-gradient-to-br ${COLORS[idx % COLORS.length]} flex items-center justify-center text-lg font-bold`}>
-                            {tempo.count}
-                          </div>
-                          <div className="flex-1">
-                            <div className="font-medium">{tempo.tempoRange}</div>
-                            <div className="text-xs text-slate-400">{tempo.regions.slice(0, 2).join(', ')}...</div>
-                          </div>
-                        </div>
-                      ))}
-                    </div>
-                  </div>
-                </motion.div>
-              )}
+  // Prepare data for charts
+  const instrumentCategoryData = [
+    { category: 'Melodic', count: instruments.filter(i => i.category === 'melodic').length },
+    { category: 'Rhythmic', count: instruments.filter(i => i.category === 'rhythmic').length },
+    { category: 'Unique', count: instruments.filter(i => i.category === 'unique').length },
+  ];
 
-              {/* Instruments Tab */}
-              {currentView === 'instruments' && (
-                <motion.div
-                  initial={{ opacity: 0, y: 20 }}
-                  animate={{ opacity: 1, y: 0 }}
-                  className="space-y-6"
-                >
-                  {/* Instrument Categories Pie Chart */}
-                  <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
-                    <h3 className="text-xl font-bold mb-4 flex items-center gap-2">
-                      <PieChart className="w-5 h-5 text-purple-400" />
-                      Instrument Categories
-                    </h3>
-                    <ResponsiveContainer width="100%" height={300}>
-                      <RechartsPie>
-                        <Pie
-                          data={instrumentCategoryData}
-                          cx="50%"
-                          cy="50%"
-                          labelLine={false}
-                          label={({ index }) => instrumentCategoryData[index]?.category || ''}
-                          outerRadius={100}
-                          fill="#8884d8"
-                          dataKey="count"
-                        >
-                          {instrumentCategoryData.map((_entry, index) => (
-                            <Cell key={`cell-${index}`} fill={COLORS[index % COLORS.length]} />
-                          ))}
-                        </Pie>
-                        <Tooltip
-                          contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
-                        />
-                      </RechartsPie>
-                    </ResponsiveContainer>
-                  </div>
+  const hereditaryData = [
+    { name: 'Hereditary', value: socialContext.hereditaryCount },
+    { name: 'Non-Hereditary', value: socialContext.nonHereditaryCount },
+  ];
 
-                  {/* Top 10 Instruments Bar Chart */}
-                  <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
-                    <h3 className="text-xl font-bold mb-4">Most Common Instruments (by regions)</h3>
-                    <ResponsiveContainer width="100%" height={400}>
-                      <BarChart data={topInstruments} layout="vertical">
-                        <CartesianGrid strokeDasharray="3 3" stroke="#334155" />
-                        <XAxis type="number" stroke="#94a3b8" />
-                        <YAxis dataKey="name" type="category" width={120} stroke="#94a3b8" />
-                        <Tooltip
-                          contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
-                        />
-                        <Bar dataKey="count" fill="#a855f7" radius={[0, 8, 8, 0]} />
-                      </BarChart>
-                    </ResponsiveContainer>
-                  </div>
+  const topInstruments = instruments.slice(0, 10).map(i => ({
+    name: i.instrument.length > 15 ? i.instrument.slice(0, 15) + '...' : i.instrument,
+    count: i.count,
+  }));
+
+  return (
+    <div className="p-6 space-y-6">
+      {/* Overview Tab */}
+      {currentView === 'overview' && (
+        <motion.div
+          initial={{ opacity: 0, y: 20 }}
+          animate={{ opacity: 1, y: 0 }}
+          className="space-y-6"
+        >
+          {/* Stats Cards */}
+          <div className="grid grid-cols-2 md:grid-cols-3 lg:grid-cols-5 gap-4">
+            {[
+              { label: 'Regions', value: stats.totalRegions, color: 'from-purple-500 to-pink-500' },
+              { label: 'Instruments', value: stats.totalInstruments, color: 'from-blue-500 to-cyan-500' },
+              { label: 'Languages', value: stats.totalLanguages, color: 'from-green-500 to-emerald-500' },
+              { label: 'Communities', value: stats.totalCommunities, color: 'from-orange-500 to-red-500' },
+              { label: 'Hereditary', value: stats.hereditaryTraditions, color: 'from-yellow-500 to-orange-500' },
+            ].map((stat, idx) => (
+              <motion.div
+                key={stat.label}
+                initial={{ opacity: 0, scale: 0.9 }}
+                animate={{ opacity: 1, scale: 1 }}
+                transition={{ delay: idx * 0.1 }}
+                className="bg-gradient-to-br from-slate-800 to-slate-900 rounded-xl p-4 border border-slate-700/50 hover:border-purple-500/50 transition-all"
+              >
+                <div className={`text-3xl font-bold bg-gradient-to-r ${stat.color} bg-clip-text text-transparent`}>
+                  {stat.value}
+                </div>
+                <div className="text-sm text-slate-400 mt-1">{stat.label}</div>
+              </motion.div>
+            ))}
+          </div>
+
+          {/* Linguistic Families */}
+          <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
+            <h3 className="text-xl font-bold mb-4 flex items-center gap-2">
+              <Globe className="w-5 h-5 text-blue-400" />
+              Linguistic Families Distribution
+            </h3>
+            <ResponsiveContainer width="100%" height={300}>
+              <BarChart data={linguistics}>
+                <CartesianGrid strokeDasharray="3 3" stroke="#334155" />
+                <XAxis dataKey="family" stroke="#94a3b8" />
+                <YAxis stroke="#94a3b8" />
+                <Tooltip
+                  contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
+                  labelStyle={{ color: '#e2e8f0' }}
+                />
+                <Bar dataKey="count" fill="#3b82f6" radius={[8, 8, 0, 0]} />
+              </BarChart>
+            </ResponsiveContainer>
+          </div>
 
-                  {/* Instrument Details Grid */}
-                  <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
-                    <h3 className="text-xl font-bold mb-4">Instrument Details</h3>
-                    <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-3">
-                      {instruments.slice(0, 12).map((instrument) => (
-                        <div
-                          key={instrument.instrument}
-                          className="bg-slate-900/50 rounded-lg p-4 border border-slate-700/30 hover:border-purple-500/50 transition-all"
-                        >
-                          <div className="font-semibold text-purple-300">{instrument.instrument}</div>
-                          <div className="text-xs text-slate-400 mt-1 capitalize">{instrument.category}</div>
-                          <div className="text-sm text-slate-300 mt-2">Used in {instrument.count} regions</div>
-                          <div className="text-xs text-slate-500 mt-1">
-                            {instrument.regions.slice(0, 2).join(', ')}
-                            {instrument.regions.length > 2 && ` +${instrument.regions.length - 2} more`}
-                          </div>
-                        </div>
-                      ))}
-                    </div>
+          {/* Tempo Distribution */}
+          <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
+            <h3 className="text-xl font-bold mb-4">Tempo Ranges Across Regions</h3>
+            <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
+              {tempos.map((tempo, idx) => (
+                <div key={tempo.tempoRange} className="flex items-center gap-3 p-3 bg-slate-900/50 rounded-lg">
+                  <div className={`w-12 h-12 rounded-lg bg-gradient-to-br ${COLORS[idx % COLORS.length]} flex items-center justify-center text-lg font-bold`}>
+                    {tempo.count}
                   </div>
-                </motion.div>
-              )}
+                  <div className="flex-1">
+                    <div className="font-medium">{tempo.tempoRange}</div>
+                    <div className="text-xs text-slate-400">{tempo.regions.slice(0, 2).join(', ')}...</div>
+                  </div>
+                </div>
+              ))}
+            </div>
+          </div>
+        </motion.div>
+      )}
 
-              {/* Social Context Tab */}
-              {currentView === 'social' && (
-                <motion.div
-                  initial={{ opacity: 0, y: 20 }}
-                  animate={{ opacity: 1, y: 0 }}
-                  className="space-y-6"
+      {/* Instruments Tab */}
+      {currentView === 'instruments' && (
+        <motion.div
+          initial={{ opacity: 0, y: 20 }}
+          animate={{ opacity: 1, y: 0 }}
+          className="space-y-6"
+        >
+          {/* Instrument Categories Pie Chart */}
+          <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
+            <h3 className="text-xl font-bold mb-4 flex items-center gap-2">
+              <PieChart className="w-5 h-5 text-purple-400" />
+              Instrument Categories
+            </h3>
+            <ResponsiveContainer width="100%" height={300}>
+              <RechartsPie>
+                <Pie
+                  data={instrumentCategoryData}
+                  cx="50%"
+                  cy="50%"
+                  labelLine={false}
+                  label={({ index }) => instrumentCategoryData[index]?.category || ''}
+                  outerRadius={100}
+                  fill="#8884d8"
+                  dataKey="count"
                 >
-                  {/* Hereditary Traditions Pie Chart */}
-                  <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
-                    <h3 className="text-xl font-bold mb-4">Hereditary vs Non-Hereditary Traditions</h3>
-                    <ResponsiveContainer width="100%" height={300}>
-                      <RechartsPie>
-                        <Pie
-                          data={hereditaryData}
-                          cx="50%"
-                          cy="50%"
-                          labelLine={false}
-                          label={({ name, value }) => `${name}: ${value}`}
-                          outerRadius={100}
-                          fill="#8884d8"
-                          dataKey="value"
-                        >
-                          <Cell fill="#10b981" />
-                          <Cell fill="#f59e0b" />
-                        </Pie>
-                        <Tooltip
-                          contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
-                        />
-                      </RechartsPie>
-                    </ResponsiveContainer>
-                  </div>
+                  {instrumentCategoryData.map((_entry, index) => (
+                    <Cell key={`cell-${index}`} fill={COLORS[index % COLORS.length]} />
+                  ))}
+                </Pie>
+                <Tooltip
+                  contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
+                />
+              </RechartsPie>
+            </ResponsiveContainer>
+          </div>
+
+          {/* Top 10 Instruments Bar Chart */}
+          <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
+            <h3 className="text-xl font-bold mb-4">Most Common Instruments (by regions)</h3>
+            <ResponsiveContainer width="100%" height={400}>
+              <BarChart data={topInstruments} layout="vertical">
+                <CartesianGrid strokeDasharray="3 3" stroke="#334155" />
+                <XAxis type="number" stroke="#94a3b8" />
+                <YAxis dataKey="name" type="category" width={120} stroke="#94a3b8" />
+                <Tooltip
+                  contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
+                />
+                <Bar dataKey="count" fill="#a855f7" radius={[0, 8, 8, 0]} />
+              </BarChart>
+            </ResponsiveContainer>
+          </div>
 
-                  {/* Musician Castes/Communities */}
-                  <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
-                    <h3 className="text-xl font-bold mb-4">Traditional Musician Communities</h3>
-                    <div className="grid grid-cols-2 md:grid-cols-3 lg:grid-cols-4 gap-3">
-                      {socialContext.castes.map((caste, idx) => (
-                        <div
-                          key={caste.name}
-                          className="bg-gradient-to-br from-slate-900 to-slate-800 rounded-lg p-4 border border-slate-700/50"
-                        >
-                          <div className={`text-2xl font-bold bg-gradient-to-r ${COLORS[idx % COLORS.length]} bg-clip-text text-transparent`}>
-                            {caste.count}
-                          </div>
-                          <div className="text-sm text-slate-300 mt-1">{caste.name}</div>
-                        </div>
-                      ))}
-                    </div>
+          {/* Instrument Details Grid */}
+          <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
+            <h3 className="text-xl font-bold mb-4">Instrument Details</h3>
+            <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-3">
+              {instruments.slice(0, 12).map((instrument) => (
+                <div
+                  key={instrument.instrument}
+                  className="bg-slate-900/50 rounded-lg p-4 border border-slate-700/30 hover:border-purple-500/50 transition-all"
+                >
+                  <div className="font-semibold text-purple-300">{instrument.instrument}</div>
+                  <div className="text-xs text-slate-400 mt-1 capitalize">{instrument.category}</div>
+                  <div className="text-sm text-slate-300 mt-2">Used in {instrument.count} regions</div>
+                  <div className="text-xs text-slate-500 mt-1">
+                    {instrument.regions.slice(0, 2).join(', ')}
+                    {instrument.regions.length > 2 && ` +${instrument.regions.length - 2} more`}
                   </div>
+                </div>
+              ))}
+            </div>
+          </div>
 
-                  {/* Patronage Systems */}
-                  <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
-                    <h3 className="text-xl font-bold mb-4">Patronage Systems</h3>
-                    <ResponsiveContainer width="100%" height={300}>
-                      <BarChart data={socialContext.patronageTypes}>
-                        <CartesianGrid strokeDasharray="3 3" stroke="#334155" />
-                        <XAxis dataKey="type" stroke="#94a3b8" />
-                        <YAxis stroke="#94a3b8" />
-                        <Tooltip
-                          contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
-                        />
-                        <Bar dataKey="count" fill="#ec4899" radius={[8, 8, 0, 0]} />
-                      </BarChart>
-                    </ResponsiveContainer>
+          {/* Instruments Played Together (precomputed only) */}
+          {instrumentPairs.length > 0 && (
+            <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
+              <h3 className="text-xl font-bold mb-4">Instruments Played Together</h3>
+              <div className="grid grid-cols-1 md:grid-cols-2 gap-3">
+                {instrumentPairs.slice(0, 8).map((pair) => (
+                  <div
+                    key={pair.instruments.join('+')}
+                    className="bg-slate-900/50 rounded-lg p-4 border border-slate-700/30"
+                  >
+                    <div className="font-semibold text-purple-300">{pair.instruments.join(' + ')}</div>
+                    <div className="text-sm text-slate-300 mt-2">Together in {pair.count} regions</div>
+                    <div className="text-xs text-slate-500 mt-1">{pair.regions.join(', ')}</div>
                   </div>
-                </motion.div>
-              )}
+                ))}
+              </div>
+            </div>
+          )}
+        </motion.div>
+      )}
 
-              {/* Musical Elements Tab */}
-              {currentView === 'musical' && (
-                <motion.div
-                  initial={{ opacity: 0, y: 20 }}
-                  animate={{ opacity: 1, y: 0 }}
-                  className="space-y-6"
+      {/* Social Context Tab */}
+      {currentView === 'social' && (
+        <motion.div
+          initial={{ opacity: 0, y: 20 }}
+          animate={{ opacity: 1, y: 0 }}
+          className="space-y-6"
+        >
+          {/* Hereditary Traditions Pie Chart */}
+          <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
+            <h3 className="text-xl font-bold mb-4">Hereditary vs Non-Hereditary Traditions</h3>
+            <ResponsiveContainer width="100%" height={300}>
+              <RechartsPie>
+                <Pie
+                  data={hereditaryData}
+                  cx="50%"
+                  cy="50%"
+                  labelLine={false}
+                  label={({ name, value }) => `${name}: ${value}`}
+                  outerRadius={100}
+                  fill="#8884d8"
+                  dataKey="value"
                 >
-                  {/* Vocal Styles Radar Chart */}
-                  <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
-                    <h3 className="text-xl font-bold mb-4">Vocal Style Distribution</h3>
-                    <ResponsiveContainer width="100%" height={400}>
-                      <RadarChart data={vocalStyles}>
-                        <PolarGrid stroke="#475569" />
-                        <PolarAngleAxis dataKey="style" stroke="#94a3b8" />
-                        <PolarRadiusAxis stroke="#94a3b8" />
-                        <Radar name="Frequency" dataKey="count" stroke="#8b5cf6" fill="#8b5cf6" fillOpacity={0.6} />
-                        <Tooltip
-                          contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
-                        />
-                      </RadarChart>
-                    </ResponsiveContainer>
-                  </div>
+                  <Cell fill="#10b981" />
+                  <Cell fill="#f59e0b" />
+                </Pie>
+                <Tooltip
+                  contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
+                />
+              </RechartsPie>
+            </ResponsiveContainer>
+          </div>
 
-                  {/* Scale Types */}
-                  <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
-                    <h3 className="text-xl font-bold mb-4">Scale Types Distribution</h3>
-                    <ResponsiveContainer width="100%" height={300}>
-                      <BarChart data={scales}>
-                        <CartesianGrid strokeDasharray="3 3" stroke="#334155" />
-                        <XAxis dataKey="scale" stroke="#94a3b8" angle={-15} textAnchor="end" height={100} />
-                        <YAxis stroke="#94a3b8" />
-                        <Tooltip
-                          contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
-                        />
-                        <Bar dataKey="count" fill="#06b6d4" radius={[8, 8, 0, 0]} />
-                      </BarChart>
-                    </ResponsiveContainer>
+          {/* Musician Castes/Communities */}
+          <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
+            <h3 className="text-xl font-bold mb-4">Traditional Musician Communities</h3>
+            <div className="grid grid-cols-2 md:grid-cols-3 lg:grid-cols-4 gap-3">
+              {socialContext.castes.map((caste, idx) => (
+                <div
+                  key={caste.name}
+                  className="bg-gradient-to-br from-slate-900 to-slate-800 rounded-lg p-4 border border-slate-700/50"
+                >
+                  <div className={`text-2xl font-bold bg-gradient-to-r ${COLORS[idx % COLORS.length]} bg-clip-text text-transparent`}>
+                    {caste.count}
                   </div>
-                </motion.div>
-              )}
+                  <div className="text-sm text-slate-300 mt-1">{caste.name}</div>
+                </div>
+              ))}
             </div>
-          </motion.div>
-        </>
+          </div>
+
+          {/* Patronage Systems */}
+          <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
+            <h3 className="text-xl font-bold mb-4">Patronage Systems</h3>
+            <ResponsiveContainer width="100%" height={300}>
+              <BarChart data={socialContext.patronageTypes}>
+                <CartesianGrid strokeDasharray="3 3" stroke="#334155" />
+                <XAxis dataKey="type" stroke="#94a3b8" />
+                <YAxis stroke="#94a3b8" />
+                <Tooltip
+                  contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
+                />
+                <Bar dataKey="count" fill="#ec4899" radius={[8, 8, 0, 0]} />
+              </BarChart>
+            </ResponsiveContainer>
+          </div>
+        </motion.div>
       )}
-    </AnimatePresence>
+
+      {/* Musical Elements Tab */}
+      {currentView === 'musical' && (
+        <motion.div
+          initial={{ opacity: 0, y: 20 }}
+          animate={{ opacity: 1, y: 0 }}
+          className="space-y-6"
+        >
+          {/* Vocal Styles Radar Chart */}
+          <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
+            <h3 className="text-xl font-bold mb-4">Vocal Style Distribution</h3>
+            <ResponsiveContainer width="100%" height={400}>
+              <RadarChart data={vocalStyles}>
+                <PolarGrid stroke="#475569" />
+                <PolarAngleAxis dataKey="style" stroke="#94a3b8" />
+                <PolarRadiusAxis stroke="#94a3b8" />
+                <Radar name="Frequency" dataKey="count" stroke="#8b5cf6" fill="#8b5cf6" fillOpacity={0.6} />
+                <Tooltip
+                  contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
+                />
+              </RadarChart>
+            </ResponsiveContainer>
+          </div>
+
+          {/* Scale Types */}
+          <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50">
+            <h3 className="text-xl font-bold mb-4">Scale Types Distribution</h3>
+            <ResponsiveContainer width="100%" height={300}>
+              <BarChart data={scales}>
+                <CartesianGrid strokeDasharray="3 3" stroke="#334155" />
+                <XAxis dataKey="scale" stroke="#94a3b8" angle={-15} textAnchor="end" height={100} />
+                <YAxis stroke="#94a3b8" />
+                <Tooltip
+                  contentStyle={{ backgroundColor: '#1e293b', border: '1px solid #475569', borderRadius: '8px' }}
+                />
+                <Bar dataKey="count" fill="#06b6d4" radius={[8, 8, 0, 0]} />
+              </BarChart>
+            </ResponsiveContainer>
+          </div>
+
+          {/* Cross-tabulations (precomputed only) */}
+          {crossTabs && (
+            <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
+              <CrossTabTable title="Linguistic Families by Tempo" table={crossTabs.familyByTempo} />
+              <CrossTabTable title="Scale Types by Linguistic Family" table={crossTabs.scaleByFamily} />
+              <CrossTabTable
+                title="Hereditary Traditions by Linguistic Family"
+                table={crossTabs.familyByHereditary}
+                columnLabel={(hereditary) => (hereditary ? 'Hereditary' : 'Non-Hereditary')}
+              />
+            </div>
+          )}
+        </motion.div>
+      )}
+    </div>
+  );
+}
+
+/**
+ * Regions counted by two facets, one row per value of the first
+ */
+function CrossTabTable<C>({
+  title,
+  table,
+  columnLabel = String,
+}: {
+  title: string;
+  table: CrossTab<string, C>;
+  columnLabel?: (column: C) => string;
+}) {
+  return (
+    <div className="bg-slate-800/50 rounded-xl p-6 border border-slate-700/50 overflow-x-auto">
+      <h3 className="text-xl font-bold mb-4">{title}</h3>
+      <table className="w-full text-sm">
+        <thead>
+          <tr className="text-slate-400">
+            <th className="text-left font-medium pb-2 pr-4" />
+            {table.columns.map((column) => (
+              <th key={String(column)} className="text-right font-medium pb-2 px-2">
+                {columnLabel(column)}
+              </th>
+            ))}
+          </tr>
+        </thead>
+        <tbody>
+          {table.rows.map((row, i) => (
+            <tr key={row} className="border-t border-slate-700/50">
+              <td className="py-2 pr-4 text-slate-300">{row}</td>
+              {table.counts[i].map((count, j) => (
+                <td key={j} className={`py-2 px-2 text-right ${count ? 'text-purple-300 font-semibold' : 'text-slate-600'}`}>
+                  {count}
+                </td>
+              ))}
+            </tr>
+          ))}
+        </tbody>
+      </table>
+    </div>
   );
 }
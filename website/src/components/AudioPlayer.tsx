@@ -2,13 +2,15 @@ import { useEffect, useRef, useState } from 'react';
 import { motion } from 'framer-motion';
 import { Play, Pause, Volume2, VolumeX, X, AlertCircle, Music } from 'lucide-react';
 import { Howl } from 'howler';
+import { findAudioEntry } from '../utils/assetManifest';
 
 interface AudioPlayerProps {
   audioUrl: string;
   onClose: () => void;
+  regionId?: string;
 }
 
-const AudioPlayer: React.FC<AudioPlayerProps> = ({ audioUrl, onClose }) => {
+const AudioPlayer: React.FC<AudioPlayerProps> = ({ audioUrl, onClose, regionId }) => {
   const [isPlaying, setIsPlaying] = useState(false);
   const [volume, setVolume] = useState(0.7);
   const [isMuted, setIsMuted] = useState(false);
@@ -23,40 +25,17 @@ const AudioPlayer: React.FC<AudioPlayerProps> = ({ audioUrl, onClose }) => {
   // Check if audio file exists in manifest
   useEffect(() => {
     const checkAudioManifest = async () => {
-      try {
-        const response = await fetch('/audio/manifest.json');
-        if (response.ok) {
-          const manifest = await response.json();
-          const audioName = audioUrl.split('/').pop() || '';
-          
-          if (!audioName) return;
-
-          // Check ambient, instruments, ensembles, or samples
-
-          const isPlaceholder = 
-            (manifest.audio?.ambient?.[audioName]?.isPlaceholder === true) ||
-            (manifest.audio?.instruments?.[audioName]?.isPlaceholder === true) ||
-            (manifest.audio?.ensembles?.[audioName]?.isPlaceholder === true) ||
-            (manifest.audio?.samples?.[audioName]?.isPlaceholder === true);
-          
-          if (isPlaceholder) {
-            console.warn('Audio marked as placeholder:', audioName);
-            setHasError(true);
-            setErrorMessage('Audio file not available yet');
-            setIsLoading(false);
-            return;
-          }
-          
-          console.log('Audio file check passed:', audioName);
-        }
-      } catch (error) {
-        // Manifest check failed, continue with normal loading
-        console.warn('Audio manifest check failed:', error);
+      const entry = await findAudioEntry(audioUrl, regionId);
+      if (entry?.isPlaceholder === true) {
+        console.warn('Audio marked as placeholder:', audioUrl);
+        setHasError(true);
+        setErrorMessage('Audio file not available yet');
+        setIsLoading(false);
       }
     };
 
     checkAudioManifest();
-  }, [audioUrl]);
+  }, [audioUrl, regionId]);
 
   useEffect(() => {
     if (hasError) return;
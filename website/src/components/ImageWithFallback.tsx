@@ -1,5 +1,21 @@
 import { useState, useEffect } from 'react';
 import { ImageOff, Loader2 } from 'lucide-react';
+import { findImageEntry, type ImageVariant } from '../utils/assetManifest';
+
+// Formats in order of preference; the browser takes the first it supports
+const VARIANT_FORMATS: { format: string; type: string }[] = [
+  { format: 'avif', type: 'image/avif' },
+  { format: 'webp', type: 'image/webp' },
+];
+
+// Inline preview from the manifest, painted while the real image loads
+interface ImagePreview {
+  dominantColor?: string;
+  lqip?: string;
+}
+
+const toSrcSet = (variants: ImageVariant[]) =>
+  variants.map((variant) => `${variant.path} ${variant.width}w`).join(', ');
 
 interface ImageWithFallbackProps {
   src: string;
@@ -11,6 +27,7 @@ interface ImageWithFallbackProps {
   onLoad?: () => void;
   onError?: () => void;
   lazy?: boolean;
+  regionId?: string;
 }
 
 export default function ImageWithFallback({
@@ -23,40 +40,44 @@ export default function ImageWithFallback({
   onLoad,
   onError,
   lazy = true,
+  regionId,
 }: ImageWithFallbackProps) {
   const [imageSrc, setImageSrc] = useState<string>(src);
   const [isLoading, setIsLoading] = useState(true);
   const [hasError, setHasError] = useState(false);
   const [, setManifestChecked] = useState(false);
+  const [variants, setVariants] = useState<Record<string, ImageVariant[]>>({});
+  const [preview, setPreview] = useState<ImagePreview>({});
 
   // Check manifest to see if image exists
   useEffect(() => {
     const checkManifest = async () => {
-      try {
-        const response = await fetch('/images/manifest.json');
-        if (response.ok) {
-          const manifest = await response.json();
-          const imageName = src.split('/').pop();
-          if (imageName && manifest.images && manifest.images[imageName]) {
-            if (!manifest.images[imageName].exists) {
-              setHasError(true);
-              setIsLoading(false);
-              setManifestChecked(true);
-              return;
-            }
-          }
+      const found = await findImageEntry(src, regionId);
+      if (found) {
+        const { entry: own, shard } = found;
+        if (!own.exists) {
+          setHasError(true);
+          setIsLoading(false);
+          setManifestChecked(true);
+          return;
+        }
+        // Duplicates of another image load the kept copy, so the browser caches one file
+        const entry = (own.duplicateOf && shard.images[own.duplicateOf]) || own;
+        if (entry !== own && entry.exists) {
+          setImageSrc(entry.path);
         }
-      } catch (error) {
-        // Manifest check failed, continue with normal loading
-        console.warn('Manifest check failed:', error);
+        const { variants: imageVariants, dominantColor, lqip } = entry;
+        setVariants(imageVariants || {});
+        setPreview({ dominantColor, lqip });
       }
       setManifestChecked(true);
     };
 
     checkManifest();
-  }, [src]);
+  }, [src, regionId]);
 
   const handleError = () => {
+    setVariants({});
     setHasError(true);
     setIsLoading(false);
     
@@ -91,23 +112,36 @@ export default function ImageWithFallback({
   }
 
   return (
-    <div className={`relative ${className}`} style={{ width, height }}>
+    <div className={`relative overflow-hidden ${className}`} style={{ width, height }}>
       {isLoading && (
-        <div className="absolute inset-0 bg-gray-200 flex items-center justify-center">
-          <Loader2 className="w-8 h-8 text-gray-400 animate-spin" />
+        <div
+          className="absolute inset-0 bg-gray-200 bg-cover bg-center flex items-center justify-center"
+          style={{
+            backgroundColor: preview.dominantColor,
+            backgroundImage: preview.lqip ? `url(${preview.lqip})` : undefined,
+            filter: preview.lqip ? 'blur(12px)' : undefined,
+          }}
+        >
+          {!preview.lqip && <Loader2 className="w-8 h-8 text-gray-400 animate-spin" />}
         </div>
       )}
-      <img
-        src={imageSrc}
-        alt={alt}
-        className={`w-full h-full object-cover transition-opacity duration-300 ${
-          isLoading ? 'opacity-0' : 'opacity-100'
-        }`}
-        onLoad={handleLoad}
-        onError={handleError}
-        loading={lazy ? 'lazy' : 'eager'}
-        style={{ width, height }}
-      />
+      <picture>
+        {/* Variants let the browser fetch the smallest file that covers the rendered width */}
+        {VARIANT_FORMATS.filter(({ format }) => variants[format]?.length).map(({ format, type }) => (
+          <source key={format} type={type} srcSet={toSrcSet(variants[format])} sizes={`${width}px`} />
+        ))}
+        <img
+          src={imageSrc}
+          alt={alt}
+          className={`w-full h-full object-cover transition-opacity duration-300 ${
+            isLoading ? 'opacity-0' : 'opacity-100'
+          }`}
+          onLoad={handleLoad}
+          onError={handleError}
+          loading={lazy ? 'lazy' : 'eager'}
+          style={{ width, height }}
+        />
+      </picture>
     </div>
   );
 }
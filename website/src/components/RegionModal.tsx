@@ -181,6 +181,7 @@ const RegionModal: React.FC<RegionModalProps> = ({ region, onClose }) => {
                                                             audioUrl={sample.file}
                                                             title={sample.title}
                                                             description={sample.description}
+                                                            regionId={region.id}
                                                         />
                                                     ))}
                                                 </div>
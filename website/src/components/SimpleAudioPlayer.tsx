@@ -1,16 +1,20 @@
 import React, { useRef, useState, useEffect } from 'react';
 import { Play, Pause, Volume2, VolumeX, RotateCcw, AlertCircle, Music } from 'lucide-react';
+import { findAudioEntry } from '../utils/assetManifest';
+import { attachSegmentedSource } from '../utils/segmentedAudio';
 
 interface SimpleAudioPlayerProps {
   audioUrl: string;
   title: string;
   description?: string;
+  regionId?: string;
 }
 
 const SimpleAudioPlayer: React.FC<SimpleAudioPlayerProps> = ({
   audioUrl,
   title,
   description,
+  regionId,
 }) => {
   const audioRef = useRef<HTMLAudioElement>(null);
   const [isPlaying, setIsPlaying] = useState(false);
@@ -23,40 +27,33 @@ const SimpleAudioPlayer: React.FC<SimpleAudioPlayerProps> = ({
   const [hasError, setHasError] = useState(false);
   const [errorMessage, setErrorMessage] = useState<string>('');
 
-  // Check audio manifest
+  // Check audio manifest; long recordings stream segment by segment
   useEffect(() => {
-    const checkManifest = async () => {
-      try {
-        const response = await fetch('/audio/manifest.json');
-        if (response.ok) {
-          const manifest = await response.json();
-          const audioName = audioUrl.split('/').pop() || '';
-          
-          if (!audioName) return;
+    let cancelled = false;
+    let detach: (() => void) | null = null;
 
-          const isPlaceholder = 
-            (manifest.audio?.ambient?.[audioName]?.isPlaceholder === true) ||
-            (manifest.audio?.instruments?.[audioName]?.isPlaceholder === true) ||
-            (manifest.audio?.ensembles?.[audioName]?.isPlaceholder === true) ||
-            (manifest.audio?.samples?.[audioName]?.isPlaceholder === true);
-          
-          if (isPlaceholder) {
-            console.warn('Audio marked as placeholder:', audioName);
-            setHasError(true);
-            setErrorMessage('Audio file not available yet');
-            setIsLoading(false);
-            return;
-          }
-          
-          console.log('Audio file check passed:', audioName);
-        }
-      } catch (error) {
-        console.warn('Manifest check failed:', error);
+    const checkManifest = async () => {
+      const entry = await findAudioEntry(audioUrl, regionId);
+      if (cancelled) return;
+      if (entry?.isPlaceholder === true) {
+        console.warn('Audio marked as placeholder:', audioUrl);
+        setHasError(true);
+        setErrorMessage('Audio file not available yet');
+        setIsLoading(false);
+        return;
+      }
+      const audio = audioRef.current;
+      if (entry && audio && audio.paused && audio.currentTime === 0) {
+        detach = attachSegmentedSource(audio, entry);
       }
     };
 
     checkManifest();
-  }, [audioUrl]);
+    return () => {
+      cancelled = true;
+      detach?.();
+    };
+  }, [audioUrl, regionId]);
 
   useEffect(() => {
     const audio = audioRef.current;
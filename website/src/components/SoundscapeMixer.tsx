@@ -4,6 +4,8 @@ import { Play, Pause, Volume2, Download, Share2, RotateCcw, Save, Layers, X, Sli
 import { motion, AnimatePresence } from 'framer-motion';
 import type { InstrumentTrack, AmbientTrack, EffectSettings, SoundscapePreset } from '../types/music';
 import { getAudioEngine } from '../utils/AudioEngine';
+import { findSprite, loopSources, spriteStemKey } from '../utils/assetManifest';
+import { loadSpriteSheet, SpriteVoice, type MixerVoice } from '../utils/audioSprite';
 import SpectrumAnalyzer from './SpectrumAnalyzer';
 import VUMeter from './VUMeter';
 import EffectsPanel from './EffectsPanel';
@@ -156,11 +158,25 @@ const SoundscapeMixer: React.FC<SoundscapeMixerProps> = ({ regionId, regionName,
         eq: { low: 0, mid: 0, high: 0 },
     });
     
-    const howlInstancesRef = useRef<Map<string, Howl>>(new Map());
+    const howlInstancesRef = useRef<Map<string, MixerVoice>>(new Map());
+    // The region's sprite of instrument loops, shared by the tracks packed in it
+    const spriteSheetRef = useRef<Howl | null>(null);
+    // Where each stem's loop starts in its original recording, in seconds
+    const loopOffsetsRef = useRef<Map<string, number>>(new Map());
+    // Linear normalization gain baked into what each stem plays, so its meter
+    // can scale the original recording's envelope to match
+    const sourceGainsRef = useRef<Map<string, number>>(new Map());
     const audioEngineRef = useRef(getAudioEngine());
     const [analyser, setAnalyser] = useState<AnalyserNode | null>(null);
     const [audioInitialized, setAudioInitialized] = useState(false);
 
+    // Playback position of a track for its level meter, null while the mix is stopped
+    const trackPosition = (trackId: string): number | null => {
+        const howl = howlInstancesRef.current.get(trackId);
+        if (!isPlaying || !howl?.playing()) return null;
+        return (howl.seek() as number) + (loopOffsetsRef.current.get(trackId) ?? 0);
+    };
+
     // Initialize audio engine
     const initializeAudio = async () => {
         if (audioInitialized) return;
@@ -178,13 +194,49 @@ const SoundscapeMixer: React.FC<SoundscapeMixerProps> = ({ regionId, regionName,
 
     // Initialize Howl instances for instrument tracks
     useEffect(() => {
+        let cancelled = false;
         // Use a local reference to the current tracks to avoid dependency issues
         // We only want to initialize audio once on mount
-        tracks.forEach((track) => {
+        const createVoices = async () => {
+            // Stems packed into the region's sprite share one request and one decode
+            const sprite = await findSprite(regionId);
+            if (cancelled) return;
+            const packed = sprite ? tracks.filter((track) => spriteStemKey(sprite, track.audioUrl)) : [];
+            if (sprite && packed.length > 0) {
+                console.log(`Loading sprite for ${packed.length} tracks:`, sprite.path);
+                const sheet = loadSpriteSheet(sprite, {
+                    onload: () => {
+                        console.log(`✅ Loaded sprite: ${sprite.path}`);
+                        setTracks((prev) =>
+                            prev.map((t) => (packed.some((p) => p.id === t.id) ? { ...t, isLoaded: true } : t))
+                        );
+                    },
+                    onloaderror: (error) => {
+                        console.warn(`⚠️ Warning loading sprite ${sprite.path}:`, error);
+                    },
+                });
+                spriteSheetRef.current = sheet;
+                packed.forEach((track) => {
+                    const key = spriteStemKey(sprite, track.audioUrl)!;
+                    loopOffsetsRef.current.set(track.id, sprite.stems[key].sourceOffset);
+                    sourceGainsRef.current.set(track.id, 10 ** (sprite.stems[key].gainDb / 20));
+                    howlInstancesRef.current.set(track.id, new SpriteVoice(sheet, sprite, key, track.volume));
+                });
+            }
+            tracks.filter((track) => !packed.includes(track)).forEach(createHowl);
+        };
+
+        const createHowl = async (track: InstrumentTrack) => {
+            // The stem's seamless loop when the manifest has one, else its
+            // loudness-normalized renditions, else the original
+            const { src, offset, gainDb } = await loopSources(track.audioUrl, regionId);
+            if (cancelled) return;
             if (!howlInstancesRef.current.has(track.id)) {
-                console.log(`Creating Howl instance for: ${track.name}`, track.audioUrl);
+                loopOffsetsRef.current.set(track.id, offset);
+                sourceGainsRef.current.set(track.id, 10 ** (gainDb / 20));
+                console.log(`Creating Howl instance for: ${track.name}`, src[0]);
                 const howl = new Howl({
-                    src: [track.audioUrl],
+                    src,
                     loop: true,
                     volume: track.volume,
                     onload: () => {
@@ -209,27 +261,37 @@ const SoundscapeMixer: React.FC<SoundscapeMixerProps> = ({ regionId, regionName,
                 });
                 howlInstancesRef.current.set(track.id, howl);
             }
-        });
+        };
+
+        createVoices();
 
         return () => {
             // Cleanup on unmount
+            cancelled = true;
             howlInstancesRef.current.forEach((howl) => {
                 howl.stop();
                 howl.unload();
             });
             howlInstancesRef.current.clear();
+            spriteSheetRef.current?.unload();
+            spriteSheetRef.current = null;
         };
         // eslint-disable-next-line react-hooks/exhaustive-deps
     }, []);
 
     // Initialize Howl instances for ambient tracks
     useEffect(() => {
-        ambientTracks.forEach((track) => {
+        let cancelled = false;
+        ambientTracks.forEach(async (track) => {
             const ambientId = `ambient_${track.id}`;
+            const { src, offset, gainDb } = await loopSources(track.audioUrl, regionId);
+            if (cancelled) return;
             if (!howlInstancesRef.current.has(ambientId)) {
-                console.log(`Creating ambient Howl instance for: ${track.name}`, track.audioUrl);
+                loopOffsetsRef.current.set(ambientId, offset);
+                sourceGainsRef.current.set(ambientId, 10 ** (gainDb / 20));
+                console.log(`Creating ambient Howl instance for: ${track.name}`, src[0]);
                 const howl = new Howl({
-                    src: [track.audioUrl],
+                    src,
                     loop: true,
                     volume: track.volume,
                     onload: () => {
@@ -249,6 +311,11 @@ const SoundscapeMixer: React.FC<SoundscapeMixerProps> = ({ regionId, regionName,
                 howlInstancesRef.current.set(ambientId, howl);
             }
         });
+
+        return () => {
+            // The instrument effect's cleanup unloads every Howl, ambient ones included
+            cancelled = true;
+        };
         // eslint-disable-next-line react-hooks/exhaustive-deps
     }, []);
 
@@ -601,6 +668,8 @@ const SoundscapeMixer: React.FC<SoundscapeMixerProps> = ({ regionId, regionName,
                                         width={200}
                                         height={60}
                                         barCount={32}
+                                        previewUrl={tracks[0]?.audioUrl}
+                                        regionId={regionId}
                                     />
                                 </div>
                                 <div className="flex items-center gap-2">
@@ -817,7 +886,19 @@ const SoundscapeMixer: React.FC<SoundscapeMixerProps> = ({ regionId, regionName,
                                         </div>
 
                                         <div className="flex items-center gap-3">
-                                            <VUMeter analyser={analyser} width={6} height={40} />
+                                            <VUMeter
+                                                analyser={analyser}
+                                                width={6}
+                                                height={40}
+                                                audioUrl={track.audioUrl}
+                                                getTime={() => trackPosition(track.id)}
+                                                gain={
+                                                    track.isMuted
+                                                        ? 0
+                                                        : track.volume * masterVolume * (sourceGainsRef.current.get(track.id) ?? 1)
+                                                }
+                                                regionId={regionId}
+                                            />
                                             <div className="text-sm font-medium text-gray-600">
                                                 {Math.round(track.volume * 100)}%
                                             </div>
@@ -1,5 +1,6 @@
 import React, { useEffect, useRef } from 'react';
-import { createVisualizer } from '../utils/AudioVisualizer';
+import { createVisualizer, drawSpectrumBars } from '../utils/AudioVisualizer';
+import { averageSpectrum, loadAnalysis } from '../utils/audioAnalysis';
 
 interface SpectrumAnalyzerProps {
     analyser: AnalyserNode | null;
@@ -8,6 +9,9 @@ interface SpectrumAnalyzerProps {
     width?: number;
     height?: number;
     className?: string;
+    // Track whose precomputed spectrum is shown while there is no live analyser
+    previewUrl?: string;
+    regionId?: string; // shard to look the track up in first
 }
 
 const SpectrumAnalyzer: React.FC<SpectrumAnalyzerProps> = ({
@@ -17,6 +21,8 @@ const SpectrumAnalyzer: React.FC<SpectrumAnalyzerProps> = ({
     width = 400,
     height = 100,
     className = '',
+    previewUrl,
+    regionId,
 }) => {
     const canvasRef = useRef<HTMLCanvasElement>(null);
     const visualizerRef = useRef<ReturnType<typeof createVisualizer> | null>(null);
@@ -33,6 +39,24 @@ const SpectrumAnalyzer: React.FC<SpectrumAnalyzerProps> = ({
         };
     }, [analyser, barCount, colorScheme]);
 
+    // Static preview from the offline analysis until audio is running
+    useEffect(() => {
+        if (analyser || !previewUrl) return;
+        let cancelled = false;
+
+        loadAnalysis(previewUrl, regionId).then((analysis) => {
+            const canvas = canvasRef.current;
+            const ctx = canvas?.getContext('2d');
+            if (cancelled || !analysis || !canvas || !ctx) return;
+            ctx.clearRect(0, 0, canvas.width, canvas.height);
+            drawSpectrumBars(ctx, canvas, averageSpectrum(analysis, barCount), colorScheme);
+        });
+
+        return () => {
+            cancelled = true;
+        };
+    }, [analyser, previewUrl, regionId, barCount, colorScheme]);
+
     return (
         <canvas
             ref={canvasRef}
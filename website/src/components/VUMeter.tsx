@@ -1,5 +1,6 @@
 import React, { useEffect, useState, useRef } from 'react';
 import { createVisualizer } from '../utils/AudioVisualizer';
+import { levelAt, loadAnalysis, type AudioAnalysis } from '../utils/audioAnalysis';
 
 interface VUMeterProps {
     analyser: AnalyserNode | null;
@@ -7,6 +8,11 @@ interface VUMeterProps {
     width?: number;
     height?: number;
     className?: string;
+    // With both set, the meter follows this track's precomputed envelope instead of the analyser
+    audioUrl?: string;
+    getTime?: () => number | null; // playback position in seconds, null while stopped
+    gain?: number;
+    regionId?: string; // shard to look the track up in first
 }
 
 const VUMeter: React.FC<VUMeterProps> = ({
@@ -15,6 +21,10 @@ const VUMeter: React.FC<VUMeterProps> = ({
     width = 20,
     height = 100,
     className = '',
+    audioUrl,
+    getTime,
+    gain = 1,
+    regionId,
 }) => {
     const [level, setLevel] = useState(0);
     const [peak, setPeak] = useState(0);
@@ -22,16 +32,46 @@ const VUMeter: React.FC<VUMeterProps> = ({
     const animationRef = useRef<number | null>(null);
     const peakHoldRef = useRef<number>(0);
     const peakDecayRef = useRef<number>(0);
+    const [analysis, setAnalysis] = useState<AudioAnalysis | null>(null);
+    const getTimeRef = useRef(getTime);
+    const gainRef = useRef(gain);
+    const hasClock = getTime !== undefined;
 
     useEffect(() => {
-        if (!analyser) return;
+        getTimeRef.current = getTime;
+        gainRef.current = gain;
+    });
 
-        visualizerRef.current = createVisualizer(analyser);
+    useEffect(() => {
+        if (!audioUrl) {
+            setAnalysis(null);
+            return;
+        }
+        let cancelled = false;
+        loadAnalysis(audioUrl, regionId).then((result) => {
+            if (!cancelled) setAnalysis(result);
+        });
+        return () => {
+            cancelled = true;
+        };
+    }, [audioUrl, regionId]);
 
-        const updateMeter = () => {
-            if (!visualizerRef.current) return;
+    useEffect(() => {
+        const envelope = hasClock ? analysis : null;
+        if (!analyser && !envelope) return;
 
-            const currentLevel = visualizerRef.current.getPeakLevel();
+        visualizerRef.current = !envelope && analyser ? createVisualizer(analyser) : null;
+
+        const readLevel = (): number => {
+            if (envelope) {
+                const time = getTimeRef.current?.() ?? null;
+                return time === null ? 0 : Math.min(1, levelAt(envelope, time).peak * gainRef.current);
+            }
+            return visualizerRef.current?.getPeakLevel() ?? 0;
+        };
+
+        const updateMeter = () => {
+            const currentLevel = readLevel();
             setLevel(currentLevel);
 
             // Peak hold logic
@@ -57,7 +97,7 @@ const VUMeter: React.FC<VUMeterProps> = ({
             }
             visualizerRef.current?.dispose();
         };
-    }, [analyser]);
+    }, [analyser, analysis, hasClock]);
 
     const getColor = (value: number): string => {
         if (value < 0.6) return '#22c55e'; // Green
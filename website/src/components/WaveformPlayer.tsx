@@ -1,6 +1,8 @@
 import React, { useEffect, useRef, useState } from 'react';
 import WaveSurfer from 'wavesurfer.js';
 import { Play, Pause, Volume2, VolumeX, RotateCcw, Gauge, AlertCircle, Music } from 'lucide-react';
+import { findAudioEntry } from '../utils/assetManifest';
+import { loadPeaks } from '../utils/waveformPeaks';
 
 interface WaveformPlayerProps {
   audioUrl: string;
@@ -11,6 +13,7 @@ interface WaveformPlayerProps {
   height?: number;
   waveColor?: string;
   progressColor?: string;
+  regionId?: string;
 }
 
 const WaveformPlayer: React.FC<WaveformPlayerProps> = ({
@@ -22,6 +25,7 @@ const WaveformPlayer: React.FC<WaveformPlayerProps> = ({
   height = 80,
   waveColor = '#94a3b8',
   progressColor = '#f97316',
+  regionId,
 }) => {
   const waveformRef = useRef<HTMLDivElement>(null);
   const wavesurferRef = useRef<WaveSurfer | null>(null);
@@ -38,38 +42,17 @@ const WaveformPlayer: React.FC<WaveformPlayerProps> = ({
   // Check audio manifest
   useEffect(() => {
     const checkManifest = async () => {
-      try {
-        const response = await fetch('/audio/manifest.json');
-        if (response.ok) {
-          const manifest = await response.json();
-          const audioName = audioUrl.split('/').pop() || '';
-          
-          if (!audioName) return;
-
-          // Check all sections and explicitly check for true
-          const isPlaceholder = 
-            (manifest.audio?.ambient?.[audioName]?.isPlaceholder === true) ||
-            (manifest.audio?.instruments?.[audioName]?.isPlaceholder === true) ||
-            (manifest.audio?.ensembles?.[audioName]?.isPlaceholder === true) ||
-            (manifest.audio?.samples?.[audioName]?.isPlaceholder === true);
-          
-          if (isPlaceholder) {
-            console.warn('Audio marked as placeholder:', audioName);
-            setHasError(true);
-            setErrorMessage('Audio file not available');
-            setIsLoading(false);
-            return;
-          }
-          
-          console.log('Audio file check passed:', audioName);
-        }
-      } catch (error) {
-        console.warn('Manifest check failed:', error);
+      const entry = await findAudioEntry(audioUrl, regionId);
+      if (entry?.isPlaceholder === true) {
+        console.warn('Audio marked as placeholder:', audioUrl);
+        setHasError(true);
+        setErrorMessage('Audio file not available');
+        setIsLoading(false);
       }
     };
 
     checkManifest();
-  }, [audioUrl]);
+  }, [audioUrl, regionId]);
 
   useEffect(() => {
     if (!waveformRef.current || hasError) return;
@@ -138,8 +121,18 @@ const WaveformPlayer: React.FC<WaveformPlayerProps> = ({
           setIsLoading(false);
         });
 
+        // Precomputed peaks draw the waveform without downloading and decoding the audio first
+        const entry = await findAudioEntry(audioUrl, regionId);
+        const bars = Math.ceil((waveformRef.current?.clientWidth || 0) / 4); // barWidth + barGap
+        const peaks = entry?.peaks && entry.duration ? await loadPeaks(entry.peaks, bars) : null;
+        if (destroyed) return;
+
         // Load audio
-        await ws.load(audioUrl);
+        if (peaks) {
+          await ws.load(audioUrl, [peaks], entry!.duration);
+        } else {
+          await ws.load(audioUrl);
+        }
       } catch (error) {
         if (destroyed) return;
         console.error('WaveSurfer initialization error:', error);
@@ -164,7 +157,7 @@ const WaveformPlayer: React.FC<WaveformPlayerProps> = ({
         }
       }
     };
-  }, [audioUrl, height, waveColor, progressColor]);
+  }, [audioUrl, regionId, height, waveColor, progressColor]);
 
   useEffect(() => {
     if (wavesurferRef.current) {
@@ -78,46 +78,17 @@ export class AudioVisualizer {
 
             this.analyser.getByteFrequencyData(this.dataArray as Uint8Array<ArrayBuffer>);
 
-            // Clear canvas
-            ctx.fillStyle = 'rgba(0, 0, 0, 0.1)';
-            ctx.fillRect(0, 0, canvas.width, canvas.height);
-
-            const barWidth = canvas.width / barCount;
             const binSize = Math.floor(this.bufferLength / barCount);
-
-            for (let i = 0; i < barCount; i++) {
+            const levels = Array.from({ length: barCount }, (_, i) => {
                 // Average frequency data for this bar
                 let sum = 0;
                 for (let j = 0; j < binSize; j++) {
                     sum += this.dataArray[i * binSize + j];
                 }
-                const barHeight = (sum / binSize / 255) * canvas.height;
-
-                // Color based on frequency range
-                if (colorScheme === 'frequency') {
-                    if (i < barCount / 3) {
-                        // Bass - Red
-                        ctx.fillStyle = `rgba(239, 68, 68, ${0.6 + barHeight / canvas.height * 0.4})`;
-                    } else if (i < (barCount * 2) / 3) {
-                        // Mid - Green
-                        ctx.fillStyle = `rgba(34, 197, 94, ${0.6 + barHeight / canvas.height * 0.4})`;
-                    } else {
-                        // Treble - Blue
-                        ctx.fillStyle = `rgba(59, 130, 246, ${0.6 + barHeight / canvas.height * 0.4})`;
-                    }
-                } else {
-                    // Gradient
-                    const hue = (i / barCount) * 360;
-                    ctx.fillStyle = `hsla(${hue}, 80%, 60%, ${0.6 + barHeight / canvas.height * 0.4})`;
-                }
+                return sum / binSize / 255;
+            });
 
-                ctx.fillRect(
-                    i * barWidth,
-                    canvas.height - barHeight,
-                    barWidth - 1,
-                    barHeight
-                );
-            }
+            drawSpectrumBars(ctx, canvas, levels, colorScheme);
         };
 
         draw();
@@ -173,6 +144,53 @@ export class AudioVisualizer {
     }
 }
 
+/**
+ * Draw one frame of spectrum bars, one per level (0-1), low frequencies first
+ */
+export function drawSpectrumBars(
+    ctx: CanvasRenderingContext2D,
+    canvas: HTMLCanvasElement,
+    levels: number[],
+    colorScheme: 'gradient' | 'frequency' = 'frequency'
+): void {
+    const barCount = levels.length;
+
+    // Clear canvas
+    ctx.fillStyle = 'rgba(0, 0, 0, 0.1)';
+    ctx.fillRect(0, 0, canvas.width, canvas.height);
+
+    const barWidth = canvas.width / barCount;
+
+    for (let i = 0; i < barCount; i++) {
+        const barHeight = levels[i] * canvas.height;
+
+        // Color based on frequency range
+        if (colorScheme === 'frequency') {
+            if (i < barCount / 3) {
+                // Bass - Red
+                ctx.fillStyle = `rgba(239, 68, 68, ${0.6 + barHeight / canvas.height * 0.4})`;
+            } else if (i < (barCount * 2) / 3) {
+                // Mid - Green
+                ctx.fillStyle = `rgba(34, 197, 94, ${0.6 + barHeight / canvas.height * 0.4})`;
+            } else {
+                // Treble - Blue
+                ctx.fillStyle = `rgba(59, 130, 246, ${0.6 + barHeight / canvas.height * 0.4})`;
+            }
+        } else {
+            // Gradient
+            const hue = (i / barCount) * 360;
+            ctx.fillStyle = `hsla(${hue}, 80%, 60%, ${0.6 + barHeight / canvas.height * 0.4})`;
+        }
+
+        ctx.fillRect(
+            i * barWidth,
+            canvas.height - barHeight,
+            barWidth - 1,
+            barHeight
+        );
+    }
+}
+
 /**
  * Create a visualizer from an AnalyserNode
  */
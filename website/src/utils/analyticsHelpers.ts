@@ -1,10 +1,13 @@
 /**
  * Analytics Helper Functions
- * Utilities for generating analytics data from the musical regions database
+ * Utilities for generating analytics data from the musical regions database.
+ * Once loadAnalyticsAggregates() has fetched the aggregates precomputed by
+ * scripts/analytics_aggregates.py, every getter returns those instead of
+ * recomputing from musicalRegions
  */
 
 import { musicalRegions } from '../data/regions.ts';
-
+import { loadDerived } from './dataCatalogue';
 
 export interface RegionDistribution {
   name: string;
@@ -38,10 +41,80 @@ export interface SocialContextData {
   patronageTypes: { type: string; count: number }[];
 }
 
+// Regions counted by two facets: counts[row][column]
+export interface CrossTab<R = string, C = string> {
+  rows: R[];
+  columns: C[];
+  counts: number[][];
+}
+
+export interface InstrumentPair {
+  instruments: [string, string];
+  count: number;
+  regions: string[];
+}
+
+export interface AnalyticsAggregates {
+  regional: RegionDistribution[];
+  genres: GenreData[];
+  instruments: InstrumentData[];
+  tempos: TempoData[];
+  socialContext: SocialContextData;
+  vocalStyles: { style: string; count: number }[];
+  linguistics: { family: string; count: number; regions: string[] }[];
+  scales: { scale: string; count: number }[];
+  summary: {
+    totalRegions: number;
+    totalInstruments: number;
+    totalLanguages: number;
+    totalCommunities: number;
+    hereditaryTraditions: number;
+  };
+  crossTabs: {
+    familyByTempo: CrossTab;
+    scaleByFamily: CrossTab;
+    familyByHereditary: CrossTab<string, boolean>;
+  };
+  instrumentPairs: InstrumentPair[];
+}
+
+let aggregates: AnalyticsAggregates | null = null;
+let aggregatesPromise: Promise<AnalyticsAggregates | null> | null = null;
+
+/**
+ * Fetch the precomputed aggregates once; resolves to null (and the getters
+ * keep computing from musicalRegions) when the catalogue has not been built
+ */
+export function loadAnalyticsAggregates(): Promise<AnalyticsAggregates | null> {
+  if (!aggregatesPromise) {
+    aggregatesPromise = loadDerived<AnalyticsAggregates>('analytics').then(loaded => {
+      aggregates = loaded;
+      return loaded;
+    });
+  }
+  return aggregatesPromise;
+}
+
+/**
+ * Cross-tabulations of the region facets; only available precomputed
+ */
+export function getCrossTabs(): AnalyticsAggregates['crossTabs'] | null {
+  return aggregates?.crossTabs ?? null;
+}
+
+/**
+ * Instruments most often played in the same regions; only available precomputed
+ */
+export function getInstrumentPairs(): InstrumentPair[] {
+  return aggregates?.instrumentPairs ?? [];
+}
+
 /**
  * Get regional distribution data for pie/bar charts
  */
 export function getRegionalDistribution(): RegionDistribution[] {
+  if (aggregates) return aggregates.regional;
+
   return musicalRegions.map(region => ({
     name: region.name,
     value: 1, // Each region counts as 1 for distribution
@@ -53,6 +126,8 @@ export function getRegionalDistribution(): RegionDistribution[] {
  * Extract and count unique genres/traditions across all regions
  */
 export function getGenreDistribution(): GenreData[] {
+  if (aggregates) return aggregates.genres;
+
   const genreMap = new Map<string, Set<string>>();
 
   musicalRegions.forEach(region => {
@@ -84,6 +159,8 @@ export function getGenreDistribution(): GenreData[] {
  * Get instrument popularity across regions
  */
 export function getInstrumentDistribution(): InstrumentData[] {
+  if (aggregates) return aggregates.instruments;
+
   const instrumentMap = new Map<string, { regions: Set<string>; category: 'melodic' | 'rhythmic' | 'unique' }>();
 
   musicalRegions.forEach(region => {
@@ -127,6 +204,8 @@ export function getInstrumentDistribution(): InstrumentData[] {
  * Get tempo distribution across regions
  */
 export function getTempoDistribution(): TempoData[] {
+  if (aggregates) return aggregates.tempos;
+
   const tempoMap = new Map<string, Set<string>>();
 
   musicalRegions.forEach(region => {
@@ -150,6 +229,8 @@ export function getTempoDistribution(): TempoData[] {
  * Get social context statistics
  */
 export function getSocialContextStats(): SocialContextData {
+  if (aggregates) return aggregates.socialContext;
+
   let hereditaryCount = 0;
   let nonHereditaryCount = 0;
   const casteMap = new Map<string, number>();
@@ -202,6 +283,8 @@ export function getSocialContextStats(): SocialContextData {
  * Get vocal style distribution
  */
 export function getVocalStyleDistribution() {
+  if (aggregates) return aggregates.vocalStyles;
+
   const styleMap = new Map<string, number>();
 
   musicalRegions.forEach(region => {
@@ -220,6 +303,8 @@ export function getVocalStyleDistribution() {
  * Get linguistic family distribution
  */
 export function getLinguisticDistribution() {
+  if (aggregates) return aggregates.linguistics;
+
   const familyMap = new Map<string, Set<string>>();
 
   musicalRegions.forEach(region => {
@@ -243,6 +328,8 @@ export function getLinguisticDistribution() {
  * Get scale type distribution
  */
 export function getScaleDistribution() {
+  if (aggregates) return aggregates.scales;
+
   const scaleMap = new Map<string, number>();
 
   musicalRegions.forEach(region => {
@@ -259,6 +346,8 @@ export function getScaleDistribution() {
  * Get comprehensive statistics summary
  */
 export function getStatisticsSummary() {
+  if (aggregates) return aggregates.summary;
+
   const totalRegions = musicalRegions.length;
   const allInstruments = new Set<string>();
   const allLanguages = new Set<string>();
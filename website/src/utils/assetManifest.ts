@@ -0,0 +1,344 @@
+/**
+ * Asset Manifest Lookup
+ * Reads the per-region manifest shards written by scripts/manifest_shards.py.
+ * The small index is fetched once per page; shards have content-hashed names,
+ * so each is fetched at most once and cached by the browser indefinitely.
+ * Where the shards have not been generated (they are not part of the
+ * repository or the npm build) the two full manifests are read instead
+ */
+
+export interface ImageVariant {
+  width: number;
+  height: number;
+  bytes: number;
+  path: string;
+}
+
+export interface ImageManifestEntry {
+  exists: boolean;
+  path: string;
+  type?: string;
+  isPlaceholder?: boolean;
+  width?: number;
+  height?: number;
+  dominantColor?: string;
+  lqip?: string;
+  variants?: Record<string, ImageVariant[]>;
+  duplicateOf?: string;
+}
+
+// One resolution of the waveform peaks written by scripts/build-audio-peaks.py
+export interface PeakLevel {
+  samplesPerPeak: number;
+  length: number;
+  bytes: number;
+  path: string;
+}
+
+export interface PeakSet {
+  sampleRate: number;
+  bits: number;
+  levels: PeakLevel[];
+}
+
+// Spectrogram thumbnail and level envelope written by scripts/build-audio-analysis.py
+export interface AnalysisInfo {
+  path: string;
+  bytes: number;
+  melBands: number;
+  columns: number;
+  envelopeRate: number;
+  envelopeLength: number;
+  rmsLevel: number;
+  peakLevel: number;
+}
+
+// Loudness-normalized encodes written by scripts/build-audio-renditions.py
+export interface AudioRendition {
+  format: string;
+  mime: string;
+  bitrate: number;
+  bytes: number;
+  path: string;
+}
+
+export interface LoudnessInfo {
+  integrated: number | null;
+  truePeak: number | null;
+  lra: number | null;
+  target: number;
+  gainDb: number;
+}
+
+// Frame-aligned byte ranges of the original MP3, written by scripts/build-audio-segments.py
+export interface AudioSegment {
+  offset: number;
+  length: number;
+  time: number;
+  duration: number;
+}
+
+export interface SegmentInfo {
+  sha256: string;
+  segmentDuration: number;
+  mime: string;
+  media: string;
+  playlist: string;
+  playlistBytes: number;
+  index: AudioSegment[];
+}
+
+// Seamless mixer loop written by scripts/build-audio-loops.py; samples count
+// from the start of the decoded recording
+export interface LoopInfo {
+  path: string;
+  bytes: number;
+  sampleRate: number;
+  channels: number;
+  startSample: number;
+  endSample: number;
+  mode: 'beat' | 'texture';
+  tempo: number | null;
+  beats: number;
+  crossfadeSamples: number;
+  gainDb: number;
+}
+
+export interface AudioManifestEntry {
+  exists: boolean;
+  path: string;
+  category?: string;
+  isPlaceholder?: boolean;
+  fallbackPath?: string;
+  duration?: number;
+  peaks?: PeakSet;
+  analysis?: AnalysisInfo;
+  loudness?: LoudnessInfo;
+  renditions?: AudioRendition[];
+  segments?: SegmentInfo;
+  loop?: LoopInfo;
+}
+
+// A region's mixer loops packed into one file by scripts/build-audio-sprites.py;
+// start and duration are in milliseconds, sourceOffset in seconds, gainDb is
+// the loop's normalization gain
+export interface SpriteStem {
+  startSample: number;
+  lengthSamples: number;
+  start: number;
+  duration: number;
+  source: string;
+  loop: string;
+  sourceOffset: number;
+  gainDb: number;
+}
+
+export interface AudioSprite {
+  path: string;
+  bytes: number;
+  sampleRate: number;
+  channels: number;
+  gapSeconds: number;
+  stems: Record<string, SpriteStem>;
+}
+
+export interface ManifestShard {
+  region: string | null;
+  images: Record<string, ImageManifestEntry>;
+  audio: Record<string, AudioManifestEntry>;
+  sprite?: AudioSprite;
+}
+
+interface ManifestIndex {
+  version: string;
+  shared: string;
+  regions: Record<string, string>;
+}
+
+// The full manifests as written by scripts/manifest_engine.py
+interface ImageManifest {
+  images: Record<string, ImageManifestEntry>;
+}
+
+interface AudioManifest {
+  audio: Record<string, Record<string, AudioManifestEntry>>;
+  sprites?: Record<string, AudioSprite>;
+}
+
+interface WholeManifests {
+  shard: ManifestShard;
+  sprites: Record<string, AudioSprite>;
+}
+
+const INDEX_URL = '/manifests/index.json';
+const IMAGE_MANIFEST_URL = '/images/manifest.json';
+const AUDIO_MANIFEST_URL = '/audio/manifest.json';
+// Category of the files in public/audio itself (AUDIO_ROOT_CATEGORY in scripts/asset_keys.py)
+const AUDIO_ROOT_CATEGORY = 'samples';
+
+let indexPromise: Promise<ManifestIndex | null> | null = null;
+let wholePromise: Promise<WholeManifests> | null = null;
+const shardPromises = new Map<string, Promise<ManifestShard | null>>();
+
+async function fetchJson<T>(url: string): Promise<T | null> {
+  try {
+    const response = await fetch(url);
+    return response.ok ? ((await response.json()) as T) : null;
+  } catch (error) {
+    console.warn('Manifest fetch failed:', url, error);
+    return null;
+  }
+}
+
+function loadIndex(): Promise<ManifestIndex | null> {
+  if (!indexPromise) {
+    indexPromise = fetchJson<ManifestIndex>(INDEX_URL);
+  }
+  return indexPromise;
+}
+
+/**
+ * Both full manifests as one shard holding every asset, keyed the way
+ * manifest_shards.py keys a shard, plus the audio manifest's sprites
+ */
+function loadWholeManifests(): Promise<WholeManifests> {
+  if (!wholePromise) {
+    wholePromise = Promise.all([
+      fetchJson<ImageManifest>(IMAGE_MANIFEST_URL),
+      fetchJson<AudioManifest>(AUDIO_MANIFEST_URL),
+    ]).then(([images, audio]) => {
+      const shard: ManifestShard = { region: null, images: images?.images ?? {}, audio: {} };
+      Object.entries(audio?.audio ?? {}).forEach(([category, entries]) => {
+        Object.entries(entries).forEach(([name, entry]) => {
+          const key = category === AUDIO_ROOT_CATEGORY ? name : `${category}/${name}`;
+          shard.audio[key] = { ...entry, category };
+        });
+      });
+      return { shard, sprites: audio?.sprites ?? {} };
+    });
+  }
+  return wholePromise;
+}
+
+function loadShard(url: string): Promise<ManifestShard | null> {
+  let promise = shardPromises.get(url);
+  if (!promise) {
+    promise = fetchJson<ManifestShard>(url);
+    shardPromises.set(url, promise);
+  }
+  return promise;
+}
+
+/**
+ * Shards to search for an asset: the region's own shard first (when known),
+ * then the shared shard for assets no region references; without an index,
+ * the full manifests
+ */
+async function shardsFor(regionId?: string): Promise<ManifestShard[]> {
+  const index = await loadIndex();
+  if (!index) return [(await loadWholeManifests()).shard];
+  const urls = [regionId && index.regions[regionId], index.shared].filter(Boolean) as string[];
+  const shards = await Promise.all(urls.map(loadShard));
+  return shards.filter((shard): shard is ManifestShard => shard !== null);
+}
+
+const fileName = (url: string) => url.split('/').pop() || '';
+// Path part of a URL, as manifest entries store it: no origin, query or hash
+const urlPath = (url: string) => url.replace(/^[a-z][a-z0-9+.-]*:\/\/[^/]+/i, '').split(/[?#]/)[0];
+
+/**
+ * Manifest entry for an image URL, or null when the manifest does not list it.
+ * Entries are matched on their path, so same-named images in different
+ * directories stay apart; the filename is only a fallback. Also returns the
+ * shard so callers can resolve duplicateOf within it
+ */
+export async function findImageEntry(
+  src: string,
+  regionId?: string
+): Promise<{ entry: ImageManifestEntry; shard: ManifestShard } | null> {
+  const path = urlPath(src);
+  const shards = await shardsFor(regionId);
+  for (const shard of shards) {
+    const entry = Object.values(shard.images).find((image) => image.path === path);
+    if (entry) return { entry, shard };
+  }
+  const name = fileName(path);
+  for (const shard of shards) {
+    if (shard.images[name]) return { entry: shard.images[name], shard };
+  }
+  return null;
+}
+
+/**
+ * Manifest entry for an audio URL, or null when the manifest does not list it.
+ * Matched on path first, like findImageEntry
+ */
+export async function findAudioEntry(audioUrl: string, regionId?: string): Promise<AudioManifestEntry | null> {
+  const path = urlPath(audioUrl);
+  const shards = await shardsFor(regionId);
+  for (const shard of shards) {
+    // Stand-ins are requested by their own path, e.g. ambient .wav beds of missing .mp3s
+    const entry = Object.values(shard.audio).find(
+      (audio) => audio.path === path || audio.fallbackPath === path
+    );
+    if (entry) return entry;
+  }
+  // Audio is keyed by its path below /audio/, so the filename is compared, not looked up
+  const name = fileName(path);
+  for (const shard of shards) {
+    const entry = Object.values(shard.audio).find(
+      (audio) => fileName(audio.path) === name || (audio.fallbackPath && fileName(audio.fallbackPath) === name)
+    );
+    if (entry) return entry;
+  }
+  return null;
+}
+
+/**
+ * URLs to try for an audio file: its normalized renditions the browser can
+ * play, preferred first, then the original
+ */
+export async function audioSources(audioUrl: string, regionId?: string): Promise<string[]> {
+  const entry = await findAudioEntry(audioUrl, regionId);
+  if (!entry?.renditions || typeof Audio === 'undefined') return [audioUrl];
+  const probe = new Audio();
+  const playable = entry.renditions.filter((rendition) => probe.canPlayType(rendition.mime) !== '');
+  return [...playable.map((rendition) => rendition.path), audioUrl];
+}
+
+/**
+ * What the soundscape mixer loops for a stem: its seamless loop when the
+ * manifest has one, else the same sources as audioSources. offset is where
+ * the loop starts in the original recording, in seconds; gainDb is the
+ * normalization gain baked into the first source (0 for the original)
+ */
+export async function loopSources(
+  audioUrl: string,
+  regionId?: string
+): Promise<{ src: string[]; offset: number; gainDb: number }> {
+  const entry = await findAudioEntry(audioUrl, regionId);
+  if (entry?.loop) {
+    return { src: [entry.loop.path], offset: entry.loop.startSample / entry.loop.sampleRate, gainDb: entry.loop.gainDb };
+  }
+  const src = await audioSources(audioUrl, regionId);
+  return { src, offset: 0, gainDb: src[0] !== audioUrl ? entry?.loudness?.gainDb ?? 0 : 0 };
+}
+
+/**
+ * The region's audio sprite of mixer loops, or null when it has none
+ */
+export async function findSprite(regionId: string): Promise<AudioSprite | null> {
+  const index = await loadIndex();
+  if (!index) return (await loadWholeManifests()).sprites[regionId] ?? null;
+  const url = index.regions[regionId];
+  if (!url) return null;
+  return (await loadShard(url))?.sprite ?? null;
+}
+
+/**
+ * Key of an audio URL's stem within a sprite, or null when it is not packed there
+ */
+export function spriteStemKey(sprite: AudioSprite, audioUrl: string): string | null {
+  const name = fileName(audioUrl);
+  return sprite.stems[name] ? name : null;
+}
@@ -0,0 +1,102 @@
+/**
+ * Audio Analysis Previews
+ * Loads the spectrogram thumbnails and level envelopes listed in the audio
+ * manifest, so spectrum and level displays work before audio is decoded
+ */
+
+import { findAudioEntry } from './assetManifest';
+
+export interface AudioAnalysis {
+  melBands: number;
+  columns: number;
+  spectrogram: Uint8Array; // columns x melBands, 255 = loudest cell of the track
+  envelopeRate: number; // envelope values per second
+  rms: Uint8Array; // 255 = full scale
+  peak: Uint8Array;
+}
+
+const HEADER_BYTES = 24;
+const MAGIC = 'AFP1';
+
+const analysisCache = new Map<string, Promise<AudioAnalysis | null>>();
+
+async function gunzip(buffer: ArrayBuffer): Promise<ArrayBuffer> {
+  const bytes = new Uint8Array(buffer);
+  // Servers that label .gz files with Content-Encoding hand over the bytes already inflated
+  if (bytes[0] !== 0x1f || bytes[1] !== 0x8b) return buffer;
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+  return new Response(stream).arrayBuffer();
+}
+
+/**
+ * Parse a decompressed analysis sidecar (layout in scripts/audio_analysis.py)
+ */
+export function parseAnalysis(buffer: ArrayBuffer): AudioAnalysis {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (buffer.byteLength < HEADER_BYTES || magic !== MAGIC) {
+    throw new Error('Unsupported analysis file');
+  }
+  const melBands = view.getUint16(4, true);
+  const columns = view.getUint16(6, true);
+  const length = view.getUint32(8, true);
+  const cells = melBands * columns;
+  return {
+    melBands,
+    columns,
+    spectrogram: new Uint8Array(buffer, HEADER_BYTES, cells),
+    envelopeRate: view.getFloat32(12, true),
+    rms: new Uint8Array(buffer, HEADER_BYTES + cells, length),
+    peak: new Uint8Array(buffer, HEADER_BYTES + cells + length, length),
+  };
+}
+
+/**
+ * Analysis of an audio URL, fetched once per page; null when the manifest has none
+ */
+export function loadAnalysis(audioUrl: string, regionId?: string): Promise<AudioAnalysis | null> {
+  let promise = analysisCache.get(audioUrl);
+  if (!promise) {
+    promise = (async () => {
+      const entry = await findAudioEntry(audioUrl, regionId);
+      if (!entry?.analysis || entry.isPlaceholder) return null;
+      try {
+        const response = await fetch(entry.analysis.path);
+        if (!response.ok) return null;
+        return parseAnalysis(await gunzip(await response.arrayBuffer()));
+      } catch (error) {
+        console.warn('Analysis fetch failed:', entry.analysis.path, error);
+        return null;
+      }
+    })();
+    analysisCache.set(audioUrl, promise);
+  }
+  return promise;
+}
+
+/**
+ * Time-averaged spectrum resampled to barCount bars, each 0-1
+ */
+export function averageSpectrum(analysis: AudioAnalysis, barCount: number): number[] {
+  const { melBands, columns, spectrogram } = analysis;
+  const bands = new Array<number>(melBands).fill(0);
+  for (let column = 0; column < columns; column++) {
+    for (let band = 0; band < melBands; band++) {
+      bands[band] += spectrogram[column * melBands + band];
+    }
+  }
+  return Array.from({ length: barCount }, (_, bar) => {
+    const band = Math.min(melBands - 1, Math.floor((bar / barCount) * melBands));
+    return columns ? bands[band] / columns / 255 : 0;
+  });
+}
+
+/**
+ * RMS and peak (0-1) at a playback position in seconds, measured on the
+ * original recording before any normalization gain
+ */
+export function levelAt(analysis: AudioAnalysis, seconds: number): { rms: number; peak: number } {
+  const index = Math.floor(seconds * analysis.envelopeRate);
+  if (index < 0 || index >= analysis.rms.length) return { rms: 0, peak: 0 };
+  return { rms: analysis.rms[index] / 255, peak: analysis.peak[index] / 255 };
+}
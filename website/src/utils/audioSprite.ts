@@ -0,0 +1,107 @@
+/**
+ * Audio Sprite Voices
+ * A region's mixer loops arrive as one sprite (scripts/build-audio-sprites.py)
+ * decoded into a single Howl. A SpriteVoice loops one stem of it and offers
+ * the part of the Howl API the mixer drives, so a track can own a file or
+ * share a sprite without the mixer telling the two apart
+ */
+
+import { Howl } from 'howler';
+import type { AudioSprite } from './assetManifest';
+
+// What the mixer calls on a track's player; Howl satisfies it too
+export interface MixerVoice {
+  play(): unknown;
+  pause(): unknown;
+  stop(): unknown;
+  volume(volume: number): unknown;
+  stereo(pan: number): unknown;
+  playing(): boolean;
+  seek(): number;
+  unload(): void;
+}
+
+interface SpriteSheetOptions {
+  onload?: () => void;
+  onloaderror?: (error: unknown) => void;
+}
+
+/**
+ * One Howl for a whole sprite, every stem a looping slice of it
+ */
+export function loadSpriteSheet(sprite: AudioSprite, options: SpriteSheetOptions = {}): Howl {
+  const slices: Record<string, [number, number, boolean]> = {};
+  Object.entries(sprite.stems).forEach(([key, stem]) => {
+    slices[key] = [stem.start, stem.duration, true];
+  });
+  return new Howl({
+    src: [sprite.path],
+    sprite: slices,
+    onload: options.onload,
+    onloaderror: (_id, error) => options.onloaderror?.(error),
+  });
+}
+
+/**
+ * One stem of a sprite sheet. Volume and pan set before the first play are
+ * applied when the sound starts; seek() is the position within the stem
+ */
+export class SpriteVoice implements MixerVoice {
+  private id: number | null = null;
+  private level: number;
+  private pan = 0;
+  private readonly sheet: Howl;
+  private readonly key: string;
+  private readonly start: number;
+
+  constructor(sheet: Howl, sprite: AudioSprite, key: string, volume: number) {
+    this.sheet = sheet;
+    this.key = key;
+    this.start = sprite.stems[key].start / 1000;
+    this.level = volume;
+  }
+
+  play() {
+    if (this.id !== null && this.sheet.playing(this.id)) return this;
+    this.id = this.sheet.play(this.id ?? this.key);
+    this.sheet.volume(this.level, this.id);
+    if (this.pan !== 0) this.sheet.stereo(this.pan, this.id);
+    return this;
+  }
+
+  pause() {
+    if (this.id !== null) this.sheet.pause(this.id);
+    return this;
+  }
+
+  stop() {
+    if (this.id !== null) this.sheet.stop(this.id);
+    return this;
+  }
+
+  volume(volume: number) {
+    this.level = volume;
+    if (this.id !== null) this.sheet.volume(volume, this.id);
+    return this;
+  }
+
+  stereo(pan: number) {
+    this.pan = pan;
+    if (this.id !== null) this.sheet.stereo(pan, this.id);
+    return this;
+  }
+
+  playing() {
+    return this.id !== null && this.sheet.playing(this.id);
+  }
+
+  seek() {
+    return this.id === null ? 0 : this.sheet.seek(this.id) - this.start;
+  }
+
+  // The sheet itself belongs to whoever loaded it
+  unload() {
+    this.stop();
+    this.id = null;
+  }
+}
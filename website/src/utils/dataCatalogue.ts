@@ -0,0 +1,116 @@
+/**
+ * Data Catalogue
+ * Loads the normalized catalogue written by scripts/build-data-catalogue.py
+ * instead of bundling src/data into the page. The small catalogue.json is
+ * fetched once; tables and region bundles have content-hashed names, so each
+ * is fetched at most once and cached by the browser indefinitely
+ */
+
+import type { InstrumentTrack, MusicalNews, MusicalRegion, RegionalArtist } from '../types/music';
+import type { TimelineEvent } from '../data/musicalTimeline';
+import type { EducationalTopic } from '../data/educationalContent';
+
+// A region row: its instrumentTracks live in the tracks table
+export type CatalogueRegion = Omit<MusicalRegion, 'instrumentTracks'> & { trackIds: string[] };
+
+export interface CatalogueTables {
+  regions: CatalogueRegion;
+  tracks: InstrumentTrack;
+  artists: RegionalArtist;
+  news: MusicalNews;
+  timeline: TimelineEvent;
+  topics: EducationalTopic;
+}
+
+export type CatalogueTable = keyof CatalogueTables;
+
+export interface CatalogueIndex {
+  version: string;
+  tables: Record<CatalogueTable, { path: string; count: number; bytes: number }>;
+  regions: Record<string, string>;
+  // Files built from the whole catalogue, e.g. the search index
+  derived: Record<string, string>;
+  artistsByRegion: Record<string, string[]>;
+}
+
+// Everything a region's modal and mixer show, in one file
+export interface RegionBundle {
+  region: CatalogueRegion;
+  tracks: InstrumentTrack[];
+  artists: RegionalArtist[];
+  news: MusicalNews[];
+  timeline: TimelineEvent[];
+  topicIds: string[];
+}
+
+const CATALOGUE_URL = '/data/catalogue.json';
+
+let indexPromise: Promise<CatalogueIndex | null> | null = null;
+const filePromises = new Map<string, Promise<unknown>>();
+
+async function fetchJson<T>(url: string): Promise<T | null> {
+  try {
+    const response = await fetch(url);
+    return response.ok ? ((await response.json()) as T) : null;
+  } catch (error) {
+    console.warn('Catalogue fetch failed:', url, error);
+    return null;
+  }
+}
+
+function loadFile<T>(url: string): Promise<T | null> {
+  let promise = filePromises.get(url) as Promise<T | null> | undefined;
+  if (!promise) {
+    promise = fetchJson<T>(url);
+    filePromises.set(url, promise);
+  }
+  return promise;
+}
+
+export function loadCatalogueIndex(): Promise<CatalogueIndex | null> {
+  if (!indexPromise) {
+    indexPromise = fetchJson<CatalogueIndex>(CATALOGUE_URL);
+  }
+  return indexPromise;
+}
+
+/**
+ * All rows of one table, or null when the catalogue has not been built
+ */
+export async function loadTable<T extends CatalogueTable>(table: T): Promise<CatalogueTables[T][] | null> {
+  const index = await loadCatalogueIndex();
+  if (!index?.tables[table]) return null;
+  return loadFile<CatalogueTables[T][]>(index.tables[table].path);
+}
+
+/**
+ * A derived file (see DERIVED in scripts/data_catalogue.py), or null when
+ * the catalogue has not been built
+ */
+export async function loadDerived<T>(name: string): Promise<T | null> {
+  const index = await loadCatalogueIndex();
+  const url = index?.derived?.[name];
+  return url ? loadFile<T>(url) : null;
+}
+
+/**
+ * One region with its tracks, artists, news and timeline, or null when the
+ * catalogue has no bundle for it
+ */
+export async function loadRegionBundle(regionId: string): Promise<RegionBundle | null> {
+  const index = await loadCatalogueIndex();
+  const url = index?.regions[regionId];
+  return url ? loadFile<RegionBundle>(url) : null;
+}
+
+/**
+ * A bundle's region in the shape of src/data/regions.ts, tracks inlined again
+ */
+export function bundleRegion(bundle: RegionBundle): MusicalRegion {
+  const { trackIds, ...region } = bundle.region;
+  const tracks = new Map(bundle.tracks.map((track) => [track.id, track]));
+  return {
+    ...region,
+    instrumentTracks: trackIds.map((id) => tracks.get(id)).filter((t): t is InstrumentTrack => !!t),
+  };
+}
@@ -1,10 +1,15 @@
 /**
  * Search Helper Functions
- * Utilities for advanced search with fuzzy matching and multi-criteria filtering
+ * Utilities for advanced search with fuzzy matching and multi-criteria filtering.
+ * Once loadSearchIndex() has fetched the prebuilt index (scripts/search_index.py),
+ * queries are scored from trigram postings, suggestions come from its prefix
+ * trie and the filter lists from its facets; until then everything is computed
+ * from musicalRegions as before
  */
 
 import { musicalRegions } from '../data/regions.ts';
 import type { MusicalRegion } from '../types/music';
+import { loadDerived } from './dataCatalogue';
 
 export interface SearchFilters {
   query: string;
@@ -23,6 +28,130 @@ export interface SearchResult {
   matchedFields: string[];
 }
 
+export interface SearchFacets {
+  instruments: string[];
+  genres: string[];
+  linguisticFamilies: string[];
+  tempoRanges: string[];
+  scaleTypes: string[];
+}
+
+// A trie node: best term indexes for its prefix, then children by edge
+type TrieNode = [number[], Record<string, TrieNode>];
+
+export interface SearchIndex {
+  docs: string[];
+  fields: [string, number][];
+  minCoverage: number;
+  // trigram -> doc * fields.length + field
+  trigrams: Record<string, number[]>;
+  terms: [string, string][];
+  trie: TrieNode;
+  facets: SearchFacets;
+}
+
+let prebuiltIndex: SearchIndex | null = null;
+let prebuiltIndexPromise: Promise<SearchIndex | null> | null = null;
+let regionsById: Map<string, MusicalRegion> | null = null;
+const facetCache = new Map<keyof SearchFacets, string[]>();
+
+/**
+ * Fetch the prebuilt search index once; resolves to null (and the helpers
+ * keep scanning musicalRegions) when the catalogue has not been built
+ */
+export function loadSearchIndex(): Promise<SearchIndex | null> {
+  if (!prebuiltIndexPromise) {
+    prebuiltIndexPromise = loadDerived<SearchIndex>('search').then(index => {
+      prebuiltIndex = index;
+      return index;
+    });
+  }
+  return prebuiltIndexPromise;
+}
+
+// Must match normalize() in scripts/search_index.py
+function normalize(text: string): string {
+  return text.toLowerCase().replace(/[^0-9a-z\u00c0-\uffff]+/g, ' ').trim();
+}
+
+/**
+ * Distinct trigrams of the query's words, padded with spaces; the last word
+ * may still be being typed, so it is only padded in front
+ */
+function queryTrigrams(query: string): Set<string> {
+  const words = normalize(query).split(' ').filter(Boolean);
+  const grams = new Set<string>();
+  words.forEach((word, n) => {
+    const padded = n === words.length - 1 ? ` ${word}` : ` ${word} `;
+    for (let i = 0; i + 3 <= padded.length; i++) {
+      grams.add(padded.slice(i, i + 3));
+    }
+  });
+  return grams;
+}
+
+/**
+ * Scores from the index: a field matches when it holds enough of the query's
+ * trigrams, and adds that share times the field's weight
+ */
+function indexedMatches(index: SearchIndex, query: string): Map<string, { score: number; matchedFields: string[] }> {
+  const matches = new Map<string, { score: number; matchedFields: string[] }>();
+  const grams = queryTrigrams(query);
+  if (grams.size === 0) return matches;
+
+  const hits = new Map<number, number>();
+  grams.forEach(gram => {
+    index.trigrams[gram]?.forEach(key => hits.set(key, (hits.get(key) || 0) + 1));
+  });
+
+  const fieldCount = index.fields.length;
+  hits.forEach((count, key) => {
+    const coverage = count / grams.size;
+    if (coverage < index.minCoverage) return;
+    const [field, weight] = index.fields[key % fieldCount];
+    const id = index.docs[Math.floor(key / fieldCount)];
+    const match = matches.get(id) || { score: 0, matchedFields: [] };
+    match.score += coverage * weight;
+    match.matchedFields.push(field);
+    matches.set(id, match);
+  });
+  return matches;
+}
+
+/**
+ * Suggestions for a prefix of any word of a term, read off the trie node the
+ * prefix ends in (nodes keep their best 20 terms)
+ */
+function trieSuggestions(index: SearchIndex, query: string, limit: number): string[] {
+  let key = normalize(query);
+  let node = index.trie;
+  while (key) {
+    const edge = Object.keys(node[1]).find(e => e.startsWith(key) || key.startsWith(e));
+    if (edge === undefined) return [];
+    node = node[1][edge];
+    key = key.slice(edge.length);
+  }
+  return node === index.trie ? [] : node[0].slice(0, limit).map(i => index.terms[i][0]);
+}
+
+function regionById(id: string): MusicalRegion | undefined {
+  if (!regionsById) {
+    regionsById = new Map(musicalRegions.map(region => [region.id, region]));
+  }
+  return regionsById.get(id);
+}
+
+// Facet values from the index, or computed once from musicalRegions
+function facet(name: keyof SearchFacets, compute: () => string[]): string[] {
+  if (prebuiltIndex) return prebuiltIndex.facets[name];
+  let values = facetCache.get(name);
+  if (!values) {
+    values = compute();
+    facetCache.set(name, values);
+  }
+  return values;
+}
+
 /**
  * Simple fuzzy matching function
  * Returns a score between 0 and 1 based on character matches
@@ -49,13 +178,90 @@ function fuzzyMatch(search: string, target: string): number {
   return searchIndex === search.length ? score / target.length : 0;
 }
 
+/**
+ * Score a region against a query by fuzzy matching each field in turn
+ */
+function fuzzyScore(region: MusicalRegion, query: string): { score: number; matchedFields: string[] } {
+  let score = 0;
+  const matchedFields: string[] = [];
+
+  // Search in region name
+  const nameScore = fuzzyMatch(query, region.name);
+  if (nameScore > 0.5) {
+    score += nameScore * 10;
+    matchedFields.push('name');
+  }
+
+  // Search in description
+  const descScore = fuzzyMatch(query, region.description);
+  if (descScore > 0.3) {
+    score += descScore * 5;
+    matchedFields.push('description');
+  }
+
+  // Search in instruments
+  const allInstruments = [
+    ...region.instruments.melodic,
+    ...region.instruments.rhythmic,
+    ...region.instruments.unique,
+  ].join(' ');
+  const instScore = fuzzyMatch(query, allInstruments);
+  if (instScore > 0.3) {
+    score += instScore * 8;
+    matchedFields.push('instruments');
+  }
+
+  // Search in languages
+  const languages = region.language.primary.join(' ');
+  const langScore = fuzzyMatch(query, languages);
+  if (langScore > 0.3) {
+    score += langScore * 6;
+    matchedFields.push('languages');
+  }
+
+  // Search in performance context
+  const contexts = region.performance.performanceContext.join(' ');
+  const contextScore = fuzzyMatch(query, contexts);
+  if (contextScore > 0.3) {
+    score += contextScore * 7;
+    matchedFields.push('context');
+  }
+
+  // Search in vocal styles
+  const vocalStyles = region.performance.vocalStyle.join(' ');
+  const vocalScore = fuzzyMatch(query, vocalStyles);
+  if (vocalScore > 0.3) {
+    score += vocalScore * 6;
+    matchedFields.push('vocal style');
+  }
+
+  // Search in musician castes/communities
+  const castes = (region.socialContext.musicianCaste || []).join(' ');
+  const casteScore = fuzzyMatch(query, castes);
+  if (casteScore > 0.3) {
+    score += casteScore * 5;
+    matchedFields.push('communities');
+  }
+
+  return { score, matchedFields };
+}
+
 /**
  * Search regions based on query and filters
  */
 export function searchRegions(filters: SearchFilters): SearchResult[] {
   const results: SearchResult[] = [];
+  const query = filters.query.trim();
+  // A query too short to have trigrams (a single letter) is scanned with fuzzyScore instead
+  const indexed =
+    query && prebuiltIndex && queryTrigrams(query).size > 0 ? indexedMatches(prebuiltIndex, query) : null;
 
-  musicalRegions.forEach(region => {
+  // With the index, only the regions it matched need the filters
+  const candidates = indexed
+    ? [...indexed.keys()].map(regionById).filter((region): region is MusicalRegion => !!region)
+    : musicalRegions;
+
+  candidates.forEach(region => {
     let score = 0;
     const matchedFields: string[] = [];
 
@@ -115,69 +321,13 @@ export function searchRegions(filters: SearchFilters): SearchResult[] {
     }
 
     // Text query matching (if provided)
-    if (filters.query.trim()) {
-      const query = filters.query.trim();
-
-      // Search in region name
-      const nameScore = fuzzyMatch(query, region.name);
-      if (nameScore > 0.5) {
-        score += nameScore * 10;
-        matchedFields.push('name');
-      }
-
-      // Search in description
-      const descScore = fuzzyMatch(query, region.description);
-      if (descScore > 0.3) {
-        score += descScore * 5;
-        matchedFields.push('description');
-      }
-
-      // Search in instruments
-      const allInstruments = [
-        ...region.instruments.melodic,
-        ...region.instruments.rhythmic,
-        ...region.instruments.unique,
-      ].join(' ');
-      const instScore = fuzzyMatch(query, allInstruments);
-      if (instScore > 0.3) {
-        score += instScore * 8;
-        matchedFields.push('instruments');
-      }
-
-      // Search in languages
-      const languages = region.language.primary.join(' ');
-      const langScore = fuzzyMatch(query, languages);
-      if (langScore > 0.3) {
-        score += langScore * 6;
-        matchedFields.push('languages');
-      }
-
-      // Search in performance context
-      const contexts = region.performance.performanceContext.join(' ');
-      const contextScore = fuzzyMatch(query, contexts);
-      if (contextScore > 0.3) {
-        score += contextScore * 7;
-        matchedFields.push('context');
-      }
-
-      // Search in vocal styles
-      const vocalStyles = region.performance.vocalStyle.join(' ');
-      const vocalScore = fuzzyMatch(query, vocalStyles);
-      if (vocalScore > 0.3) {
-        score += vocalScore * 6;
-        matchedFields.push('vocal style');
-      }
-
-      // Search in musician castes/communities
-      const castes = (region.socialContext.musicianCaste || []).join(' ');
-      const casteScore = fuzzyMatch(query, castes);
-      if (casteScore > 0.3) {
-        score += casteScore * 5;
-        matchedFields.push('communities');
-      }
+    if (query) {
+      const match = indexed ? indexed.get(region.id)! : fuzzyScore(region, query);
+      score = match.score;
+      matchedFields.push(...match.matchedFields);
 
       // Only include if there's at least some match
-      if (score < 1 && filters.query.trim()) {
+      if (score < 1) {
         return;
       }
     } else {
@@ -200,68 +350,78 @@ export function searchRegions(filters: SearchFilters): SearchResult[] {
  * Get all unique instruments across regions for autocomplete
  */
 export function getAllInstruments(): string[] {
-  const instruments = new Set<string>();
+  return facet('instruments', () => {
+    const instruments = new Set<string>();
 
-  musicalRegions.forEach(region => {
-    region.instruments.melodic.forEach(i => instruments.add(i));
-    region.instruments.rhythmic.forEach(i => instruments.add(i));
-    region.instruments.unique.forEach(i => instruments.add(i));
-  });
+    musicalRegions.forEach(region => {
+      region.instruments.melodic.forEach(i => instruments.add(i));
+      region.instruments.rhythmic.forEach(i => instruments.add(i));
+      region.instruments.unique.forEach(i => instruments.add(i));
+    });
 
-  return Array.from(instruments).sort();
+    return Array.from(instruments).sort();
+  });
 }
 
 /**
  * Get all unique genres/contexts for autocomplete
  */
 export function getAllGenres(): string[] {
-  const genres = new Set<string>();
+  return facet('genres', () => {
+    const genres = new Set<string>();
 
-  musicalRegions.forEach(region => {
-    region.performance.performanceContext.forEach(g => genres.add(g));
-    region.language.poeticTraditions.forEach(g => genres.add(g));
-  });
+    musicalRegions.forEach(region => {
+      region.performance.performanceContext.forEach(g => genres.add(g));
+      region.language.poeticTraditions.forEach(g => genres.add(g));
+    });
 
-  return Array.from(genres).sort();
+    return Array.from(genres).sort();
+  });
 }
 
 /**
  * Get all linguistic families
  */
 export function getAllLinguisticFamilies(): string[] {
-  const families = new Set<string>();
+  return facet('linguisticFamilies', () => {
+    const families = new Set<string>();
 
-  musicalRegions.forEach(region => {
-    families.add(region.language.linguisticFamily);
-  });
+    musicalRegions.forEach(region => {
+      families.add(region.language.linguisticFamily);
+    });
 
-  return Array.from(families).sort();
+    return Array.from(families).sort();
+  });
 }
 
 /**
  * Get all tempo ranges
  */
 export function getAllTempoRanges(): string[] {
-  const tempos = new Set<string>();
+  return facet('tempoRanges', () => {
+    const tempos = new Set<string>();
 
-  musicalRegions.forEach(region => {
-    tempos.add(region.musicalStructure.tempo);
-  });
+    musicalRegions.forEach(region => {
+      tempos.add(region.musicalStructure.tempo);
+    });
 
-  return Array.from(tempos).sort();
+    return Array.from(tempos).sort();
+  });
 }
 
 /**
  * Get all scale types
  */
 export function getAllScaleTypes(): string[] {
-  const scales = new Set<string>();
+  return facet('scaleTypes', () => {
+    const scales = new Set<string>();
 
-  musicalRegions.forEach(region => {
-    scales.add(region.musicalStructure.scaleType);
-  });
+    musicalRegions.forEach(region => {
+      scales.add(region.musicalStructure.scaleType);
+    });
 
-  return Array.from(scales).sort();
+    return Array.from(scales).sort();
+  });
 }
 
 /**
@@ -269,6 +429,7 @@ export function getAllScaleTypes(): string[] {
  */
 export function getAutocompleteSuggestions(query: string, limit: number = 10): string[] {
   if (!query.trim()) return [];
+  if (prebuiltIndex) return trieSuggestions(prebuiltIndex, query, limit);
 
   const suggestions = new Set<string>();
   const lowerQuery = query.toLowerCase();
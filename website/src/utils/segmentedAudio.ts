@@ -0,0 +1,184 @@
+/**
+ * Segmented Audio
+ * Streams an MP3 through Media Source Extensions using the byte-range index
+ * written by scripts/build-audio-segments.py. Playback can start once the
+ * first segment is in, only BUFFER_AHEAD seconds are fetched past the
+ * playhead, and a seek fetches the segment holding the new position instead
+ * of everything before it. Browsers without MSE for MP3 but with native HLS
+ * get the playlist; anything else keeps the plain file
+ */
+
+import type { AudioManifestEntry, SegmentInfo } from './assetManifest';
+
+const BUFFER_AHEAD = 30; // seconds
+const HLS_MIME = 'application/vnd.apple.mpegurl';
+
+/**
+ * Index of the segment that holds a time (seconds)
+ */
+export function segmentAt(info: SegmentInfo, time: number): number {
+  let low = 0;
+  let high = info.index.length - 1;
+  while (low < high) {
+    const mid = (low + high + 1) >> 1;
+    if (info.index[mid].time <= time) low = mid;
+    else high = mid - 1;
+  }
+  return low;
+}
+
+function bufferedAhead(audio: HTMLAudioElement): number {
+  const time = audio.currentTime;
+  for (let i = 0; i < audio.buffered.length; i++) {
+    if (audio.buffered.start(i) <= time + 0.1 && time <= audio.buffered.end(i)) {
+      return audio.buffered.end(i) - time;
+    }
+  }
+  return 0;
+}
+
+function updateEnd(buffer: SourceBuffer): Promise<void> {
+  return new Promise((resolve, reject) => {
+    const done = () => {
+      buffer.removeEventListener('updateend', done);
+      buffer.removeEventListener('error', failed);
+      resolve();
+    };
+    const failed = () => {
+      buffer.removeEventListener('updateend', done);
+      buffer.removeEventListener('error', failed);
+      reject(new Error('SourceBuffer append failed'));
+    };
+    buffer.addEventListener('updateend', done);
+    buffer.addEventListener('error', failed);
+  });
+}
+
+function attachMediaSource(audio: HTMLAudioElement, info: SegmentInfo): () => void {
+  const mediaSource = new MediaSource();
+  const objectUrl = URL.createObjectURL(mediaSource);
+  const fetched = new Set<number>();
+  let buffer: SourceBuffer | null = null;
+  let controller: AbortController | null = null;
+  let loadingIndex = -1;
+  let closed = false;
+
+  const fallBack = (error: unknown) => {
+    console.warn('Segmented playback failed, using the whole file:', error);
+    const time = audio.currentTime;
+    detach();
+    audio.src = info.media;
+    audio.currentTime = time;
+  };
+
+  // First segment at or after the playhead that is not in the buffer yet
+  const nextWanted = () => {
+    let i = segmentAt(info, audio.currentTime);
+    while (i < info.index.length && fetched.has(i)) i++;
+    return i;
+  };
+
+  const pump = async () => {
+    if (loadingIndex >= 0 || closed || !buffer) return;
+    const i = nextWanted();
+    if (i >= info.index.length) {
+      if (fetched.size === info.index.length && mediaSource.readyState === 'open' && !buffer.updating) {
+        mediaSource.endOfStream();
+      }
+      return;
+    }
+    if (bufferedAhead(audio) > BUFFER_AHEAD) return;
+
+    const segment = info.index[i];
+    loadingIndex = i;
+    controller = new AbortController();
+    try {
+      const response = await fetch(info.media, {
+        headers: { Range: `bytes=${segment.offset}-${segment.offset + segment.length - 1}` },
+        signal: controller.signal,
+      });
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      const data = await response.arrayBuffer();
+      if (closed) return;
+      // A server that ignores Range sends the whole file, which covers every segment
+      const whole = response.status !== 206;
+      buffer.timestampOffset = whole ? 0 : segment.time;
+      buffer.appendBuffer(data);
+      await updateEnd(buffer);
+      if (whole) info.index.forEach((_, j) => fetched.add(j));
+      else fetched.add(i);
+    } catch (error) {
+      if ((error as Error).name !== 'AbortError') {
+        if (!closed) fallBack(error);
+        return;
+      }
+    } finally {
+      loadingIndex = -1;
+      controller = null;
+    }
+    pump();
+  };
+
+  const handleSourceOpen = () => {
+    try {
+      buffer = mediaSource.addSourceBuffer(info.mime);
+      const last = info.index[info.index.length - 1];
+      mediaSource.duration = last.time + last.duration;
+    } catch (error) {
+      fallBack(error);
+      return;
+    }
+    pump();
+  };
+
+  const handleSeeking = () => {
+    // A fetch for a segment the new position does not need next is dropped
+    if (loadingIndex >= 0 && loadingIndex !== nextWanted()) controller?.abort();
+    pump();
+  };
+
+  const handleProgress = () => {
+    pump();
+  };
+
+  const detach = () => {
+    closed = true;
+    controller?.abort();
+    mediaSource.removeEventListener('sourceopen', handleSourceOpen);
+    audio.removeEventListener('seeking', handleSeeking);
+    audio.removeEventListener('timeupdate', handleProgress);
+    audio.removeEventListener('waiting', handleProgress);
+    URL.revokeObjectURL(objectUrl);
+  };
+
+  mediaSource.addEventListener('sourceopen', handleSourceOpen);
+  audio.addEventListener('seeking', handleSeeking);
+  audio.addEventListener('timeupdate', handleProgress);
+  audio.addEventListener('waiting', handleProgress);
+  audio.src = objectUrl;
+
+  return () => {
+    if (closed) return;
+    detach();
+    if (audio.src === objectUrl) audio.src = info.media;
+  };
+}
+
+/**
+ * Play an audio element from its manifest segments when the entry has them.
+ * Call before playback starts; returns a cleanup that releases the stream,
+ * or null when the element was left on its plain source
+ */
+export function attachSegmentedSource(audio: HTMLAudioElement, entry: AudioManifestEntry): (() => void) | null {
+  const info = entry.segments;
+  if (!info || info.index.length === 0) return null;
+
+  if (typeof MediaSource !== 'undefined' && MediaSource.isTypeSupported(info.mime)) {
+    return attachMediaSource(audio, info);
+  }
+  if (audio.canPlayType(HLS_MIME) !== '') {
+    audio.src = info.playlist;
+    return () => {};
+  }
+  return null;
+}
@@ -0,0 +1,50 @@
+/**
+ * Waveform Peaks
+ * Loads the precomputed min/max peaks listed in the audio manifest, so a
+ * waveform can be drawn before (or without) decoding the audio itself
+ */
+
+import type { PeakLevel, PeakSet } from './assetManifest';
+
+const DAT_HEADER_BYTES = 20;
+const FLAG_8BIT = 1;
+
+/**
+ * Coarsest level that still has at least minPeaks peaks, else the finest one
+ */
+export function pickPeakLevel(peaks: PeakSet, minPeaks: number): PeakLevel | null {
+  const levels = [...peaks.levels].sort((a, b) => b.samplesPerPeak - a.samplesPerPeak);
+  return levels.find((level) => level.length >= minPeaks) || levels[levels.length - 1] || null;
+}
+
+/**
+ * Parse an audiowaveform .dat (v1) file into interleaved min/max values in [-1, 1]
+ */
+export function parsePeaks(buffer: ArrayBuffer): Float32Array {
+  const view = new DataView(buffer);
+  if (buffer.byteLength < DAT_HEADER_BYTES || view.getInt32(0, true) !== 1) {
+    throw new Error('Unsupported peaks file');
+  }
+  const eightBit = (view.getUint32(4, true) & FLAG_8BIT) !== 0;
+  const count = view.getUint32(16, true) * 2;
+  const values = eightBit
+    ? new Int8Array(buffer, DAT_HEADER_BYTES, count)
+    : new Int16Array(buffer, DAT_HEADER_BYTES, count);
+  const scale = eightBit ? 128 : 32768;
+  return Float32Array.from(values, (value) => value / scale);
+}
+
+/**
+ * Fetch the level suited to a waveform of minPeaks bars; null when unavailable
+ */
+export async function loadPeaks(peaks: PeakSet, minPeaks: number): Promise<Float32Array | null> {
+  const level = pickPeakLevel(peaks, minPeaks);
+  if (!level) return null;
+  try {
+    const response = await fetch(level.path);
+    return response.ok ? parsePeaks(await response.arrayBuffer()) : null;
+  } catch (error) {
+    console.warn('Peaks fetch failed:', level.path, error);
+    return null;
+  }
+}